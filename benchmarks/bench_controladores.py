@@ -0,0 +1,180 @@
+# benchmarks/bench_controladores.py
+"""
+Benchmark de los métodos públicos de los controladores a 10k / 100k / 1M filas.
+Siembra el backend en memoria (benchmarks/fake_supabase.py) con benchmarks/generador_datos.py
+(ventas, servicios, pagos, leads, guías y endosos), ejecuta cada método en frío (cachés vacías)
+y reporta: tiempo total, tiempo del backend, round trips, bytes transferidos y pico de memoria.
+
+Uso:
+    python benchmarks/bench_controladores.py                      # escala 10k
+    python benchmarks/bench_controladores.py --escalas 10k,100k --latencia-ms 40
+    python benchmarks/bench_controladores.py --guardar-baseline   # actualiza baseline.json
+La escala es el número de filas de venta_tour (la tabla más grande); el resto es proporcional.
+Sale con código 1 si un método hace más round trips o transfiere más bytes que en el baseline
+(y, con --estricto, si es más lento que el baseline más la tolerancia).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.generador_datos import GeneradorDatos, ventas_para_filas
+from controllers.concurrencia import ejecutar_en_paralelo
+from controllers.gerencia_controller import GerenciaController
+from controllers.operaciones_controller import OperacionesController
+from controllers.reporte_controller import ReporteController
+from controllers.venta_controller import VentaController
+from models.cache_incremental import CACHES_INCREMENTALES
+from models.cache_referencias import cache_referencias, cache_resumen_mes
+
+ESCALAS = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+RUTA_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+INICIO_DATOS = date(2025, 1, 1)
+DIAS_DATOS = 730
+SEMANA_ALTA = date(2025, 7, 21)  # temporada alta (Inti Raymi / vacaciones de julio)
+
+
+def sembrar(filas_venta_tour: int, semilla: int = 42) -> Dict[str, List[Dict[str, Any]]]:
+    """Tablas sintéticas reproducibles (benchmarks/generador_datos.py) más las tablas de riesgo."""
+    tablas = GeneradorDatos(ventas_para_filas(filas_venta_tour), semilla=semilla,
+                            desde=INICIO_DATOS, dias=DIAS_DATOS).tablas()
+    tablas['documentacion'] = [{'id': i, 'id_pasajero': i, 'tipo_documento': 'Pasaporte', 'es_critico': True,
+                                'estado_entrega': 'PENDIENTE'} for i in range(1, 101)]
+    tablas['requerimiento'] = [{'id': i, 'id_venta': i, 'estado': 'PENDIENTE'} for i in range(1, 201)]
+    return tablas
+
+
+def _pagina_gerencia(client) -> Dict[str, Any]:
+    """Lo que carga auditoria_maestra + dashboard_ejecutivo en un mismo rerun."""
+    ctrl = GerenciaController(client)
+    nombres = [n for n in dir(ctrl) if n.startswith('get_')]
+    return ejecutar_en_paralelo({n: getattr(ctrl, n) for n in nombres})
+
+
+def casos() -> List[Tuple[str, Callable[[Any], Any]]]:
+    lista = [
+        ('OperacionesController.get_servicios_rango_fechas',
+         lambda c: OperacionesController(c).get_servicios_rango_fechas(SEMANA_ALTA, SEMANA_ALTA + timedelta(days=6))),
+        ('OperacionesController.get_servicios_por_dia',
+         lambda c: OperacionesController(c).get_servicios_por_dia(SEMANA_ALTA, SEMANA_ALTA + timedelta(days=29))),
+        ('OperacionesController.get_servicios_por_fecha',
+         lambda c: OperacionesController(c).get_servicios_por_fecha(SEMANA_ALTA)),
+        ('OperacionesController.get_fechas_con_servicios',
+         lambda c: OperacionesController(c).get_fechas_con_servicios(SEMANA_ALTA.year, SEMANA_ALTA.month)),
+        ('OperacionesController.get_all_ventas', lambda c: OperacionesController(c).get_all_ventas()),
+    ]
+    for nombre in sorted(n for n in dir(GerenciaController) if n.startswith('get_')):
+        lista.append((f'GerenciaController.{nombre}', lambda c, n=nombre: getattr(GerenciaController(c), n)()))
+    lista += [
+        ('GerenciaController (página completa)', _pagina_gerencia),
+        ('ReporteController.get_data_for_dashboard', lambda c: ReporteController(c).get_data_for_dashboard()),
+        ('VentaController.obtener_todas_ventas_b2b', lambda c: VentaController(c).obtener_todas_ventas_b2b()),
+    ]
+    return lista
+
+
+def _vaciar_caches() -> None:
+    cache_referencias.invalidar()
+    cache_resumen_mes.invalidar()
+    for cache in CACHES_INCREMENTALES.values():
+        cache.vaciar()
+    GerenciaController._rpc_no_disponibles.clear()
+    OperacionesController._rpc_no_disponibles.clear()
+
+
+def medir(fake: FakeSupabase, funcion: Callable[[Any], Any], memoria: bool = True) -> Dict[str, float]:
+    _vaciar_caches()
+    fake.reiniciar_contadores()
+    t0 = time.perf_counter()
+    funcion(fake)
+    resultado = {
+        'tiempo_ms': round((time.perf_counter() - t0) * 1000, 1),
+        'servidor_ms': round(fake.tiempo_servidor_ms, 1),
+        'round_trips': fake.round_trips,
+        'bytes': fake.bytes_respuesta,
+    }
+    if memoria:
+        # Corrida aparte: tracemalloc hace todo más lento y distorsionaría el tiempo
+        _vaciar_caches()
+        tracemalloc.start()
+        funcion(fake)
+        resultado['memoria_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return resultado
+
+
+def comparar(actual: Dict[str, float], base: Dict[str, float], tolerancia: float, estricto: bool) -> List[str]:
+    problemas = []
+    if actual['round_trips'] > base.get('round_trips', float('inf')):
+        problemas.append(f"round trips {base['round_trips']} -> {actual['round_trips']}")
+    if actual['bytes'] > base.get('bytes', float('inf')) * 1.10:
+        problemas.append(f"bytes {base['bytes']} -> {actual['bytes']}")
+    if estricto and actual['tiempo_ms'] > base.get('tiempo_ms', float('inf')) * (1 + tolerancia):
+        problemas.append(f"tiempo {base['tiempo_ms']} -> {actual['tiempo_ms']} ms")
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escalas', default='10k', help='lista separada por comas: 10k,100k,1m')
+    parser.add_argument('--latencia-ms', type=float, default=0.0, help='latencia simulada por round trip')
+    parser.add_argument('--sin-memoria', action='store_true', help='omitir la medición con tracemalloc')
+    parser.add_argument('--filtro', default='', help='solo los métodos que contengan este texto')
+    parser.add_argument('--baseline', default=RUTA_BASELINE)
+    parser.add_argument('--guardar-baseline', action='store_true')
+    parser.add_argument('--tolerancia', type=float, default=0.25, help='margen de tiempo frente al baseline')
+    parser.add_argument('--estricto', action='store_true', help='fallar también por tiempo')
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    resultados: Dict[str, Dict[str, Dict[str, float]]] = {}
+    regresiones = []
+    for escala in [e.strip().lower() for e in args.escalas.split(',') if e.strip()]:
+        print(f"\n=== Escala {escala} ({ESCALAS[escala]:,} filas de venta_tour) ===")
+        fake = FakeSupabase(sembrar(ESCALAS[escala]), latencia_ms=args.latencia_ms)
+        print(f"{'método':<52} | {'ms':>9} | {'backend ms':>10} | {'RT':>4} | {'KB':>10} | {'pico KB':>10} | vs baseline")
+        resultados[escala] = {}
+        for nombre, funcion in casos():
+            if args.filtro and args.filtro not in nombre:
+                continue
+            r = medir(fake, funcion, memoria=not args.sin_memoria)
+            resultados[escala][nombre] = r
+
+            base = baseline.get(escala, {}).get(nombre)
+            estado = '(sin baseline)'
+            if base:
+                problemas = comparar(r, base, args.tolerancia, args.estricto)
+                regresiones += [f"{escala} {nombre}: {p}" for p in problemas]
+                estado = '❌ ' + '; '.join(problemas) if problemas else f"{r['tiempo_ms'] / max(base['tiempo_ms'], 0.1):.2f}x tiempo"
+            print(f"{nombre:<52} | {r['tiempo_ms']:>9.1f} | {r['servidor_ms']:>10.1f} | {r['round_trips']:>4} | "
+                  f"{r['bytes'] / 1024:>10.1f} | {r.get('memoria_kb', 0):>10.1f} | {estado}")
+
+    if args.guardar_baseline:
+        for escala, metodos in resultados.items():
+            baseline.setdefault(escala, {}).update(metodos)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"\nBaseline guardado en {args.baseline}")
+
+    if regresiones:
+        print("\n❌ Regresiones frente al baseline:")
+        for r in regresiones:
+            print(f"   - {r}")
+        sys.exit(1)
+    print("\n✅ Sin regresiones.")
+
+
+if __name__ == "__main__":
+    main()
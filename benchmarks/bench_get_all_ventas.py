@@ -0,0 +1,49 @@
+# benchmarks/bench_get_all_ventas.py
+"""
+Benchmark de round trips de OperacionesController.get_all_ventas.
+Cuenta cuántas llamadas a .execute() se hacen a medida que crece la tabla 'venta'.
+Uso: python benchmarks/bench_get_all_ventas.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_supabase import FakeSupabase
+from controllers.operaciones_controller import OperacionesController
+
+
+def crear_backend(num_ventas: int) -> FakeSupabase:
+    return FakeSupabase({
+        'cliente': [{'id_cliente': i, 'nombre': f'Cliente {i}'} for i in range(50)],
+        'vendedor': [{'id_vendedor': i, 'nombre': f'Vendedor {i}'} for i in range(5)],
+        'venta': [{
+            'id_venta': i,
+            'id_cliente': i % 50,
+            'id_vendedor': i % 5,
+            'fecha_venta': '2026-01-01',
+            'precio_total_cierre': 100.0,
+            'estado_venta': 'CONFIRMADO',
+        } for i in range(num_ventas)],
+    })
+
+
+def main():
+    print(f"{'ventas':>8} | {'round trips':>11} | {'tiempo (ms)':>11}")
+    for n in (10, 100, 1000, 5000):
+        cliente = crear_backend(n)
+        ctrl = OperacionesController(cliente)
+        t0 = time.perf_counter()
+        filas = ctrl.get_all_ventas()
+        ms = (time.perf_counter() - t0) * 1000
+        assert len(filas) == n
+        print(f"{n:>8} | {cliente.round_trips:>11} | {ms:>11.2f}")
+        if cliente.round_trips != 1:
+            print("❌ El número de round trips crece con la tabla (N+1).")
+            sys.exit(1)
+    print("✅ Round trips constantes.")
+
+
+if __name__ == "__main__":
+    main()
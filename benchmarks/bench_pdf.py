@@ -0,0 +1,172 @@
+# benchmarks/bench_pdf.py
+"""
+Compara los motores de PDF (controllers/renderizadores_pdf.py) en los documentos que soportan
+ambos: itinerario simple y vale de endose. Por motor y documento reporta tiempo de render
+(p50 / p95 / total) y tamaño del PDF, sin la caché de PDFs.
+
+Corpus:
+  - por defecto, datos_render con la forma que arma el constructor de itinerarios (tours del
+    catálogo de benchmarks/generador_datos.py) y vales de OperacionesController.get_vales_endoso
+    sobre el backend en memoria;
+  - con --supabase N, los últimos N datos_render reales de itinerario_digital y los vales de la
+    última semana (usa .streamlit/secrets.toml).
+
+Uso:
+    python benchmarks/bench_pdf.py
+    python benchmarks/bench_pdf.py --itinerarios 100 --vales 200 --json pdf.json
+    python benchmarks/bench_pdf.py --supabase 50
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_datos import CATALOGO_TOURS
+from controllers.pdf_controller import PDFController
+from controllers.renderizadores_pdf import MOTORES
+
+DOCUMENTOS = {
+    'itinerario_simple_template.html': 'generar_itinerario_simple_pdf',
+    'voucher_endose_template.html': 'generar_voucher_endose_pdf',
+}
+DESCRIPCIONES = [
+    "Recojo del hotel y visita guiada por los principales atractivos con tiempo libre para fotos.",
+    "Salida temprano en transporte turístico, almuerzo buffet incluido y retorno por la tarde a Cusco.",
+    "Caminata de dificultad moderada con vistas de nevados, lagunas y comunidades andinas tradicionales.",
+    "",
+]
+
+
+def corpus_itinerarios(n: int, semilla: int = 7) -> List[Dict[str, Any]]:
+    """datos_render como los genera constructor_itinerarios (vistas/page_ventas.py)."""
+    rnd = random.Random(semilla)
+    corpus = []
+    for i in range(n):
+        fecha = date(2025, 6, 1) + timedelta(days=rnd.randint(0, 180))
+        dias = []
+        for d in range(rnd.choice([1, 2, 3, 4, 5, 7, 10])):
+            tour = rnd.choice(CATALOGO_TOURS)[0].title()
+            dias.append({
+                "numero": d + 1,
+                "fecha": (fecha + timedelta(days=d)).strftime("%d / %m / %Y"),
+                "nombre": tour,
+                "descripcion": rnd.choice(DESCRIPCIONES) * rnd.randint(1, 3),
+                "incluye": ["Ticket de Ingreso", "Transporte"][:rnd.randint(0, 2)],
+                "no_incluye": ["Propinas"][:rnd.randint(0, 1)],
+            })
+        corpus.append({
+            "titulo": f"Programa {i}",
+            "nombre_pasajero": f"Familia {rnd.choice(['Quispe', 'Mamani', 'García', 'Smith', 'Müller'])}",
+            "fecha_viaje": fecha.isoformat(),
+            "itinerario_detalles": dias,
+            "precios": {"nacional": 0, "extranjero": round(rnd.uniform(80, 2500), 2), "can": 0},
+        })
+    return corpus
+
+
+def corpus_vales_fake(n: int) -> List[Dict[str, Any]]:
+    """Vales reales del pipeline de operaciones sobre el backend en memoria."""
+    from benchmarks.bench_controladores import SEMANA_ALTA, sembrar
+    from benchmarks.fake_supabase import FakeSupabase
+    from controllers.operaciones_controller import OperacionesController
+
+    controller = OperacionesController(FakeSupabase(sembrar(max(10_000, n * 40))))
+    vales = controller.get_vales_endoso(SEMANA_ALTA, SEMANA_ALTA + timedelta(days=30))
+    return vales[:n]
+
+
+def corpus_supabase(n: int) -> Dict[str, List[Dict[str, Any]]]:
+    import streamlit as st
+    from supabase import create_client
+    from controllers.operaciones_controller import OperacionesController
+
+    client = create_client(st.secrets["supabase"]["URL"], st.secrets["supabase"]["ANON_KEY"])
+    res = (client.table('itinerario_digital').select('nombre_pasajero_itinerario, datos_render')
+           .order('fecha_generacion', desc=True).limit(n).execute())
+    itinerarios = [{**(r['datos_render'] or {}), 'nombre_pasajero': r['nombre_pasajero_itinerario']}
+                   for r in (res.data or [])]
+    vales = OperacionesController(client).get_vales_endoso(date.today() - timedelta(days=7), date.today())
+    return {'itinerario_simple_template.html': itinerarios, 'voucher_endose_template.html': vales[:n]}
+
+
+def medir(motor: str, documento: str, corpus: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Render de cada payload con el motor indicado, sin pasar por la caché de PDFs."""
+    controller = PDFController(motor=motor)
+    renderizador = MOTORES[motor]
+    capturados = []
+    # Se captura el contexto que arma el PDFController y se renderiza directo
+    controller._render_pdf = lambda nombre, contexto: capturados.append(contexto)
+    for datos in corpus:
+        getattr(controller, DOCUMENTOS[documento])(dict(datos))
+
+    renderizador.renderizar(documento, capturados[0])  # calentamiento (imports, fuentes)
+    tiempos, tamanos, errores = [], [], 0
+    for contexto in capturados:
+        t0 = time.perf_counter()
+        contenido = renderizador.renderizar(documento, contexto)
+        tiempos.append((time.perf_counter() - t0) * 1000)
+        if contenido:
+            tamanos.append(len(contenido))
+        else:
+            errores += 1
+    tiempos.sort()
+    return {
+        'documentos': len(capturados),
+        'errores': errores,
+        'p50_ms': round(statistics.median(tiempos), 2),
+        'p95_ms': round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 2),
+        'total_ms': round(sum(tiempos), 1),
+        'kb_promedio': round(statistics.mean(tamanos) / 1024, 1) if tamanos else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--itinerarios', type=int, default=50)
+    parser.add_argument('--vales', type=int, default=100)
+    parser.add_argument('--supabase', type=int, default=0, help='usar los últimos N payloads reales')
+    parser.add_argument('--json', help='guardar los resultados en este archivo')
+    args = parser.parse_args()
+
+    # xhtml2pdf avisa por cada glifo sin fuente: no aporta a la medición
+    logging.getLogger('xhtml2pdf').setLevel(logging.ERROR)
+
+    if args.supabase:
+        corpus = corpus_supabase(args.supabase)
+    else:
+        corpus = {
+            'itinerario_simple_template.html': corpus_itinerarios(args.itinerarios),
+            'voucher_endose_template.html': corpus_vales_fake(args.vales),
+        }
+
+    resultados: Dict[str, Dict[str, Dict[str, float]]] = {}
+    print(f"{'documento':<34} | {'motor':<9} | {'docs':>5} | {'p50 ms':>8} | {'p95 ms':>8} | "
+          f"{'total ms':>9} | {'KB prom':>8} | vs xhtml2pdf")
+    for documento, payloads in corpus.items():
+        if not payloads:
+            print(f"{documento:<34} | sin datos en el corpus")
+            continue
+        resultados[documento] = {motor: medir(motor, documento, payloads) for motor in ('xhtml2pdf', 'fpdf2')}
+        base = resultados[documento]['xhtml2pdf']
+        for motor, r in resultados[documento].items():
+            comparacion = '' if motor == 'xhtml2pdf' else (
+                f"{base['total_ms'] / max(r['total_ms'], 0.01):.1f}x más rápido, "
+                f"{r['kb_promedio'] / max(base['kb_promedio'], 0.01):.0%} del tamaño")
+            print(f"{documento:<34} | {motor:<9} | {r['documentos']:>5} | {r['p50_ms']:>8.1f} | {r['p95_ms']:>8.1f} | "
+                  f"{r['total_ms']:>9.1f} | {r['kb_promedio']:>8.1f} | {comparacion}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# benchmarks/bench_reruns.py
+"""
+Costo por interacción de las páginas de main.py, ejecutadas sin navegador con AppTest de
+Streamlit contra el backend en memoria (benchmarks/fake_supabase.py).
+
+Cada escenario inicia sesión con un rol y recorre interacciones reales (cambiar de módulo,
+hacer clic en días del calendario, editar una fila de un data_editor). Por interacción se
+mide el rerun completo: round trips al backend, bytes y tiempo de pared, y se compara contra
+PRESUPUESTOS. Sale con código 1 si alguna interacción excede sus round trips (y, con
+--estricto, también si excede su tiempo).
+
+Uso:
+    python benchmarks/bench_reruns.py
+    python benchmarks/bench_reruns.py --escenario operaciones --latencia-ms 20
+    python benchmarks/bench_reruns.py --estricto                 # exigir también el tiempo
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.element_tree import Block, Dataframe, Widget
+
+from benchmarks.bench_controladores import SEMANA_ALTA, _vaciar_caches, sembrar
+from benchmarks.fake_supabase import FakeSupabase
+
+# main.py solo acepta el backend inyectado con esta variable
+os.environ['SGVO_CLIENTE_PRUEBAS'] = '1'
+
+RUTA_MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+CLAVE = 'clave-pruebas'
+USUARIOS = {
+    'OPERACIONES': 'operaciones@viajescusco.pe',
+    'GERENCIA': 'gerencia@viajescusco.pe',
+    'VENTAS': 'ventas@viajescusco.pe',
+    'CONTABILIDAD': 'contabilidad@viajescusco.pe',
+}
+
+# Máximo de round trips y de tiempo (ms, sin latencia simulada) por interacción, con 10k filas.
+# Los round trips son deterministas: bajar el tope cuando una optimización los reduzca. El tiempo
+# es ~3x el medido y solo se exige con --estricto (depende de la máquina). Las páginas se importan
+# antes de medir (ver calentar_paginas), así el tiempo es solo el del rerun.
+PRESUPUESTOS: Dict[str, Tuple[int, float]] = {
+    'operaciones: login + Dashboard Operaciones': (15, 1100),
+    'operaciones: calendario: clic en día': (20, 800),
+    'operaciones: calendario: otro día': (20, 700),
+    'operaciones: calendario: mes siguiente': (21, 700),
+    'operaciones: calendario: vista semanal': (16, 600),
+    'operaciones: cambiar a Gestión de Registros': (8, 300),
+    'operaciones: editar fila del estructurador': (8, 300),
+    'operaciones: volver a Dashboard Operaciones': (12, 500),
+    'gerencia: login + Dashboard Ejecutivo': (13, 800),
+    'gerencia: cambiar a Gestión Ejecutiva': (20, 1200),
+    'gerencia: volver a Dashboard Ejecutivo': (12, 400),
+    'ventas: login + Dashboard Comercial': (17, 1500),
+    'ventas: cambiar a Gestión de Registros': (2, 900),
+    'contabilidad: login + Dashboard Contable': (10, 500),
+    'contabilidad: cambiar a Gestión de Registros': (5, 400),
+}
+
+
+class _EdicionDataEditor(Widget):
+    """Sustituye al data_editor del árbol de AppTest (que no permite editarlo) y envía en el
+    próximo rerun el mismo estado que manda el navegador: {edited_rows, added_rows, deleted_rows}."""
+
+    def __init__(self, original: Dataframe, edicion: Dict[str, Any]):
+        self.proto = original.proto
+        self.root = original.root
+        self.type = 'data_editor'
+        self.id = original.proto.id
+        self.key = original.key
+        self.disabled = False
+        self._value = edicion
+
+    @property
+    def value(self) -> Dict[str, Any]:
+        return self._value
+
+    @property
+    def _widget_state(self) -> WidgetState:
+        ws = WidgetState(id=self.id)
+        ws.string_value = json.dumps(self._value, default=str)
+        return ws
+
+
+def editar_data_editor(at: AppTest, key: str, fila: int, columna: str, valor: Any) -> AppTest:
+    """Marca una celda de un data_editor como editada (como si el usuario la hubiera cambiado)."""
+    def buscar(bloque: Block) -> bool:
+        for i, hijo in bloque.children.items():
+            if isinstance(hijo, Dataframe) and hijo.key == key:
+                bloque.children[i] = _EdicionDataEditor(hijo, {
+                    'edited_rows': {str(fila): {columna: valor}}, 'added_rows': [], 'deleted_rows': []
+                })
+                return True
+            if isinstance(hijo, Block) and buscar(hijo):
+                return True
+        return False
+
+    if not buscar(at._tree):
+        raise KeyError(f"No hay data_editor con key={key!r}")
+    return at
+
+
+# Módulos de vistas que main.py carga al cambiar de módulo (con sus dependencias pesadas: PDF, plotly)
+PAGINAS = ('vistas.page_dashboards', 'vistas.page_operaciones', 'vistas.page_gerencia',
+           'vistas.page_ventas', 'vistas.page_contabilidad')
+
+
+def calentar_paginas() -> None:
+    """Importa las páginas una vez: la primera importación no es costo de rerun y
+    dependería de qué escenario corre primero."""
+    for modulo in PAGINAS:
+        importlib.import_module(modulo)
+
+
+def crear_backend(filas_venta_tour: int, latencia_ms: float) -> FakeSupabase:
+    tablas = sembrar(filas_venta_tour)
+    tablas['usuarios_app'] = [{'email': email, 'rol': rol} for rol, email in USUARIOS.items()]
+    tablas.setdefault('itinerario_digital', [])
+    return FakeSupabase(tablas, latencia_ms=latencia_ms, usuarios={e: CLAVE for e in USUARIOS.values()})
+
+
+def iniciar_app(fake: FakeSupabase) -> AppTest:
+    at = AppTest.from_file(RUTA_MAIN, default_timeout=120)
+    at.secrets['supabase'] = {'URL': 'https://fake.supabase.local', 'ANON_KEY': 'fake'}
+    at.session_state['cliente_pruebas'] = fake
+    # Calendarios en temporada alta (con datos) en lugar de la fecha de hoy
+    at.session_state['cal_current_date'] = SEMANA_ALTA.replace(day=1)
+    at.session_state['cal_selected_date'] = SEMANA_ALTA
+    return at
+
+
+def login(rol: str) -> Callable[[AppTest], AppTest]:
+    def accion(at: AppTest) -> AppTest:
+        at.text_input[0].input(USUARIOS[rol])
+        at.text_input[1].input(CLAVE)
+        return at.button[0].click().run()
+    return accion
+
+
+def cambiar_modulo(indice: int) -> Callable[[AppTest], AppTest]:
+    return lambda at: at.sidebar.selectbox[0].select_index(indice).run()
+
+
+def clic(key: str) -> Callable[[AppTest], AppTest]:
+    return lambda at: at.button(key=key).click().run()
+
+
+def elegir(key: str, opcion: str) -> Callable[[AppTest], AppTest]:
+    return lambda at: at.radio(key=key).set_value(opcion).run()
+
+
+def editar_primera_fila(prefijo_key: str, columna: str, valor: Any) -> Callable[[AppTest], AppTest]:
+    def accion(at: AppTest) -> AppTest:
+        key = next(d.key for d in at.dataframe if d.key and d.key.startswith(prefijo_key))
+        return editar_data_editor(at, key, 0, columna, valor).run()
+    return accion
+
+
+# (nombre de la interacción, acción) por escenario; se ejecutan en orden sobre la misma sesión
+ESCENARIOS: Dict[str, List[Tuple[str, Callable[[AppTest], AppTest]]]] = {
+    'operaciones': [
+        ('login + Dashboard Operaciones', login('OPERACIONES')),
+        ('calendario: clic en día', clic(f'dash_d_{SEMANA_ALTA + timedelta(days=2)}')),
+        ('calendario: otro día', clic(f'dash_d_{SEMANA_ALTA + timedelta(days=4)}')),
+        ('calendario: mes siguiente', clic('btn_next_m')),
+        ('calendario: vista semanal', elegir('dashboard_ops_mode', 'Semanal')),
+        ('cambiar a Gestión de Registros', cambiar_modulo(1)),
+        ('editar fila del estructurador', editar_primera_fila('editor_day_', 'SERVICIO', 'City Tour editado')),
+        ('volver a Dashboard Operaciones', cambiar_modulo(0)),
+    ],
+    'gerencia': [
+        ('login + Dashboard Ejecutivo', login('GERENCIA')),
+        ('cambiar a Gestión Ejecutiva', cambiar_modulo(1)),
+        ('volver a Dashboard Ejecutivo', cambiar_modulo(0)),
+    ],
+    'ventas': [
+        ('login + Dashboard Comercial', login('VENTAS')),
+        ('cambiar a Gestión de Registros', cambiar_modulo(1)),
+    ],
+    'contabilidad': [
+        ('login + Dashboard Contable', login('CONTABILIDAD')),
+        ('cambiar a Gestión de Registros', cambiar_modulo(1)),
+    ],
+}
+
+
+def ejecutar_escenario(nombre: str, fake: FakeSupabase) -> List[Dict[str, Any]]:
+    _vaciar_caches()
+    at = iniciar_app(fake)
+    at.run()
+    resultados = []
+    for interaccion, accion in ESCENARIOS[nombre]:
+        fake.reiniciar_contadores()
+        t0 = time.perf_counter()
+        at = accion(at)
+        resultado = {
+            'escenario': nombre,
+            'interaccion': interaccion,
+            'tiempo_ms': round((time.perf_counter() - t0) * 1000, 1),
+            'round_trips': fake.round_trips,
+            'bytes': fake.bytes_respuesta,
+            'errores': [e.value for e in at.exception] + [e.value for e in at.error],
+        }
+        resultados.append(resultado)
+    return resultados
+
+
+def revisar(resultado: Dict[str, Any], latencia_ms: float, estricto: bool = False) -> List[str]:
+    problemas = list(resultado['errores'])
+    presupuesto = PRESUPUESTOS.get(f"{resultado['escenario']}: {resultado['interaccion']}")
+    if presupuesto:
+        max_rt, max_ms = presupuesto
+        if resultado['round_trips'] > max_rt:
+            problemas.append(f"round trips {resultado['round_trips']} > {max_rt}")
+        # La latencia simulada se suma al presupuesto de tiempo
+        if estricto and resultado['tiempo_ms'] > max_ms + max_rt * latencia_ms:
+            problemas.append(f"tiempo {resultado['tiempo_ms']:.0f} ms > {max_ms + max_rt * latencia_ms:.0f} ms")
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escenario', default='', help='lista separada por comas (por defecto todos)')
+    parser.add_argument('--filas', type=int, default=10_000, help='filas de venta_tour del backend en memoria')
+    parser.add_argument('--latencia-ms', type=float, default=0.0, help='latencia simulada por round trip')
+    parser.add_argument('--json', help='guardar los resultados en este archivo')
+    parser.add_argument('--estricto', action='store_true', help='fallar también por tiempo')
+    args = parser.parse_args()
+
+    calentar_paginas()
+    fake = crear_backend(args.filas, args.latencia_ms)
+    nombres = [e.strip() for e in args.escenario.split(',') if e.strip()] or list(ESCENARIOS)
+
+    resultados, fallas = [], []
+    print(f"{'interacción':<52} | {'ms':>8} | {'RT':>4} | {'KB':>9} | estado")
+    for nombre in nombres:
+        for r in ejecutar_escenario(nombre, fake):
+            resultados.append(r)
+            problemas = revisar(r, args.latencia_ms, args.estricto)
+            fallas += [f"{nombre}: {r['interaccion']}: {p}" for p in problemas]
+            estado = '❌ ' + '; '.join(map(str, problemas)) if problemas else '✅'
+            print(f"{nombre + ': ' + r['interaccion']:<52} | {r['tiempo_ms']:>8.0f} | {r['round_trips']:>4} | "
+                  f"{r['bytes'] / 1024:>9.1f} | {estado}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+    if fallas:
+        print("\n❌ Interacciones fuera de presupuesto:")
+        for f in fallas:
+            print(f"   - {f}")
+        sys.exit(1)
+    print("\n✅ Todas las interacciones dentro de presupuesto.")
+
+
+if __name__ == "__main__":
+    main()
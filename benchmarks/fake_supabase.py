@@ -0,0 +1,684 @@
+# benchmarks/fake_supabase.py
+"""
+Backend en memoria compatible con la parte del cliente de Supabase/PostgREST que usa la app.
+Permite correr controladores, benchmarks y scripts de verificación sin red:
+filtros y orden reales sobre tablas en memoria, selects embebidos (cliente(nombre)),
+RPCs registradas, auth y storage simulados, y latencia de red configurable.
+
+Uso:
+    fake = FakeSupabase({'venta': [...], 'cliente': [...]}, latencia_ms=40)
+    ctrl = OperacionesController(fake)
+    fake.round_trips  # llamadas a execute()
+"""
+import bisect
+import copy
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+
+# PK por tabla (INSTALL_FINAL_SUPABASE.sql). Por defecto se usa 'id_<tabla>' si existe, o 'id'.
+LLAVES_PRIMARIAS: Dict[str, Tuple[str, ...]] = {
+    'agencia_aliada': ('id_agencia',),
+    'venta_tour': ('id_venta', 'n_linea'),
+    'paquete_tour': ('id_paquete', 'id_tour', 'orden'),
+    'catalogo_tours_imagenes': ('id_tour',),
+    'registro_eliminado': ('id_registro',),
+}
+# PKs generadas con gen_random_uuid()
+LLAVES_UUID = {'itinerario_digital', 'paquete_personalizado'}
+# Columna FK cuando no sigue la convención id_<tabla> (tabla, relación) -> (fk, pk de la relación)
+RELACIONES: Dict[Tuple[str, str], Tuple[str, str]] = {
+    ('venta', 'agencia_aliada'): ('id_agencia_aliada', 'id_agencia'),
+}
+# Tablas con updated_at y registro de bajas (migrations/add_sync_incremental.sql)
+TABLAS_SINCRONIZADAS = {'venta', 'pago', 'venta_tour'}
+
+
+class RespuestaFalsa:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _error(codigo: str, mensaje: str) -> APIError:
+    return APIError({'code': codigo, 'message': mensaje, 'details': None, 'hint': None})
+
+
+def _ahora() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _comparable(a: Any, b: Any) -> Tuple[Any, Any]:
+    """Lleva ambos valores a un tipo comparable (PostgREST compara en el tipo de la columna)."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return str(a).lower(), str(b).lower()
+    if isinstance(a, (int, float)) and isinstance(b, str):
+        try:
+            return a, float(b)
+        except ValueError:
+            return str(a), b
+    if isinstance(a, str) and isinstance(b, (int, float)):
+        try:
+            return float(a), b
+        except ValueError:
+            return a, str(b)
+    if isinstance(a, str) and isinstance(b, str) and len(a) != len(b):
+        # Fechas/timestamps con distinto formato ('2026-01-01' vs '2026-01-01T10:00:00+00:00')
+        try:
+            fa, fb = datetime.fromisoformat(a), datetime.fromisoformat(b)
+            if (fa.tzinfo is None) == (fb.tzinfo is None):
+                return fa, fb
+        except ValueError:
+            pass
+    return a, b
+
+
+def _comparar(op: str, valor: Any, objetivo: Any) -> bool:
+    if op == 'is':
+        if objetivo in (None, 'null'):
+            return valor is None
+        return valor is _a_bool(objetivo)
+    if valor is None:
+        return False
+    if op == 'in':
+        # objetivo = (valores, valores como texto): pertenencia O(1) aun con listas grandes
+        return valor in objetivo[0] or str(valor) in objetivo[1]
+    if op in ('like', 'ilike'):
+        patron = re.escape(str(objetivo)).replace('%', '.*').replace('_', '.').replace('\\*', '.*')
+        return re.fullmatch(patron, str(valor), re.IGNORECASE if op == 'ilike' else 0) is not None
+    a, b = _comparable(valor, objetivo)
+    try:
+        if op == 'eq':
+            return a == b
+        if op == 'neq':
+            return a != b
+        if op == 'gt':
+            return a > b
+        if op == 'gte':
+            return a >= b
+        if op == 'lt':
+            return a < b
+        if op == 'lte':
+            return a <= b
+    except TypeError:
+        return False
+    raise _error('PGRST100', f'Operador no soportado: {op}')
+
+
+def _a_bool(valor: Any) -> Any:
+    if isinstance(valor, str):
+        return {'true': True, 'false': False}.get(valor.lower(), valor)
+    return valor
+
+
+def _dividir_select(columnas: str) -> List[str]:
+    """Divide 'a, b, rel(x, y)' por las comas de primer nivel."""
+    partes, nivel, actual = [], 0, ''
+    for c in columnas:
+        if c == '(':
+            nivel += 1
+        elif c == ')':
+            nivel -= 1
+        if c == ',' and nivel == 0:
+            partes.append(actual.strip())
+            actual = ''
+        else:
+            actual += c
+    if actual.strip():
+        partes.append(actual.strip())
+    return partes
+
+
+def _dividir_logico(texto: str) -> List[str]:
+    """Divide 'a.eq.1,and(b.gt.2,c.eq."x,y")' por las comas de primer nivel (fuera de comillas)."""
+    partes, nivel, actual, comillas = [], 0, '', False
+    for i, c in enumerate(texto):
+        if c == '"' and (i == 0 or texto[i - 1] != '\\'):
+            comillas = not comillas
+        elif not comillas and c == '(':
+            nivel += 1
+        elif not comillas and c == ')':
+            nivel -= 1
+        if c == ',' and nivel == 0 and not comillas:
+            partes.append(actual.strip())
+            actual = ''
+        else:
+            actual += c
+    if actual.strip():
+        partes.append(actual.strip())
+    return partes
+
+
+@lru_cache(maxsize=256)
+def _plan_logico(texto: str) -> Tuple[Tuple[Any, ...], ...]:
+    """Traduce un filtro lógico de PostgREST (or=(...)) a [(op, columna, valor, negado)];
+    los grupos anidados quedan como ('and' | 'or', None, sub-plan, negado)."""
+    plan = []
+    for parte in _dividir_logico(texto):
+        m = re.fullmatch(r'(not\.)?(and|or)\((.*)\)', parte, re.S)
+        if m:
+            plan.append((m.group(2), None, _plan_logico(m.group(3)), bool(m.group(1))))
+            continue
+        columna, op, valor = parte.split('.', 2)
+        negado = op == 'not'
+        if negado:
+            op, valor = valor.split('.', 1)
+        if len(valor) >= 2 and valor[0] == valor[-1] == '"':
+            valor = valor[1:-1].replace('\\"', '"')
+        plan.append((op, columna, valor, negado))
+    return tuple(plan)
+
+
+def _cumple_filtro(fila: Dict[str, Any], op: str, columna: Optional[str], valor: Any, negado: bool) -> bool:
+    if op in ('and', 'or'):
+        resultados = (_cumple_filtro(fila, *f) for f in valor)
+        cumple = all(resultados) if op == 'and' else any(resultados)
+    else:
+        cumple = _comparar(op, fila.get(columna), valor)
+    return cumple != negado
+
+
+@lru_cache(maxsize=256)
+def _plan_select(columnas: str) -> Tuple[Tuple[str, str, str, str], ...]:
+    """Traduce el select a [(tipo, clave de salida, columna o relación, sub-select)] una sola vez."""
+    plan = []
+    for parte in _dividir_select(columnas):
+        if parte == '*':
+            plan.append(('*', '', '', ''))
+            continue
+        m = re.fullmatch(r'(?:(\w+):)?(\w+)(?:!\w+)?\((.*)\)', parte, re.S)
+        if m:
+            plan.append(('rel', m.group(1) or m.group(2), m.group(2), m.group(3)))
+        elif ':' in parte:
+            alias, col = [p.strip() for p in parte.split(':', 1)]
+            plan.append(('col', alias, col, ''))
+        else:
+            plan.append(('col', parte, parte, ''))
+    return tuple(plan)
+
+
+class _Consulta:
+    """Query builder en memoria (select/insert/update/upsert/delete + filtros y modificadores)."""
+
+    def __init__(self, fake: 'FakeSupabase', tabla: str):
+        self.fake = fake
+        self.tabla = tabla
+        self.operacion = 'select'
+        self.columnas = '*'
+        self.datos: Any = None
+        self.on_conflict: Optional[str] = None
+        self.contar: Optional[str] = None
+        self.filtros: List[Tuple[str, str, Any, bool]] = []
+        self.orden: List[Tuple[str, bool, Optional[bool]]] = []
+        self.limite: Optional[int] = None
+        self.desde = 0
+        self.unico: Optional[str] = None
+        self._negar = False
+
+    # --- Operaciones ---
+    def select(self, *columnas: str, count: Optional[str] = None, **kwargs) -> '_Consulta':
+        self.columnas = ', '.join(columnas) if columnas else '*'
+        self.contar = count
+        return self
+
+    def insert(self, datos, count: Optional[str] = None, returning: Any = None, **kwargs) -> '_Consulta':
+        self.operacion, self.datos = 'insert', datos
+        return self
+
+    def upsert(self, datos, on_conflict: str = '', ignore_duplicates: bool = False, **kwargs) -> '_Consulta':
+        self.operacion, self.datos = 'upsert', datos
+        self.on_conflict = on_conflict or None
+        return self
+
+    def update(self, datos: Dict[str, Any], **kwargs) -> '_Consulta':
+        self.operacion, self.datos = 'update', datos
+        return self
+
+    def delete(self, **kwargs) -> '_Consulta':
+        self.operacion = 'delete'
+        return self
+
+    # --- Filtros ---
+    def _filtro(self, op: str, columna: str, valor: Any) -> '_Consulta':
+        self.filtros.append((op, columna, valor, self._negar))
+        self._negar = False
+        return self
+
+    @property
+    def not_(self) -> '_Consulta':
+        self._negar = True
+        return self
+
+    def eq(self, columna, valor): return self._filtro('eq', columna, valor)
+    def neq(self, columna, valor): return self._filtro('neq', columna, valor)
+    def gt(self, columna, valor): return self._filtro('gt', columna, valor)
+    def gte(self, columna, valor): return self._filtro('gte', columna, valor)
+    def lt(self, columna, valor): return self._filtro('lt', columna, valor)
+    def lte(self, columna, valor): return self._filtro('lte', columna, valor)
+    def like(self, columna, patron): return self._filtro('like', columna, patron)
+    def ilike(self, columna, patron): return self._filtro('ilike', columna, patron)
+    def is_(self, columna, valor): return self._filtro('is', columna, valor)
+    def in_(self, columna, valores: Iterable):
+        valores = list(valores)
+        return self._filtro('in', columna, (set(valores), {str(v) for v in valores}))
+
+    def or_(self, filtros: str, reference_table: Optional[str] = None) -> '_Consulta':
+        return self._filtro('or', None, _plan_logico(filtros))
+
+    def match(self, criterios: Dict[str, Any]) -> '_Consulta':
+        for columna, valor in criterios.items():
+            self._filtro('eq', columna, valor)
+        return self
+
+    # --- Modificadores ---
+    def order(self, columna: str, *, desc: bool = False, nullsfirst: Optional[bool] = None, **kwargs) -> '_Consulta':
+        self.orden.append((columna, desc, nullsfirst))
+        return self
+
+    def limit(self, n: int, **kwargs) -> '_Consulta':
+        self.limite = n
+        return self
+
+    def offset(self, n: int, **kwargs) -> '_Consulta':
+        self.desde = n
+        return self
+
+    def range(self, inicio: int, fin: int, **kwargs) -> '_Consulta':
+        self.desde, self.limite = inicio, fin - inicio + 1
+        return self
+
+    def single(self) -> '_Consulta':
+        self.unico = 'single'
+        return self
+
+    def maybe_single(self) -> '_Consulta':
+        self.unico = 'maybe'
+        return self
+
+    # --- Ejecución ---
+    def _cumple(self, fila: Dict[str, Any]) -> bool:
+        return all(_cumple_filtro(fila, *filtro) for filtro in self.filtros)
+
+    def _ordenar(self, filas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Orden estable aplicado desde la última clave a la primera
+        for columna, desc, nullsfirst in reversed(self.orden):
+            nulos_primero = desc if nullsfirst is None else nullsfirst  # default de Postgres
+            con_valor = [f for f in filas if f.get(columna) is not None]
+            sin_valor = [f for f in filas if f.get(columna) is None]
+            con_valor.sort(key=lambda f: _comparable(f[columna], f[columna])[0], reverse=desc)
+            filas = sin_valor + con_valor if nulos_primero else con_valor + sin_valor
+        return filas
+
+    def _proyectar(self, fila: Dict[str, Any], columnas: str, tabla: str) -> Dict[str, Any]:
+        resultado: Dict[str, Any] = {}
+        for tipo, clave, origen, sub in _plan_select(columnas):
+            if tipo == '*':
+                resultado.update(fila)
+            elif tipo == 'rel':
+                resultado[clave] = self.fake._embebido(tabla, fila, origen, sub, self._proyectar)
+            else:
+                resultado[clave] = fila.get(origen)
+        return resultado
+
+    def execute(self) -> RespuestaFalsa:
+        return self.fake._ejecutar(self)
+
+
+class _RpcFalsa:
+    def __init__(self, fake: 'FakeSupabase', nombre: str, params: Dict[str, Any]):
+        self.fake = fake
+        self.nombre = nombre
+        self.params = params
+
+    def execute(self) -> RespuestaFalsa:
+        return self.fake._ejecutar_rpc(self)
+
+
+class _AuthFalso:
+    """Auth simulado: acepta cualquier usuario registrado en `usuarios` (email -> contraseña)."""
+
+    def __init__(self, usuarios: Optional[Dict[str, str]] = None):
+        self.usuarios = usuarios or {}
+        self.sesion = None
+
+    def sign_in_with_password(self, credenciales: Dict[str, str]):
+        email, password = credenciales.get('email'), credenciales.get('password')
+        if self.usuarios and self.usuarios.get(email) != password:
+            raise Exception('Invalid login credentials')
+        usuario = type('Usuario', (), {'id': str(uuid.uuid5(uuid.NAMESPACE_DNS, email or '')), 'email': email})()
+        self.sesion = type('Sesion', (), {'user': usuario, 'session': {'access_token': 'fake'}})()
+        return self.sesion
+
+    def sign_out(self):
+        self.sesion = None
+
+
+class _BucketFalso:
+    def __init__(self, archivos: Dict[str, bytes], bucket: str):
+        self.archivos = archivos
+        self.bucket = bucket
+
+    def upload(self, path: str, file: Any, file_options: Optional[Dict[str, Any]] = None):
+        contenido = file if isinstance(file, (bytes, bytearray)) else file.read()
+        self.archivos[f'{self.bucket}/{path}'] = bytes(contenido)
+        return {'Key': f'{self.bucket}/{path}'}
+
+    def get_public_url(self, path: str, *args, **kwargs) -> str:
+        return f'https://fake.supabase.local/storage/v1/object/public/{self.bucket}/{path}'
+
+    def download(self, path: str) -> bytes:
+        return self.archivos[f'{self.bucket}/{path}']
+
+    def exists(self, path: str) -> bool:
+        return f'{self.bucket}/{path}' in self.archivos
+
+    def remove(self, paths: List[str]):
+        for p in paths:
+            self.archivos.pop(f'{self.bucket}/{p}', None)
+        return [{'name': p} for p in paths]
+
+
+class _StorageFalso:
+    def __init__(self):
+        self.archivos: Dict[str, bytes] = {}
+
+    def from_(self, bucket: str) -> _BucketFalso:
+        return _BucketFalso(self.archivos, bucket)
+
+
+def _rpcs_por_defecto() -> Dict[str, Callable[..., Any]]:
+    """Las RPC de agregación se calculan con su implementación de referencia en Python puro."""
+    from controllers.agregados_gerencia import AGREGADOS as AGREGADOS_GERENCIA
+    from controllers.agregados_operaciones import AGREGADOS as AGREGADOS_OPERACIONES
+
+    def envolver(tablas, funcion):
+        return lambda fake, **params: funcion(**{t: fake.tablas.get(t, []) for t in tablas}, **params)
+
+    agregados = {**AGREGADOS_GERENCIA, **AGREGADOS_OPERACIONES}
+    return {nombre: envolver(tablas, funcion) for nombre, (tablas, funcion) in agregados.items()}
+
+
+class FakeSupabase:
+    """Cliente de Supabase en memoria.
+
+    tablas:      {tabla: [filas]} (se copian)
+    latencia_ms: latencia fija por execute(); jitter_ms añade ruido uniforme
+    ms_por_kb:   costo extra por KB de respuesta (simula ancho de banda)
+    rpcs:        {nombre: funcion(fake, **params)}; por defecto las de Gerencia y Operaciones.
+                 Una RPC no registrada responde PGRST202, como una función no instalada.
+    """
+
+    def __init__(self, tablas: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                 latencia_ms: float = 0.0, jitter_ms: float = 0.0, ms_por_kb: float = 0.0,
+                 rpcs: Optional[Dict[str, Callable[..., Any]]] = None,
+                 usuarios: Optional[Dict[str, str]] = None, semilla: Optional[int] = None):
+        self.tablas: Dict[str, List[Dict[str, Any]]] = {t: [dict(f) for f in filas] for t, filas in (tablas or {}).items()}
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.ms_por_kb = ms_por_kb
+        self.rpcs = _rpcs_por_defecto() if rpcs is None else rpcs
+        self.auth = _AuthFalso(usuarios)
+        self.storage = _StorageFalso()
+        self._azar = random.Random(semilla)
+        self._lock = threading.RLock()
+        self._indices: Dict[Tuple[str, str], Dict[Any, List[Dict[str, Any]]]] = {}
+        self._secuencias: Dict[str, int] = {}
+        self._pks: Dict[str, set] = {}
+
+        # Contadores para benchmarks
+        self.round_trips = 0
+        self.bytes_respuesta = 0
+        self.tiempo_servidor_ms = 0.0
+        self.llamadas: List[Tuple[str, str]] = []
+
+    # --- API pública del cliente ---
+    def table(self, nombre: str) -> _Consulta:
+        return _Consulta(self, nombre)
+
+    def from_(self, nombre: str) -> _Consulta:
+        return self.table(nombre)
+
+    def rpc(self, nombre: str, params: Optional[Dict[str, Any]] = None, *args, **kwargs) -> _RpcFalsa:
+        return _RpcFalsa(self, nombre, params or {})
+
+    def reiniciar_contadores(self) -> None:
+        with self._lock:
+            self.round_trips = 0
+            self.bytes_respuesta = 0
+            self.tiempo_servidor_ms = 0.0
+            self.llamadas = []
+
+    # --- Esquema ---
+    def llave_primaria(self, tabla: str) -> Tuple[str, ...]:
+        if tabla in LLAVES_PRIMARIAS:
+            return LLAVES_PRIMARIAS[tabla]
+        filas = self.tablas.get(tabla) or []
+        candidata = f'id_{tabla}'
+        if not filas or candidata in filas[0]:
+            return (candidata,)
+        return ('id',)
+
+    def _indice(self, tabla: str, columna: str) -> Dict[Any, List[Dict[str, Any]]]:
+        """{valor: [filas]} de una columna; se reconstruye tras escribir en la tabla."""
+        llave = (tabla, columna)
+        if llave not in self._indices:
+            indice: Dict[Any, List[Dict[str, Any]]] = {}
+            for fila in self.tablas.get(tabla, []):
+                indice.setdefault(fila.get(columna), []).append(fila)
+            self._indices[llave] = indice
+        return self._indices[llave]
+
+    def _indice_ordenado(self, tabla: str, columna: str) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """(valores ordenados, filas en ese orden) de una columna, sin nulos."""
+        llave = (tabla, f'<{columna}')
+        if llave not in self._indices:
+            filas = sorted((f for f in self.tablas.get(tabla, []) if f.get(columna) is not None),
+                           key=lambda f: f[columna])
+            self._indices[llave] = ([f[columna] for f in filas], filas)
+        return self._indices[llave]
+
+    def _candidatas(self, q: _Consulta, tabla: List[Dict[str, Any]]) -> Tuple[Iterable[Dict[str, Any]], bool]:
+        """Reduce las filas a revisar con un índice (igualdad, IN o rango sobre una columna).
+        Retorna (filas candidatas, ya_ordenadas según q.orden). Los filtros se vuelven a aplicar después."""
+        if not tabla:
+            return tabla, False
+        for op, columna, valor, negado in q.filtros:
+            if negado:
+                continue
+            muestra = next((f[columna] for f in tabla[:50] if f.get(columna) is not None), None)
+            if muestra is None:
+                continue
+            tipo = str if isinstance(muestra, str) else (int, float)
+            if op == 'eq' and isinstance(valor, tipo) and not isinstance(valor, bool):
+                return self._indice(q.tabla, columna).get(valor, []), False
+            if op == 'in' and all(isinstance(v, tipo) and not isinstance(v, bool) for v in valor[0]):
+                indice = self._indice(q.tabla, columna)
+                return [f for v in valor[0] for f in indice.get(v, [])], False
+            if op in ('gt', 'gte', 'lt', 'lte'):
+                # Rango: solo si los valores son comparables tal cual (mismo tipo y formato)
+                rango = [(o, v) for o, c, v, n in q.filtros
+                         if c == columna and not n and o in ('gt', 'gte', 'lt', 'lte')]
+                if not all(isinstance(v, tipo) and not isinstance(v, bool) and
+                           (tipo is not str or len(v) == len(muestra)) for _, v in rango):
+                    continue
+                valores, filas = self._indice_ordenado(q.tabla, columna)
+                inicio, fin = 0, len(valores)
+                for o, v in rango:
+                    if o == 'gt':
+                        inicio = max(inicio, bisect.bisect_right(valores, v))
+                    elif o == 'gte':
+                        inicio = max(inicio, bisect.bisect_left(valores, v))
+                    elif o == 'lt':
+                        fin = min(fin, bisect.bisect_left(valores, v))
+                    else:
+                        fin = min(fin, bisect.bisect_right(valores, v))
+                return (filas[i] for i in range(inicio, fin)), q.orden == [(columna, False, None)]
+        # Sin filtro indexable pero con orden ascendente por una columna sin nulos (primera página keyset)
+        if len(q.orden) == 1 and q.orden[0][1:] == (False, None) and tabla[0].get(q.orden[0][0]) is not None:
+            valores, filas = self._indice_ordenado(q.tabla, q.orden[0][0])
+            if len(filas) == len(tabla):
+                return filas, True
+        return tabla, False
+
+    def _embebido(self, tabla: str, fila: Dict[str, Any], relacion: str, columnas: str, proyectar) -> Any:
+        fk, pk = RELACIONES.get((tabla, relacion), (f'id_{relacion}', self.llave_primaria(relacion)[0]))
+        if fk in fila:
+            # Muchos a uno: objeto o None
+            valor = fila.get(fk)
+            destino = self._indice(relacion, pk).get(valor) if valor is not None else None
+            return proyectar(destino[0], columnas, relacion) if destino else None
+        # Uno a muchos: lista de filas que apuntan a esta
+        pk_origen = self.llave_primaria(tabla)[0]
+        return [proyectar(r, columnas, relacion) for r in self._indice(relacion, pk_origen).get(fila.get(pk_origen), [])]
+
+    def _completar_llave(self, tabla: str, fila: Dict[str, Any]) -> None:
+        llave = self.llave_primaria(tabla)
+        if len(llave) != 1 or fila.get(llave[0]) is not None:
+            return
+        if tabla in LLAVES_UUID:
+            fila[llave[0]] = str(uuid.UUID(int=self._azar.getrandbits(128), version=4))
+            return
+        if tabla not in self._secuencias:
+            existentes = (f.get(llave[0]) for f in self.tablas.get(tabla, []))
+            self._secuencias[tabla] = max((v for v in existentes if isinstance(v, int)), default=0)
+        self._secuencias[tabla] += 1
+        fila[llave[0]] = self._secuencias[tabla]
+
+    def _llaves_existentes(self, tabla: str) -> set:
+        if tabla not in self._pks:
+            llave = self.llave_primaria(tabla)
+            self._pks[tabla] = {tuple(f.get(c) for c in llave) for f in self.tablas.get(tabla, [])}
+        return self._pks[tabla]
+
+    def _invalidar_indices(self, tabla: str) -> None:
+        for llave in [k for k in self._indices if k[0] in (tabla, 'registro_eliminado')]:
+            del self._indices[llave]
+
+    def _registrar_baja(self, tabla: str, fila: Dict[str, Any]) -> None:
+        if tabla not in TABLAS_SINCRONIZADAS:
+            return
+        baja = {'tabla': tabla, 'pk': {c: fila.get(c) for c in self.llave_primaria(tabla)}, 'eliminado_en': _ahora()}
+        self._completar_llave('registro_eliminado', baja)
+        self.tablas.setdefault('registro_eliminado', []).append(baja)
+
+    # --- Ejecución ---
+    def _simular_red(self, datos: Any) -> int:
+        tamano = len(json.dumps(datos, default=str)) if datos is not None else 0
+        espera = self.latencia_ms + (self._azar.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        espera += self.ms_por_kb * tamano / 1024
+        if espera > 0:
+            time.sleep(espera / 1000)
+        return tamano
+
+    def _contabilizar(self, tabla: str, operacion: str, tamano: int) -> None:
+        with self._lock:
+            self.round_trips += 1
+            self.bytes_respuesta += tamano
+            self.llamadas.append((tabla, operacion))
+
+    def _ejecutar(self, q: _Consulta) -> RespuestaFalsa:
+        with self._lock:
+            inicio = time.perf_counter()
+            if q.operacion != 'select':
+                self._invalidar_indices(q.tabla)
+            datos, conteo = self._aplicar(q)
+            if q.operacion != 'select':
+                self._invalidar_indices(q.tabla)
+            self.tiempo_servidor_ms += (time.perf_counter() - inicio) * 1000
+            if q.operacion != 'select':
+                # Las escrituras devuelven las filas vivas de la tabla; el select ya proyecta copias
+                datos = copy.deepcopy(datos)
+        # La espera de red va fuera del lock: las consultas en paralelo se solapan como en la realidad
+        self._contabilizar(q.tabla, q.operacion, self._simular_red(datos))
+        return RespuestaFalsa(datos, conteo)
+
+    def _aplicar(self, q: _Consulta) -> Tuple[Any, Optional[int]]:
+        tabla = self.tablas.setdefault(q.tabla, [])
+
+        if q.operacion in ('insert', 'upsert'):
+            nuevas = q.datos if isinstance(q.datos, list) else [q.datos]
+            resultado = []
+            conflicto = tuple(c.strip() for c in q.on_conflict.split(',')) if q.on_conflict else self.llave_primaria(q.tabla)
+            for datos in nuevas:
+                fila = dict(datos)
+                existente = None
+                if q.operacion == 'upsert' and all(fila.get(c) is not None for c in conflicto):
+                    candidatos = self._indice(q.tabla, conflicto[0]).get(fila[conflicto[0]], [])
+                    existente = next((f for f in candidatos if all(f.get(c) == fila[c] for c in conflicto)), None)
+                if existente is not None:
+                    existente.update(fila)
+                    fila = existente
+                else:
+                    self._completar_llave(q.tabla, fila)
+                    valor_pk = tuple(fila.get(c) for c in self.llave_primaria(q.tabla))
+                    existentes = self._llaves_existentes(q.tabla)
+                    if valor_pk in existentes:
+                        raise _error('23505', f'duplicate key value violates unique constraint "{q.tabla}_pkey"')
+                    existentes.add(valor_pk)
+                    tabla.append(fila)
+                    if q.operacion == 'upsert':
+                        self._indice(q.tabla, conflicto[0]).setdefault(fila.get(conflicto[0]), []).append(fila)
+                if q.tabla in TABLAS_SINCRONIZADAS:
+                    fila['updated_at'] = _ahora()
+                resultado.append(fila)
+            return resultado, len(resultado)
+
+        candidatas, ordenadas = self._candidatas(q, tabla)
+        if ordenadas and q.operacion == 'select' and q.limite is not None and not q.contar:
+            # Ya vienen en orden: basta con recorrer hasta completar la página
+            filas = list(itertools.islice((f for f in candidatas if q._cumple(f)), q.desde + q.limite))
+        else:
+            filas = [f for f in candidatas if q._cumple(f)]
+
+        if q.operacion == 'update':
+            if set(q.datos) & set(self.llave_primaria(q.tabla)):
+                self._pks.pop(q.tabla, None)
+            for f in filas:
+                f.update(q.datos)
+                if q.tabla in TABLAS_SINCRONIZADAS:
+                    f['updated_at'] = _ahora()
+            return filas, len(filas)
+
+        if q.operacion == 'delete':
+            ids = {id(f) for f in filas}
+            self.tablas[q.tabla] = [f for f in tabla if id(f) not in ids]
+            self._pks.pop(q.tabla, None)
+            for f in filas:
+                self._registrar_baja(q.tabla, f)
+            return filas, len(filas)
+
+        conteo = len(filas) if q.contar else None
+        if not ordenadas:
+            filas = q._ordenar(filas)
+        fin = None if q.limite is None else q.desde + q.limite
+        filas = [q._proyectar(f, q.columnas, q.tabla) for f in filas[q.desde:fin]]
+
+        if q.unico == 'single':
+            if len(filas) != 1:
+                raise _error('PGRST116', f'JSON object requested, multiple (or no) rows returned ({len(filas)})')
+            return filas[0], conteo
+        if q.unico == 'maybe':
+            if len(filas) > 1:
+                raise _error('PGRST116', 'JSON object requested, multiple rows returned')
+            return (filas[0] if filas else None), conteo
+        return filas, conteo
+
+    def _ejecutar_rpc(self, r: _RpcFalsa) -> RespuestaFalsa:
+        if r.nombre not in self.rpcs:
+            self._contabilizar(f'rpc:{r.nombre}', 'rpc', self._simular_red(None))
+            raise _error('PGRST202', f'Could not find the function public.{r.nombre} in the schema cache')
+        with self._lock:
+            inicio = time.perf_counter()
+            datos = copy.deepcopy(self.rpcs[r.nombre](self, **r.params))
+            self.tiempo_servidor_ms += (time.perf_counter() - inicio) * 1000
+        self._contabilizar(f'rpc:{r.nombre}', 'rpc', self._simular_red(datos))
+        return RespuestaFalsa(datos)
@@ -0,0 +1,447 @@
+# benchmarks/generador_datos.py
+"""
+Generador determinista de datos sintéticos para pruebas de carga y benchmarks.
+Con la misma semilla produce siempre las mismas filas (también al generarlas por lotes),
+con estacionalidad de Cusco: temporada alta de mayo a setiembre (pico de junio a agosto por
+Inti Raymi y vacaciones), meses intermedios en abril y octubre, temporada baja de diciembre a
+marzo y el Camino Inca cerrado en febrero.
+
+Tablas: vendedor, agencia_aliada, tour, proveedor, lead, cliente, venta, venta_tour,
+venta_servicio_proveedor (guías y endosos) y pago (USD/PEN con tipo de cambio).
+Las PK se generan de forma explícita (secuenciales desde 1) para que las FK cuadren sin
+consultar la base: cargar en una base de pruebas vacía y ajustar las secuencias después
+(ver populate_mock_data.py).
+"""
+import math
+import random
+from itertools import accumulate
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Columnas por tabla, en orden de carga (respeta las FK)
+COLUMNAS: Dict[str, Tuple[str, ...]] = {
+    'vendedor': ('id_vendedor', 'nombre', 'email', 'estado', 'fecha_ingreso'),
+    'agencia_aliada': ('id_agencia', 'nombre', 'pais', 'celular'),
+    'tour': ('id_tour', 'nombre', 'duracion_dias', 'precio_adulto_extranjero', 'precio_adulto_nacional',
+             'categoria', 'dificultad', 'activo'),
+    'proveedor': ('id_proveedor', 'nombre_comercial', 'servicios_ofrecidos', 'ciudad', 'activo'),
+    'lead': ('id_lead', 'nombre', 'nombre_pasajero', 'id_vendedor', 'numero_celular', 'red_social', 'estado_lead',
+             'estrategia_venta', 'whatsapp', 'fecha_seguimiento', 'fecha_creacion', 'pais_origen'),
+    'cliente': ('id_cliente', 'id_lead', 'nombre', 'tipo_cliente', 'pais', 'genero', 'documento_identidad',
+                'fecha_registro'),
+    'venta': ('id_venta', 'id_cliente', 'id_vendedor', 'fecha_venta', 'fecha_inicio', 'fecha_fin',
+              'precio_total_cierre', 'costo_total', 'utilidad_bruta', 'moneda', 'tipo_cambio', 'estado_pago',
+              'estado_venta', 'canal_venta', 'estado_liquidacion', 'id_agencia_aliada', 'tour_nombre',
+              'num_pasajeros', 'id_itinerario_digital', 'url_itinerario', 'cancelada', 'updated_at'),
+    'venta_tour': ('id_venta', 'n_linea', 'id_tour', 'fecha_servicio', 'cantidad_pasajeros', 'precio_applied',
+                   'costo_applied', 'observaciones', 'id_itinerario_dia_index', 'estado_servicio',
+                   'estado_pago_operativo', 'es_endoso', 'updated_at'),
+    'venta_servicio_proveedor': ('id', 'id_venta', 'n_linea', 'id_proveedor', 'tipo_servicio', 'costo_acordado',
+                                 'moneda', 'estado_pago'),
+    'pago': ('id_pago', 'id_venta', 'fecha_pago', 'monto_pagado', 'moneda', 'tipo_cambio', 'metodo_pago',
+             'tipo_pago', 'updated_at'),
+}
+
+# Columna serial de cada tabla (para ajustar la secuencia tras cargar con PK explícitas)
+SECUENCIAS: Dict[str, str] = {
+    'vendedor': 'id_vendedor', 'agencia_aliada': 'id_agencia', 'tour': 'id_tour', 'proveedor': 'id_proveedor',
+    'lead': 'id_lead', 'cliente': 'id_cliente', 'venta': 'id_venta', 'venta_servicio_proveedor': 'id',
+    'pago': 'id_pago',
+}
+
+# Demanda relativa por mes de servicio en Cusco
+FACTOR_MES = {1: 0.55, 2: 0.45, 3: 0.6, 4: 0.85, 5: 1.15, 6: 1.5, 7: 1.6, 8: 1.45, 9: 1.1, 10: 0.9, 11: 0.75, 12: 0.7}
+# Semana del Inti Raymi (24 de junio)
+INTI_RAYMI = ((6, 20), (6, 26))
+
+# (nombre, días, precio extranjero USD, precio nacional PEN, categoría, dificultad, popularidad, camino_inca)
+CATALOGO_TOURS = [
+    ('CITY TOUR CUSCO', 1, 25.0, 50.0, 'CULTURAL', 'FACIL', 10, False),
+    ('VALLE SAGRADO VIP', 1, 45.0, 90.0, 'CULTURAL', 'FACIL', 9, False),
+    ('MACHU PICCHU FULL DAY', 1, 320.0, 650.0, 'CULTURAL', 'MODERADO', 12, False),
+    ('MACHU PICCHU BY CAR 2D', 2, 260.0, 520.0, 'CULTURAL', 'MODERADO', 4, False),
+    ('MONTAÑA DE COLORES', 1, 40.0, 80.0, 'AVENTURA', 'DIFICIL', 8, False),
+    ('LAGUNA HUMANTAY', 1, 40.0, 80.0, 'AVENTURA', 'DIFICIL', 7, False),
+    ('MARAS Y MORAY', 1, 30.0, 60.0, 'CULTURAL', 'FACIL', 5, False),
+    ('VALLE SUR', 1, 25.0, 50.0, 'CULTURAL', 'FACIL', 3, False),
+    ('PALCCOYO', 1, 45.0, 90.0, 'AVENTURA', 'MODERADO', 3, False),
+    ('WAQRAPUKARA', 1, 50.0, 100.0, 'AVENTURA', 'DIFICIL', 2, False),
+    ('CAMINO INCA CLÁSICO 4D', 4, 750.0, 1500.0, 'TREKKING', 'DIFICIL', 4, True),
+    ('CAMINO INCA CORTO 2D', 2, 520.0, 1050.0, 'TREKKING', 'MODERADO', 3, True),
+    ('SALKANTAY TREK 5D', 5, 550.0, 1100.0, 'TREKKING', 'DIFICIL', 3, False),
+    ('CHOQUEQUIRAO 4D', 4, 480.0, 960.0, 'TREKKING', 'EXTREMO', 1, False),
+]
+
+NOMBRES_PE = ['Luis', 'Rosa', 'Carlos', 'María', 'Jorge', 'Ana', 'José', 'Carmen', 'Miguel', 'Lucía',
+              'Raúl', 'Elena', 'Víctor', 'Sofía', 'Diego', 'Milagros', 'Renzo', 'Flor', 'César', 'Patricia']
+APELLIDOS_PE = ['Quispe', 'Mamani', 'Huamán', 'Condori', 'Flores', 'Rojas', 'Gutiérrez', 'Vargas', 'Chávez',
+                'Ccoyo', 'Ojeda', 'Torres', 'Ramos', 'Cusi', 'Paucar', 'Choque', 'Salazar', 'Mendoza']
+NOMBRES_EXT = ['John', 'Emma', 'Michael', 'Olivia', 'Lukas', 'Hannah', 'Pierre', 'Camille', 'Lucas', 'Julia',
+               'Takumi', 'Yuki', 'Liam', 'Chloe', 'Mateo', 'Valentina', 'Noah', 'Mia', 'Oliver', 'Charlotte']
+APELLIDOS_EXT = ['Smith', 'Johnson', 'Brown', 'Müller', 'Schmidt', 'Martin', 'Bernard', 'Rossi', 'García',
+                 'Silva', 'Santos', 'Tanaka', 'Wilson', 'Taylor', 'Dubois', 'Fernández', 'Anderson', 'Kim']
+# (país, peso, prefijo telefónico)
+PAISES_EXT = [('Estados Unidos', 28, '+1'), ('Reino Unido', 9, '+44'), ('Alemania', 9, '+49'),
+              ('Francia', 8, '+33'), ('España', 8, '+34'), ('Brasil', 7, '+55'), ('Argentina', 6, '+54'),
+              ('Chile', 6, '+56'), ('México', 5, '+52'), ('Canadá', 5, '+1'), ('Australia', 4, '+61'),
+              ('Japón', 3, '+81'), ('Italia', 2, '+39')]
+_PESOS_PAISES = list(accumulate(p[1] for p in PAISES_EXT))
+AGENCIAS = [('Andean Trails Travel', 'Estados Unidos'), ('Inka Expeditions', 'Perú'), ('Condor Path Tours', 'Reino Unido'),
+            ('Sumaq Travel', 'Perú'), ('Pachamama Reisen', 'Alemania'), ('Voyages Andins', 'Francia'),
+            ('Ruta Inca Viajes', 'España'), ('Amazonas Turismo', 'Brasil'), ('Patagonia & Andes', 'Argentina'),
+            ('Lima Tours Partner', 'Perú'), ('Cusco Explorer DMC', 'Perú'), ('Sacred Valley Agency', 'Canadá'),
+            ('Titicaca Travel', 'Perú'), ('Andes Nippon Tours', 'Japón'), ('Southern Cross Travel', 'Australia')]
+
+
+def _opciones(valores: List[Any], pesos: List[float]) -> Tuple[List[Any], List[float]]:
+    """(valores, pesos acumulados) para `random.choices(..., cum_weights=...)`."""
+    return valores, list(accumulate(pesos))
+
+
+REDES = _opciones(['WhatsApp', 'Instagram', 'Facebook', 'Web', 'TikTok', 'Referido'], [30, 22, 18, 15, 10, 5])
+CANALES_DIRECTOS = _opciones(['DIRECTO', 'WEB', 'WHATSAPP', 'REDES'], [30, 25, 30, 15])
+METODOS_USD = _opciones(['TARJETA', 'PAYPAL', 'TRANSFERENCIA', 'EFECTIVO'], [40, 25, 25, 10])
+METODOS_PEN = _opciones(['YAPE', 'PLIN', 'TRANSFERENCIA', 'EFECTIVO', 'TARJETA'], [35, 15, 25, 15, 10])
+ESTADOS_LEAD = _opciones(['NUEVO', 'CONTACTADO', 'COTIZADO', 'CALIENTE', 'DESCARTADO'], [10, 25, 25, 10, 30])
+DIAS_EXTRANJERO = _opciones([1, 2, 3, 4, 5, 6, 7], [25, 10, 15, 20, 15, 8, 7])
+DIAS_NACIONAL = _opciones([1, 2, 3, 4], [45, 25, 20, 10])
+PAX_EXTRANJERO = _opciones([1, 2, 3, 4, 5, 6], [20, 40, 12, 15, 6, 7])
+PAX_NACIONAL = _opciones([1, 2, 3, 4, 5, 6, 7, 8], [10, 25, 15, 20, 12, 8, 5, 5])
+
+LINEAS_POR_VENTA = 3  # promedio aproximado de filas de venta_tour por venta
+NUM_VENDEDORES = 10
+NUM_GUIAS = 60
+NUM_OPERADORES = 15
+
+
+def _elegir(azar: random.Random, opciones: Tuple[List[Any], List[float]]) -> Any:
+    return azar.choices(opciones[0], cum_weights=opciones[1])[0]
+
+
+def _ts(fecha: date) -> str:
+    return f'{fecha.isoformat()}T12:00:00+00:00'
+
+
+class GeneradorDatos:
+    """Genera `num_ventas` ventas con sus leads, clientes, servicios y pagos.
+    Los servicios empiezan desde `desde` (las ventas pueden ser anteriores) y `desde + dias` hace
+    de "hoy": no hay ventas posteriores, los servicios anteriores están completados y con guía
+    y los posteriores (hasta 4 meses) pendientes."""
+
+    def __init__(self, num_ventas: int, semilla: int = 42, desde: date = date(2025, 1, 1), dias: int = 730,
+                 leads_por_venta: float = 1.5):
+        self.num_ventas = num_ventas
+        self.semilla = semilla
+        self.desde = desde
+        self.dias = dias
+        self.corte = desde + timedelta(days=dias)
+        self.leads_por_venta = leads_por_venta
+
+        # Fechas posibles de inicio de servicio (hasta 4 meses después del corte) y su peso acumulado
+        self._fechas = [desde + timedelta(days=i) for i in range(dias + 120)]
+        acumulado, self._pesos_acumulados = 0.0, []
+        for f in self._fechas:
+            peso = FACTOR_MES[f.month]
+            if INTI_RAYMI[0] <= (f.month, f.day) <= INTI_RAYMI[1]:
+                peso *= 1.4
+            acumulado += peso
+            self._pesos_acumulados.append(acumulado)
+
+    # --- Tablas de referencia ---
+
+    def catalogos(self) -> Dict[str, List[Dict[str, Any]]]:
+        azar = random.Random(self.semilla)
+        vendedores = []
+        for i in range(1, NUM_VENDEDORES + 1):
+            nombre = f'{NOMBRES_PE[(i * 7) % len(NOMBRES_PE)]} {APELLIDOS_PE[(i * 5) % len(APELLIDOS_PE)]}'
+            vendedores.append({
+                'id_vendedor': i, 'nombre': nombre, 'email': f'vendedor{i}@viajescusco.pe',
+                'estado': 'INACTIVO' if i > NUM_VENDEDORES - 2 else 'ACTIVO',
+                'fecha_ingreso': (self.desde - timedelta(days=azar.randint(30, 900))).isoformat(),
+            })
+        agencias = [{
+            'id_agencia': i, 'nombre': nombre, 'pais': pais,
+            'celular': f'+51 9{azar.randint(10_000_000, 99_999_999)}',
+        } for i, (nombre, pais) in enumerate(AGENCIAS, start=1)]
+        tours = [{
+            'id_tour': i, 'nombre': t[0], 'duracion_dias': t[1], 'precio_adulto_extranjero': t[2],
+            'precio_adulto_nacional': t[3], 'categoria': t[4], 'dificultad': t[5], 'activo': True,
+        } for i, t in enumerate(CATALOGO_TOURS, start=1)]
+        proveedores = []
+        for i in range(1, NUM_GUIAS + 1):
+            nombre = f'{NOMBRES_PE[i % len(NOMBRES_PE)]} {APELLIDOS_PE[(i * 3) % len(APELLIDOS_PE)]} {i}'
+            proveedores.append({'id_proveedor': i, 'nombre_comercial': f'Guía {nombre}',
+                                'servicios_ofrecidos': ['GUIA'], 'ciudad': 'Cusco', 'activo': True})
+        for j in range(1, NUM_OPERADORES + 1):
+            proveedores.append({'id_proveedor': NUM_GUIAS + j, 'nombre_comercial': f'Operador Andino {j}',
+                                'servicios_ofrecidos': ['PROVEEDOR_ENDOSO', 'TRANSPORTE'], 'ciudad': 'Cusco',
+                                'activo': True})
+        return {'vendedor': vendedores, 'agencia_aliada': agencias, 'tour': tours, 'proveedor': proveedores}
+
+    # --- Transaccionales ---
+
+    def _tipo_cambio(self, fecha: date) -> float:
+        """Tipo de cambio PEN/USD que oscila suavemente con la fecha (determinista)."""
+        n = (fecha - self.desde).days
+        return round(3.75 + 0.08 * math.sin(n / 45) + 0.03 * math.sin(n / 7), 4)
+
+    def _itinerario(self, azar: random.Random, num_dias: int, inicio: date, extranjero: bool) -> List[int]:
+        """Lista de índices de CATALOGO_TOURS, uno por día (los tours de varios días se repiten)."""
+        dias: List[int] = []
+        usados = set()
+        while len(dias) < num_dias:
+            restantes = num_dias - len(dias)
+            fecha = inicio + timedelta(days=len(dias))
+            candidatos, pesos = [], []
+            for i, t in enumerate(CATALOGO_TOURS):
+                if i in usados or t[1] > restantes:
+                    continue
+                # El Camino Inca cierra en febrero por mantenimiento
+                if t[7] and any((fecha + timedelta(days=d)).month == 2 for d in range(t[1])):
+                    continue
+                candidatos.append(i)
+                pesos.append(t[6] if extranjero or t[4] != 'TREKKING' else t[6] / 3)
+            if not candidatos:
+                candidatos, pesos = [0], [1]
+            elegido = azar.choices(candidatos, pesos)[0]
+            usados.add(elegido)
+            dias.extend([elegido] * CATALOGO_TOURS[elegido][1])
+        return dias
+
+    def _persona(self, azar: random.Random, extranjero: bool) -> Tuple[str, str, str, str]:
+        """(nombre, país, prefijo telefónico, género)"""
+        genero = azar.choice(['M', 'F'])
+        if extranjero:
+            pais, _, prefijo = azar.choices(PAISES_EXT, cum_weights=_PESOS_PAISES)[0]
+            return f'{azar.choice(NOMBRES_EXT)} {azar.choice(APELLIDOS_EXT)}', pais, prefijo, genero
+        return f'{azar.choice(NOMBRES_PE)} {azar.choice(APELLIDOS_PE)} {azar.choice(APELLIDOS_PE)}', 'Perú', '+51', genero
+
+    def lotes(self, ventas_por_lote: int = 10_000) -> Iterator[Dict[str, List[Dict[str, Any]]]]:
+        """Genera los datos por lotes ({tabla: filas}) en orden de FK: primero los catálogos y luego
+        bloques de `ventas_por_lote` ventas con sus leads, clientes, servicios y pagos.
+        El resultado no depende del tamaño del lote."""
+        yield self.catalogos()
+
+        azar = random.Random(self.semilla + 1)
+        corte = self.corte
+        tours_ids = list(range(1, len(CATALOGO_TOURS) + 1))
+        vendedores_activos = list(range(1, NUM_VENDEDORES - 1))
+        id_lead = id_cliente = id_pago = id_vsp = 0
+
+        lote = {t: [] for t in ('lead', 'cliente', 'venta', 'venta_tour', 'venta_servicio_proveedor', 'pago')}
+        for id_venta in range(1, self.num_ventas + 1):
+            # 1. Fechas: inicio del servicio según la estacionalidad; la venta se cierra antes
+            b2b = azar.random() < 0.25
+            inicio = fecha_venta = None
+            for _ in range(20):
+                inicio = azar.choices(self._fechas, cum_weights=self._pesos_acumulados)[0]
+                mes_nacional = inicio.month in (7, 12)
+                extranjero = b2b or azar.random() > (0.45 if mes_nacional else 0.3)
+                anticipacion = int(azar.triangular(3, 60, 10) if b2b else
+                                   azar.triangular(10, 150, 45) if extranjero else azar.triangular(2, 45, 10))
+                fecha_venta = inicio - timedelta(days=anticipacion)
+                if fecha_venta < corte:
+                    break
+            else:
+                fecha_venta = corte - timedelta(days=1)
+
+            num_dias = _elegir(azar, DIAS_EXTRANJERO if extranjero else DIAS_NACIONAL)
+            pax = azar.randint(2, 12) if b2b else _elegir(azar, PAX_EXTRANJERO if extranjero else PAX_NACIONAL)
+            plan = self._itinerario(azar, num_dias, inicio, extranjero)
+            fin = inicio + timedelta(days=len(plan) - 1)
+            moneda = 'USD' if extranjero else 'PEN'
+            tipo_cambio = self._tipo_cambio(fecha_venta)
+            id_vendedor = azar.choice(vendedores_activos)
+            cancelada = azar.random() < 0.04
+
+            # 2. Lead y cliente (B2C desde un lead convertido; algunos clientes repiten)
+            nombre, pais, prefijo, genero = self._persona(azar, extranjero)
+            if b2b:
+                id_cliente += 1
+                cliente_venta = id_cliente
+                lote['cliente'].append({
+                    'id_cliente': id_cliente, 'id_lead': None, 'nombre': nombre, 'tipo_cliente': 'B2B', 'pais': pais,
+                    'genero': genero, 'documento_identidad': f'P{azar.randint(10_000_000, 99_999_999)}',
+                    'fecha_registro': _ts(fecha_venta),
+                })
+            elif id_cliente > 50 and azar.random() < 0.07:
+                cliente_venta = azar.randint(1, id_cliente)
+            else:
+                id_lead += 1
+                creado = fecha_venta - timedelta(days=azar.randint(0, 21))
+                lote['lead'].append({
+                    'id_lead': id_lead, 'nombre': nombre, 'nombre_pasajero': nombre, 'id_vendedor': id_vendedor,
+                    'numero_celular': f'{prefijo} 9{azar.randint(10_000_000, 99_999_999)}',
+                    'red_social': _elegir(azar, REDES), 'estado_lead': 'CONVERTIDO',
+                    'estrategia_venta': azar.choice(['Opciones', 'Matriz', 'General']), 'whatsapp': True,
+                    'fecha_seguimiento': None, 'fecha_creacion': _ts(creado),
+                    'pais_origen': 'Extranjero' if extranjero else 'Nacional',
+                })
+                id_cliente += 1
+                cliente_venta = id_cliente
+                documento = (f'P{azar.randint(10_000_000, 99_999_999)}' if extranjero
+                             else f'{azar.randint(10_000_000, 79_999_999)}')
+                lote['cliente'].append({
+                    'id_cliente': id_cliente, 'id_lead': id_lead, 'nombre': nombre, 'tipo_cliente': 'B2C',
+                    'pais': pais, 'genero': genero, 'documento_identidad': documento, 'fecha_registro': _ts(fecha_venta),
+                })
+
+            # Leads que no llegaron a venta, alrededor de la misma fecha
+            extra = int(self.leads_por_venta) + (1 if azar.random() < self.leads_por_venta % 1 else 0)
+            for _ in range(extra):
+                id_lead += 1
+                creado = min(fecha_venta + timedelta(days=azar.randint(-20, 20)), corte - timedelta(days=1))
+                lead_ext = azar.random() < 0.6
+                nombre_l, _, prefijo_l, _ = self._persona(azar, lead_ext)
+                estado = _elegir(azar, ESTADOS_LEAD)
+                if (corte - creado).days > 30 and estado in ('NUEVO', 'CALIENTE'):
+                    estado = 'DESCARTADO'
+                seguimiento = creado + timedelta(days=azar.randint(1, 10))
+                lote['lead'].append({
+                    'id_lead': id_lead, 'nombre': nombre_l, 'nombre_pasajero': nombre_l,
+                    'id_vendedor': azar.choice(vendedores_activos),
+                    'numero_celular': f'{prefijo_l} 9{azar.randint(10_000_000, 99_999_999)}',
+                    'red_social': _elegir(azar, REDES), 'estado_lead': estado,
+                    'estrategia_venta': azar.choice(['Opciones', 'Matriz', 'General']),
+                    'whatsapp': azar.random() < 0.85,
+                    'fecha_seguimiento': seguimiento.isoformat() if estado not in ('DESCARTADO',) else None,
+                    'fecha_creacion': _ts(creado), 'pais_origen': 'Extranjero' if lead_ext else 'Nacional',
+                })
+
+            # 3. Servicios (un día por línea) con guía o endoso
+            precio_total = costo_total = 0.0
+            servicios_pasados = True
+            lineas_venta = []
+            for n, idx in enumerate(plan, start=1):
+                t = CATALOGO_TOURS[idx]
+                fecha = inicio + timedelta(days=n - 1)
+                pasado = fecha < corte
+                servicios_pasados = servicios_pasados and pasado
+                precio = (t[2] if extranjero else t[3]) * pax / t[1]
+                if b2b:
+                    precio *= 0.85  # tarifa neta para agencias
+                costo = precio * azar.uniform(0.55, 0.7)
+                probabilidad_endoso = 0.7 if t[4] == 'TREKKING' else 0.2 if b2b else 0.08
+                es_endoso = azar.random() < probabilidad_endoso
+                estado_servicio = 'CANCELADO' if cancelada else 'COMPLETADO' if pasado else 'PENDIENTE'
+                lineas_venta.append({
+                    'id_venta': id_venta, 'n_linea': n, 'id_tour': tours_ids[idx], 'fecha_servicio': fecha.isoformat(),
+                    'cantidad_pasajeros': pax, 'precio_applied': round(precio, 2), 'costo_applied': round(costo, 2),
+                    'observaciones': f'Día {n - plan.index(idx)} de {t[1]}' if t[1] > 1 else None,
+                    'id_itinerario_dia_index': n, 'estado_servicio': estado_servicio,
+                    'estado_pago_operativo': ('PAGADO' if pasado else 'PENDIENTE') if es_endoso else 'NO_REQUERIDO',
+                    'es_endoso': es_endoso,
+                    'updated_at': _ts(min(fecha, corte - timedelta(days=1)) if pasado else fecha_venta),
+                })
+                precio_total += precio
+                if cancelada:
+                    continue
+
+                if es_endoso:
+                    id_vsp += 1
+                    lote['venta_servicio_proveedor'].append({
+                        'id': id_vsp, 'id_venta': id_venta, 'n_linea': n,
+                        'id_proveedor': NUM_GUIAS + azar.randint(1, NUM_OPERADORES), 'tipo_servicio': 'PROVEEDOR_ENDOSO',
+                        'costo_acordado': round(costo, 2), 'moneda': moneda,
+                        'estado_pago': 'PAGADO' if pasado else 'PENDIENTE',
+                    })
+                    costo_total += round(costo, 2)
+                    continue
+
+                # Guía: casi siempre en servicios pasados; en futuros, más probable cuanto más cerca
+                faltan = (fecha - corte).days
+                probabilidad_guia = 0.97 if pasado else 0.6 if faltan <= 14 else 0.15
+                if azar.random() < probabilidad_guia:
+                    id_vsp += 1
+                    tarifa = azar.uniform(120, 220)  # jornada de guía en soles
+                    costo_guia = round(tarifa if moneda == 'PEN' else tarifa / tipo_cambio, 2)
+                    lote['venta_servicio_proveedor'].append({
+                        'id': id_vsp, 'id_venta': id_venta, 'n_linea': n, 'id_proveedor': azar.randint(1, NUM_GUIAS),
+                        'tipo_servicio': 'GUIA', 'costo_acordado': costo_guia, 'moneda': moneda,
+                        'estado_pago': 'PAGADO' if pasado else 'PENDIENTE',
+                    })
+                    costo_total += costo_guia
+            lote['venta_tour'].extend(lineas_venta)
+
+            # 4. Pagos hasta la fecha de corte
+            precio_total = round(precio_total, 2)
+            pagos = []
+            if b2b:
+                # Las agencias liquidan después del servicio
+                fecha_liquidacion = fin + timedelta(days=azar.randint(5, 30))
+                if not cancelada and fecha_liquidacion < corte:
+                    pagos.append((fecha_liquidacion, precio_total, 'TOTAL'))
+            elif azar.random() < 0.2:
+                pagos.append((fecha_venta, precio_total, 'TOTAL'))
+            elif azar.random() < 0.9:
+                adelanto = round(precio_total * azar.uniform(0.3, 0.5), 2)
+                pagos.append((fecha_venta, adelanto, 'ADELANTO'))
+                fecha_saldo = inicio - timedelta(days=azar.randint(0, 2))
+                if not cancelada and fecha_saldo < corte:
+                    pagos.append((max(fecha_saldo, fecha_venta), round(precio_total - adelanto, 2), 'SALDO'))
+            metodos = METODOS_USD if moneda == 'USD' else METODOS_PEN
+            pagado = 0.0
+            for fecha_pago, monto, tipo in pagos:
+                if monto <= 0:
+                    continue
+                id_pago += 1
+                pagado += monto
+                lote['pago'].append({
+                    'id_pago': id_pago, 'id_venta': id_venta, 'fecha_pago': fecha_pago.isoformat(),
+                    'monto_pagado': monto, 'moneda': moneda, 'tipo_cambio': self._tipo_cambio(fecha_pago),
+                    'metodo_pago': _elegir(azar, metodos), 'tipo_pago': tipo, 'updated_at': _ts(fecha_pago),
+                })
+
+            # 5. Cabecera de la venta
+            if cancelada:
+                estado_venta = 'CANCELADO'
+                estado_pago = 'REEMBOLSADO' if pagado else 'PENDIENTE'
+            else:
+                estado_venta = 'COMPLETADO' if fin < corte else 'EN_VIAJE' if inicio < corte else 'CONFIRMADO'
+                estado_pago = 'COMPLETADO' if pagado >= precio_total else 'PARCIAL' if pagado else 'PENDIENTE'
+            ultima = max([fecha_venta] + [p[0] for p in pagos] + [min(fin, corte - timedelta(days=1))])
+            costo_total = round(costo_total, 2)
+            lote['venta'].append({
+                'id_venta': id_venta, 'id_cliente': cliente_venta, 'id_vendedor': id_vendedor,
+                'fecha_venta': fecha_venta.isoformat(), 'fecha_inicio': inicio.isoformat(), 'fecha_fin': fin.isoformat(),
+                'precio_total_cierre': precio_total, 'costo_total': costo_total,
+                'utilidad_bruta': round(precio_total - costo_total, 2), 'moneda': moneda, 'tipo_cambio': tipo_cambio,
+                'estado_pago': estado_pago, 'estado_venta': estado_venta,
+                'canal_venta': 'B2B' if b2b else _elegir(azar, CANALES_DIRECTOS),
+                'estado_liquidacion': 'FINALIZADO' if servicios_pasados and (corte - fin).days > 30 else 'PENDIENTE',
+                'id_agencia_aliada': azar.randint(1, len(AGENCIAS)) if b2b else None,
+                'tour_nombre': (CATALOGO_TOURS[plan[0]][0] if len(set(plan)) == 1
+                                else f'Cusco {len(plan)}D/{max(len(plan) - 1, 1)}N'),
+                'num_pasajeros': pax, 'id_itinerario_digital': None, 'url_itinerario': None,
+                'cancelada': cancelada, 'updated_at': _ts(ultima),
+            })
+
+            if id_venta % ventas_por_lote == 0:
+                yield lote
+                lote = {t: [] for t in lote}
+        if lote['venta']:
+            yield lote
+
+    def tablas(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Todas las tablas en memoria (para el backend en memoria de los benchmarks)."""
+        tablas: Dict[str, List[Dict[str, Any]]] = {t: [] for t in COLUMNAS}
+        for lote in self.lotes():
+            for tabla, filas in lote.items():
+                tablas[tabla].extend(filas)
+        return tablas
+
+
+def ventas_para_filas(filas_venta_tour: int) -> int:
+    """Número de ventas que produce aproximadamente `filas_venta_tour` líneas de servicio."""
+    return max(1, filas_venta_tour // LINEAS_POR_VENTA)
+
+
+def valor_copy(valor: Optional[Any]) -> Any:
+    """Valor de una celda para COPY ... (FORMAT csv): NULL vacío, booleanos y arreglos de Postgres."""
+    if valor is None:
+        return None
+    if isinstance(valor, bool):
+        return 'true' if valor else 'false'
+    if isinstance(valor, list):
+        return '{' + ','.join(f'"{v}"' for v in valor) + '}'
+    return valor
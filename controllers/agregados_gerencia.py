@@ -0,0 +1,66 @@
+# controllers/agregados_gerencia.py
+"""
+Versión en Python puro de las funciones RPC de migrations/add_rpc_gerencia.sql.
+Implementación de referencia para un backend local (sin pandas). El respaldo en la
+app, cuando la función no está instalada, lo calcula SnapshotGerencia.
+"""
+from typing import Any, Callable, Dict, List, Tuple
+
+Filas = List[Dict[str, Any]]
+
+
+def _sumar_por(filas: Filas, clave: str, valor: str, nombre_clave: str, nombre_valor: str) -> Filas:
+    totales: Dict[Any, float] = {}
+    for f in filas:
+        if f.get(clave) is None:
+            continue
+        totales[f[clave]] = totales.get(f[clave], 0) + (f.get(valor) or 0)
+    return [{nombre_clave: k, nombre_valor: v} for k, v in totales.items()]
+
+
+def _contar_por(filas: Filas, clave: str) -> Filas:
+    conteo: Dict[Any, int] = {}
+    for f in filas:
+        if f.get(clave) is None:
+            continue
+        conteo[f[clave]] = conteo.get(f[clave], 0) + 1
+    return [{'estado': k, 'cantidad': v} for k, v in conteo.items()]
+
+
+def kpis_financieros(venta: Filas, pago: Filas) -> Filas:
+    return [{
+        'ventas_totales': sum(v.get('precio_total_cierre') or 0 for v in venta),
+        'total_recaudado': sum(p.get('monto_pagado') or 0 for p in pago)
+    }]
+
+
+def pax_totales(venta_tour: Filas) -> int:
+    return sum(s.get('cantidad_pasajeros') or 0 for s in venta_tour)
+
+
+def ventas_por_canal(venta: Filas) -> Filas:
+    return _sumar_por(venta, 'canal_venta', 'precio_total_cierre', 'canal', 'monto')
+
+
+def ventas_por_estado(venta: Filas) -> Filas:
+    return _contar_por(venta, 'estado_venta')
+
+
+def ventas_mensuales(venta: Filas) -> Filas:
+    filas = [{'mes': str(v['fecha_venta'])[:7], 'monto': v.get('precio_total_cierre')} for v in venta if v.get('fecha_venta')]
+    return _sumar_por(filas, 'mes', 'monto', 'mes', 'ventas')
+
+
+def distribucion_estados_leads(lead: Filas) -> Filas:
+    return _contar_por(lead, 'estado_lead')
+
+
+# nombre RPC -> ({tabla: columnas necesarias}, función pura que recibe las tablas como kwargs)
+AGREGADOS: Dict[str, Tuple[Dict[str, str], Callable[..., Any]]] = {
+    'gerencia_kpis_financieros': ({'venta': 'precio_total_cierre', 'pago': 'monto_pagado'}, kpis_financieros),
+    'gerencia_pax_totales': ({'venta_tour': 'cantidad_pasajeros'}, pax_totales),
+    'gerencia_ventas_por_canal': ({'venta': 'canal_venta, precio_total_cierre'}, ventas_por_canal),
+    'gerencia_ventas_por_estado': ({'venta': 'estado_venta'}, ventas_por_estado),
+    'gerencia_ventas_mensuales': ({'venta': 'fecha_venta, precio_total_cierre'}, ventas_mensuales),
+    'gerencia_distribucion_estados_leads': ({'lead': 'estado_lead'}, distribucion_estados_leads),
+}
@@ -0,0 +1,77 @@
+# controllers/agregados_operaciones.py
+"""
+Versión en Python puro de migrations/add_rpc_resumen_mes.sql.
+Implementación de referencia para un backend local y respaldo de la app cuando la
+función no está instalada (calcular_resumen_local).
+"""
+from typing import Any, Callable, Dict, List, Tuple
+
+from .concurrencia import ejecutar_en_paralelo
+
+Filas = List[Dict[str, Any]]
+
+# Un servicio con saldo mayor a esto tiene pago pendiente (mismo umbral que ServicioOperativo.saldado)
+TOLERANCIA_SALDO = 0.1
+
+
+def resumen_mes(venta_tour: Filas, venta: Filas, pago: Filas, venta_servicio_proveedor: Filas,
+                p_desde: str, p_hasta: str) -> Filas:
+    """Una fila por día con servicios en [p_desde, p_hasta): servicios, pax, sin_guia y pago_pendiente.
+    Como el tablero de operaciones, no cuenta los servicios de ventas B2B (con id_agencia_aliada)."""
+    b2b = {v['id_venta'] for v in venta if v.get('id_agencia_aliada') is not None}
+    servicios = [s for s in venta_tour
+                 if s.get('fecha_servicio') and p_desde <= str(s['fecha_servicio'])[:10] < p_hasta
+                 and s['id_venta'] not in b2b]
+    ids_ventas = {s['id_venta'] for s in servicios}
+
+    precios = {v['id_venta']: v.get('precio_total_cierre') or 0 for v in venta if v['id_venta'] in ids_ventas}
+    pagado: Dict[Any, float] = {}
+    for p in pago:
+        if p.get('id_venta') in ids_ventas:
+            pagado[p['id_venta']] = pagado.get(p['id_venta'], 0) + (p.get('monto_pagado') or 0)
+    con_guia = {(g['id_venta'], g['n_linea']) for g in venta_servicio_proveedor if g.get('tipo_servicio') == 'GUIA'}
+
+    dias: Dict[str, Dict[str, Any]] = {}
+    for s in servicios:
+        fecha = str(s['fecha_servicio'])[:10]
+        dia = dias.setdefault(fecha, {'fecha': fecha, 'servicios': 0, 'pax': 0, 'sin_guia': 0, 'pago_pendiente': 0})
+        dia['servicios'] += 1
+        dia['pax'] += s.get('cantidad_pasajeros') or 0
+        # Los servicios endosados los opera el proveedor: no requieren guía propio
+        if not s.get('es_endoso') and (s['id_venta'], s['n_linea']) not in con_guia:
+            dia['sin_guia'] += 1
+        if precios.get(s['id_venta'], 0) - pagado.get(s['id_venta'], 0) > TOLERANCIA_SALDO:
+            dia['pago_pendiente'] += 1
+    return [dias[f] for f in sorted(dias)]
+
+
+# nombre RPC -> ({tabla: columnas necesarias}, función pura que recibe las tablas y los parámetros)
+AGREGADOS: Dict[str, Tuple[Dict[str, str], Callable[..., Any]]] = {
+    'operaciones_resumen_mes': ({'venta_tour': 'id_venta, n_linea, fecha_servicio, cantidad_pasajeros, es_endoso',
+                                 'venta': 'id_venta, precio_total_cierre, id_agencia_aliada',
+                                 'pago': 'id_venta, monto_pagado',
+                                 'venta_servicio_proveedor': 'id_venta, n_linea, tipo_servicio'}, resumen_mes),
+}
+
+
+def calcular_resumen_local(client, p_desde: str, p_hasta: str) -> Filas:
+    """Respaldo sin la RPC: los servicios del rango y, en paralelo, solo sus ventas, pagos y guías."""
+    tablas, _ = AGREGADOS['operaciones_resumen_mes']
+    servicios = (
+        client.table('venta_tour').select(tablas['venta_tour'])
+        .gte('fecha_servicio', p_desde).lt('fecha_servicio', p_hasta)
+        .execute().data or []
+    )
+    if not servicios:
+        return []
+
+    ids_ventas = list({s['id_venta'] for s in servicios})
+    datos = ejecutar_en_paralelo({
+        'venta': lambda: client.table('venta').select(tablas['venta']).in_('id_venta', ids_ventas).execute().data or [],
+        'pago': lambda: client.table('pago').select(tablas['pago']).in_('id_venta', ids_ventas).execute().data or [],
+        'venta_servicio_proveedor': lambda: (
+            client.table('venta_servicio_proveedor').select(tablas['venta_servicio_proveedor'])
+            .in_('id_venta', ids_ventas).eq('tipo_servicio', 'GUIA').execute().data or []
+        ),
+    })
+    return resumen_mes(servicios, datos['venta'], datos['pago'], datos['venta_servicio_proveedor'], p_desde, p_hasta)
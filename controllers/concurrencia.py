@@ -0,0 +1,22 @@
+# controllers/concurrencia.py
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+# Pool compartido por el proceso: las consultas a Supabase son I/O (HTTP), por lo que
+# varios hilos permiten solapar la latencia de red en lugar de sumarla.
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='sgvo-io')
+
+
+def ejecutar_en_paralelo(tareas: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """Ejecuta funciones independientes en el pool y retorna {nombre: resultado}.
+    Si una tarea lanza una excepción, ésta se propaga al llamador.
+    Cada tarea corre con una copia del contexto del llamador (p. ej. el rerun instrumentado)."""
+    futuros = {nombre: _POOL.submit(contextvars.copy_context().run, funcion) for nombre, funcion in tareas.items()}
+    return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+
+def en_segundo_plano(funcion: Callable[..., Any], *args) -> Future:
+    """Envía una tarea al pool sin esperarla (p. ej. subidas al terminar un trabajo de PDF).
+    No copia el contexto: la tarea puede seguir corriendo después de que termine el rerun."""
+    return _POOL.submit(funcion, *args)
@@ -0,0 +1,146 @@
+# controllers/enriquecimiento_servicios.py
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from models.cache_referencias import obtener_mapa_nombres
+from .concurrencia import ejecutar_en_paralelo
+
+
+@dataclass
+class ServicioOperativo:
+    """Un día de servicio (venta_tour) con los nombres y saldos ya resueltos."""
+    id_venta: int
+    n_linea: int
+    fecha: str
+    servicio: str
+    es_endoso: bool
+    pax: int
+    cliente: str
+    guia: str
+    agencia_endoso: str
+    saldo: float
+    dia_itinerario: int
+    id_itinerario: Optional[str]
+    url_itinerario: str
+    id_proveedor: Optional[int] = None      # proveedor asignado desde el estructurador de costos
+    info_pago_operativo: str = ''
+
+    @property
+    def saldado(self) -> bool:
+        return self.saldo <= 0.1
+
+
+@dataclass
+class DiaOperativo:
+    """Servicios de un día (ya ordenados) con sus totales; ver OperacionesController.get_servicios_por_dia."""
+    fecha: date
+    servicios: List[Dict[str, Any]] = field(default_factory=list)
+    pax: int = 0
+    sin_guia: int = 0
+    pago_pendiente: int = 0
+
+    @property
+    def total_servicios(self) -> int:
+        return len(self.servicios)
+
+
+def cargar_servicios_enriquecidos(client, start_date: date, end_date: date,
+                                  incluir_b2b: bool = False) -> List[ServicioOperativo]:
+    """
+    Pipeline único del tablero de operaciones (día, semana y rango).
+    1 consulta para venta_tour y luego, en paralelo, venta (+cliente embebido), pagos y guías.
+    Los nombres de tours salen de la caché de referencias.
+    El tablero solo muestra ventas directas; `incluir_b2b` agrega las de agencias (vales de endose).
+    """
+    res_servicios = (
+        client.table('venta_tour')
+        .select('*')
+        .gte('fecha_servicio', start_date.isoformat())
+        .lte('fecha_servicio', end_date.isoformat())
+        .execute()
+    )
+    servicios_data = res_servicios.data or []
+    if not servicios_data:
+        return []
+
+    ids_ventas = list(set([s['id_venta'] for s in servicios_data]))
+
+    def _ventas():
+        res = (
+            client.table('venta')
+            .select('id_venta, id_agencia_aliada, precio_total_cierre, tour_nombre, id_itinerario_digital, url_itinerario, cliente(nombre)')
+            .in_('id_venta', ids_ventas)
+            .execute()
+        )
+        return {v['id_venta']: v for v in (res.data or [])}
+
+    def _pagos():
+        res = client.table('pago').select('id_venta, monto_pagado').in_('id_venta', ids_ventas).execute()
+        pagos = {}
+        for p in (res.data or []):
+            pagos[p['id_venta']] = pagos.get(p['id_venta'], 0) + (p['monto_pagado'] or 0)
+        return pagos
+
+    def _proveedores():
+        # Guías y Endosos (Tabla 'venta_servicio_proveedor' + 'proveedor')
+        res = (
+            client.table('venta_servicio_proveedor')
+            .select('id_venta, n_linea, tipo_servicio, proveedor(nombre_comercial)')
+            .in_('id_venta', ids_ventas)
+            .execute()
+        )
+        guias, endosos = {}, {}
+        for g in (res.data or []):
+            key = (g['id_venta'], g['n_linea'])
+            nombre = g['proveedor']['nombre_comercial'] if g.get('proveedor') else "Desconocido"
+            if g.get('tipo_servicio') == 'GUIA':
+                guias[key] = nombre
+            elif g.get('tipo_servicio') in ('PROVEEDOR_ENDOSO', 'AGENCIA_ENDOSO'):
+                endosos[key] = nombre
+        return guias, endosos
+
+    datos = ejecutar_en_paralelo({
+        'ventas': _ventas,
+        'pagos': _pagos,
+        'proveedores': _proveedores,
+        'tours': lambda: obtener_mapa_nombres(client, 'tour', 'id_tour'),
+    })
+    ventas_map: Dict[Any, Dict[str, Any]] = datos['ventas']
+    pagos_map = datos['pagos']
+    guias_map, endosos_map = datos['proveedores']
+    tours_map = datos['tours']
+
+    resultado = []
+    for s in servicios_data:
+        v = ventas_map.get(s['id_venta'], {})
+
+        # FILTRO: Excluir ventas B2B del tablero diario (solo mostrar ventas directas)
+        if v.get('id_agencia_aliada') is not None and not incluir_b2b:
+            continue
+
+        precio_total = v.get('precio_total_cierre', 0) or 0
+        saldo = float(precio_total - pagos_map.get(s['id_venta'], 0) or 0)
+
+        # Prioridad: 1. Observaciones del día, 2. Catálogo de tours, 3. Nombre general de la venta
+        nombre_tour = s.get('observaciones') or tours_map.get(s.get('id_tour')) or v.get('tour_nombre') or "Tour Desconocido"
+        key = (s['id_venta'], s['n_linea'])
+
+        resultado.append(ServicioOperativo(
+            id_venta=s['id_venta'],
+            n_linea=s['n_linea'],
+            fecha=s['fecha_servicio'],
+            servicio=nombre_tour,
+            es_endoso=s.get('es_endoso', False),
+            pax=s.get('cantidad_pasajeros', 1),
+            cliente=(v.get('cliente') or {}).get('nombre', "Desconocido"),
+            guia=guias_map.get(key, "Por Asignar"),
+            agencia_endoso=endosos_map.get(key, "---"),
+            saldo=saldo,
+            dia_itinerario=s.get('id_itinerario_dia_index', 1),
+            id_itinerario=v.get('id_itinerario_digital'),
+            url_itinerario=v.get('url_itinerario') or "",
+            id_proveedor=s.get('id_proveedor'),
+            info_pago_operativo=s.get('datos_pago_operativo') or ''
+        ))
+    return resultado
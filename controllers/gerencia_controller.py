@@ -3,23 +3,38 @@
 from supabase import Client
 import pandas as pd
 from datetime import date
+from models.cache_referencias import obtener_mapa_nombres
+from controllers.snapshot_gerencia import SnapshotGerencia
 
 class GerenciaController:
+    # RPCs no instaladas (migración add_rpc_gerencia.sql no aplicada): no se reintentan en este proceso
+    _rpc_no_disponibles = set()
+
     def __init__(self, supabase_client: Client):
         self.client = supabase_client
+        # El controlador se crea en cada rerun: cada tabla se descarga como mucho una vez por render
+        self.snapshot = SnapshotGerencia(supabase_client)
+
+    def _agregado(self, nombre_rpc: str):
+        """Obtiene un agregado vía RPC en Postgres; si no está instalado, lo calcula sobre el snapshot."""
+        if nombre_rpc not in self._rpc_no_disponibles:
+            try:
+                return self.client.rpc(nombre_rpc).execute().data
+            except Exception as e:
+                print(f"RPC {nombre_rpc} no disponible, usando cálculo local: {e}")
+                # PGRST202: la función no existe en el esquema (un error de red sí se reintenta)
+                if getattr(e, 'code', None) == 'PGRST202':
+                    self._rpc_no_disponibles.add(nombre_rpc)
+        return self.snapshot.agregado(nombre_rpc)
 
     def get_kpis_financieros(self):
         """Calcula Ventas Totales, Recaudado y Pendiente."""
         try:
-            # 1. Ventas Totales
-            res_ventas = self.client.table('venta').select('precio_total_cierre').execute()
-            ventas_data = res_ventas.data or []
-            total_ventas = sum([v.get('precio_total_cierre') or 0 for v in ventas_data])
-
-            # 2. Pagos Recaudados
-            res_pagos = self.client.table('pago').select('monto_pagado').execute()
-            pagos_data = res_pagos.data or []
-            total_recaudado = sum([p.get('monto_pagado') or 0 for p in pagos_data])
+            # 1. Ventas Totales y 2. Pagos Recaudados (agregados en el servidor)
+            datos = self._agregado('gerencia_kpis_financieros')
+            fila = (datos[0] if datos else {}) if isinstance(datos, list) else (datos or {})
+            total_ventas = float(fila.get('ventas_totales') or 0)
+            total_recaudado = float(fila.get('total_recaudado') or 0)
 
             # 3. Cálculo de Pendiente
             total_pendiente = total_ventas - total_recaudado
@@ -37,22 +52,18 @@ class GerenciaController:
         """Calcula Leads, Clientes y Tasa de Conversión."""
         try:
             # 1. Leads Totales (Sincronizado: estado_lead, red_social)
-            res_leads = self.client.table('lead').select('id_lead, estado_lead, red_social').execute()
-            leads_data = res_leads.data or []
-            total_leads = len(leads_data)
+            df_leads = self.snapshot.tabla('lead')
+            total_leads = len(df_leads)
 
             # 2. Leads Convertidos
-            leads_convertivos = [l for l in leads_data if 'CONVERTIDO' in (l.get('estado_lead') or '').upper()]
-            total_convertidos = len(leads_convertivos)
+            estados = df_leads['estado_lead'].astype('string').str.upper()
+            total_convertidos = int(estados.str.contains('CONVERTIDO', na=False).sum())
 
             # 3. Tasa de Conversión
             tasa_conversion = (total_convertidos / total_leads * 100) if total_leads > 0 else 0
 
             # 4. Distribución por Medio
-            df_leads = pd.DataFrame(leads_data)
-            distribucion_medios = {}
-            if not df_leads.empty and 'red_social' in df_leads.columns:
-                distribucion_medios = df_leads['red_social'].value_counts().to_dict()
+            distribucion_medios = df_leads['red_social'].value_counts().loc[lambda s: s > 0].to_dict()
 
             return {
                 'total_leads': total_leads,
@@ -67,9 +78,7 @@ class GerenciaController:
     def get_pax_totales(self):
         """Calcula el total de pasajeros programados en tours."""
         try:
-            res = self.client.table('venta_tour').select('cantidad_pasajeros').execute()
-            pax_data = res.data or []
-            return sum([p.get('cantidad_pasajeros') or 0 for p in pax_data])
+            return int(self._agregado('gerencia_pax_totales') or 0)
         except Exception as e:
             print(f"Error Gerencia Pax: {e}")
             return 0
@@ -99,16 +108,11 @@ class GerenciaController:
     def get_ventas_mensuales(self):
         """Agrupa ventas por mes para el gráfico de barras."""
         try:
-            res_ventas = self.client.table('venta').select('precio_total_cierre, fecha_venta').execute()
-            if not res_ventas.data:
+            resumen = pd.DataFrame(self._agregado('gerencia_ventas_mensuales') or [])
+            if resumen.empty:
                 return pd.DataFrame()
 
-            df = pd.DataFrame(res_ventas.data)
-            df['fecha_venta'] = pd.to_datetime(df['fecha_venta'])
-            df['Mes'] = df['fecha_venta'].dt.strftime('%Y-%m')
-            
-            resumen = df.groupby('Mes')['precio_total_cierre'].sum().reset_index()
-            resumen.columns = ['Mes', 'Ventas']
+            resumen = resumen.rename(columns={'mes': 'Mes', 'ventas': 'Ventas'})[['Mes', 'Ventas']]
             return resumen.sort_values('Mes')
         except Exception as e:
             print(f"Error Gerencia Mensual: {e}")
@@ -117,36 +121,19 @@ class GerenciaController:
     def get_desempeno_vendedores(self):
         """Calcula Leads vs Ventas por cada vendedor."""
         try:
-            # 1. Obtener Leads con vendedor
-            res_leads = self.client.table('lead').select('id_vendedor, estado_lead').execute()
-            df_leads = pd.DataFrame(res_leads.data or [])
-            
-            # 2. Obtener Ventas con vendedor
-            res_ventas = self.client.table('venta').select('id_vendedor').execute()
-            df_ventas = pd.DataFrame(res_ventas.data or [])
+            # 1. Leads y 2. Ventas por vendedor (snapshot compartido)
+            leads_count = self.snapshot.tabla('lead').groupby('id_vendedor').size()
+            ventas_count = self.snapshot.tabla('venta').groupby('id_vendedor').size()
             
-            # 3. Mapeo de Nombres de Vendedores
-            res_vend = self.client.table('vendedor').select('id_vendedor, nombre').execute()
-            vend_map = {v['id_vendedor']: v['nombre'] for v in res_vend.data}
+            # 3. Mapeo de Nombres de Vendedores (caché compartida)
+            vend_map = obtener_mapa_nombres(self.client, 'vendedor', 'id_vendedor')
             
-            # Procesamiento
-            leads_count = {}
-            if not df_leads.empty:
-                leads_count = df_leads.groupby('id_vendedor').size().to_dict()
-                
-            ventas_count = {}
-            if not df_ventas.empty:
-                ventas_count = df_ventas.groupby('id_vendedor').size().to_dict()
-            
-            data = []
-            for vid, nombre in vend_map.items():
-                data.append({
-                    'Vendedor': nombre,
-                    'Leads': leads_count.get(vid, 0),
-                    'Ventas': ventas_count.get(vid, 0)
-                })
-            
-            return pd.DataFrame(data)
+            ids = pd.Series(list(vend_map.keys()), dtype='Int64')
+            return pd.DataFrame({
+                'Vendedor': list(vend_map.values()),
+                'Leads': ids.map(leads_count).fillna(0).astype(int).values,
+                'Ventas': ids.map(ventas_count).fillna(0).astype(int).values
+            })
         except Exception as e:
             print(f"Error Desempeño Vendedores: {e}")
             return pd.DataFrame()
@@ -154,12 +141,10 @@ class GerenciaController:
     def get_distribucion_estados_leads(self):
         """Obtiene la cantidad de leads en cada estado para un Funnel."""
         try:
-            res = self.client.table('lead').select('estado_lead').execute()
-            df = pd.DataFrame(res.data or [])
-            if df.empty: return pd.DataFrame()
+            resumen = pd.DataFrame(self._agregado('gerencia_distribucion_estados_leads') or [])
+            if resumen.empty: return pd.DataFrame()
             
-            resumen = df.groupby('estado_lead').size().reset_index()
-            resumen.columns = ['Estado', 'Cantidad']
+            resumen = resumen.rename(columns={'estado': 'Estado', 'cantidad': 'Cantidad'})[['Estado', 'Cantidad']]
             return resumen.sort_values('Cantidad', ascending=False)
         except Exception as e:
             print(f"Error Distribución Leads: {e}")
@@ -167,12 +152,10 @@ class GerenciaController:
     def get_ventas_por_canal(self):
         """Obtiene el monto total de ventas por cada canal (WEB, DIRECTO, etc.)."""
         try:
-            res = self.client.table('venta').select('canal_venta, precio_total_cierre').execute()
-            df = pd.DataFrame(res.data or [])
-            if df.empty: return pd.DataFrame()
+            resumen = pd.DataFrame(self._agregado('gerencia_ventas_por_canal') or [])
+            if resumen.empty: return pd.DataFrame()
             
-            resumen = df.groupby('canal_venta')['precio_total_cierre'].sum().reset_index()
-            resumen.columns = ['Canal', 'Monto']
+            resumen = resumen.rename(columns={'canal': 'Canal', 'monto': 'Monto'})[['Canal', 'Monto']]
             return resumen.sort_values('Monto', ascending=False)
         except Exception as e:
             print(f"Error Ventas por Canal: {e}")
@@ -181,12 +164,10 @@ class GerenciaController:
     def get_ventas_por_estado(self):
         """Obtiene la distribución de ventas por estado actual."""
         try:
-            res = self.client.table('venta').select('estado_venta').execute()
-            df = pd.DataFrame(res.data or [])
-            if df.empty: return pd.DataFrame()
+            resumen = pd.DataFrame(self._agregado('gerencia_ventas_por_estado') or [])
+            if resumen.empty: return pd.DataFrame()
             
-            resumen = df.groupby('estado_venta').size().reset_index()
-            resumen.columns = ['Estado', 'Cantidad']
+            resumen = resumen.rename(columns={'estado': 'Estado', 'cantidad': 'Cantidad'})[['Estado', 'Cantidad']]
             return resumen.sort_values('Cantidad', ascending=False)
         except Exception as e:
             print(f"Error Ventas por Estado: {e}")
@@ -195,22 +176,18 @@ class GerenciaController:
     def get_detalle_ventas_limpio(self):
         """Retorna el DataFrame de ventas con nombres de clientes y vendedores para la tabla."""
         try:
-            # 1. Ventas
-            res_v = self.client.table('venta').select('*').execute()
-            df_v = pd.DataFrame(res_v.data or [])
-            if df_v.empty: return df_v
-
-            # 2. Clientes
-            res_c = self.client.table('cliente').select('id_cliente, nombre').execute()
-            cli_map = {c['id_cliente']: c['nombre'] for c in res_c.data}
+            # 1. Ventas (snapshot compartido; copia para no alterar el DataFrame base)
+            df_v = self.snapshot.tabla('venta').copy()
+            if df_v.empty: return pd.DataFrame()
 
-            # 3. Vendedores
-            res_vend = self.client.table('vendedor').select('id_vendedor, nombre').execute()
-            vend_map = {v['id_vendedor']: v['nombre'] for v in res_vend.data}
+            # 2. Clientes y 3. Vendedores (caché compartida)
+            cli_map = obtener_mapa_nombres(self.client, 'cliente', 'id_cliente')
+            vend_map = obtener_mapa_nombres(self.client, 'vendedor', 'id_vendedor')
 
             # Aplicar mapeos
             df_v['Cliente'] = df_v['id_cliente'].map(cli_map).fillna('Desconocido')
             df_v['Vendedor'] = df_v['id_vendedor'].map(vend_map).fillna('Desconocido')
+            df_v['fecha_venta'] = df_v['fecha_venta'].dt.date
             
             # Ordenar columnas para Gerencia (Sincronizado: estado_venta)
             cols = ['fecha_venta', 'Cliente', 'Vendedor', 'canal_venta', 'precio_total_cierre', 'moneda', 'estado_venta']
@@ -1,11 +1,11 @@
 from models.itinerario_digital_model import ItinerarioDigitalModel
 from models.lead_model import LeadModel
 from models.catalogo_imagenes_model import CatalogoImagenesModel
-from .pdf_controller import PDFController
+from models.cache_referencias import obtener_mapa_nombres
+from . import trabajos_pdf
+from .subidas_storage import ServicioSubidas
 from supabase import Client
 from typing import Dict, Any, Optional
-from io import BytesIO
-import datetime
 
 class ItinerarioDigitalController:
     """Controlador que orquesta la persistencia del Itinerario Digital (Cerebro Visual)."""
@@ -15,72 +15,71 @@ class ItinerarioDigitalController:
         self.itinerario_model = ItinerarioDigitalModel(supabase_client)
         self.lead_model = LeadModel('lead', supabase_client)
         self.catalogo_model = CatalogoImagenesModel(supabase_client)
-        self.pdf_engine = PDFController()
+        self.subidas = ServicioSubidas(supabase_client)
 
-    def registrar_generacion_itinerario(self, 
-                                        id_lead: int, 
-                                        nombre_pasajero: str, 
-                                        id_vendedor: int, 
-                                        datos_render: Dict[str, Any]) -> tuple[bool, str, Optional[str]]:
+    def _subir_pdf(self, contenido: bytes) -> Optional[str]:
+        """Sube el PDF al bucket 'itinerarios' y retorna su URL pública (None si falla).
+        Un PDF idéntico a uno ya subido (misma caché de render) reutiliza el objeto existente."""
+        return self.subidas.subir("itinerarios", contenido, "application/pdf", "pdf")
+
+    def encolar_generacion_itinerario(self,
+                                      id_lead: int,
+                                      nombre_pasajero: str,
+                                      id_vendedor: int,
+                                      datos_render: Dict[str, Any]) -> tuple[bool, str, Optional[str]]:
         """
-        Registra un nuevo diseño en la nube, genera el PDF, lo sube y actualiza el Lead.
-        Retorna (Exito, Mensaje, URL_PDF).
+        Guarda el diseño y actualiza el Lead de inmediato, y encola el PDF (render en un
+        proceso aparte, subida y url_pdf al terminar).
+        Retorna (Exito, Mensaje, ID_Trabajo) para consultar el avance con trabajos_pdf.obtener_trabajo.
         """
         try:
-            # 0. Generar PDF Localmente (en memoria)
-            # Pasamos el nombre del pasajero al diccionario de datos para el renderizado
             datos_render["nombre_pasajero"] = nombre_pasajero
-            pdf_buffer = self.pdf_engine.generar_itinerario_pdf(datos_render)
-            
-            if not pdf_buffer:
-                return False, "Error al generar el documento PDF.", None
-
-            # 1. Subir PDF al Storage de Supabase
-            nombre_archivo = f"itinerario_{id_lead}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            try:
-                self.client.storage.from_("itinerarios").upload(
-                    path=nombre_archivo,
-                    file=pdf_buffer.getvalue(),
-                    file_options={"content-type": "application/pdf"}
-                )
-                url_pdf = self.client.storage.from_("itinerarios").get_public_url(nombre_archivo)
-            except Exception as e:
-                print(f"Error subiendo PDF: {e}")
-                url_pdf = None
-
-            # 2. Preparar datos para itinerario_digital
-            datos_itinerario = {
+            self._agregar_fotos_catalogo(datos_render)
+            id_itinerario_digital = self.itinerario_model.registrar_itinerario({
                 "id_lead": id_lead,
                 "id_vendedor": id_vendedor,
                 "nombre_pasajero_itinerario": nombre_pasajero,
                 "datos_render": datos_render,
-                "url_pdf": url_pdf # Guardar el link generado
-            }
-            
-            # 3. Guardar en itinerario_digital y obtener UUID
-            id_itinerario_digital = self.itinerario_model.registrar_itinerario(datos_itinerario)
-            
+                "url_pdf": None  # se completa cuando termina el trabajo
+            })
             if not id_itinerario_digital:
                 return False, "Error al guardar el itinerario digital en la nube.", None
 
-            # 4. Actualizar el Lead
-            actualizacion_lead = {
+            self.lead_model.update_by_id(id_lead, {
                 "nombre_pasajero": nombre_pasajero,
                 "ultimo_itinerario_id": id_itinerario_digital,
                 "estado_lead": "CALIENTE"
-            }
-            
-            self.lead_model.update_by_id(id_lead, actualizacion_lead)
-            
-            return True, f"¡Éxito! Itinerario generado y guardado en la nube.", url_pdf
-                
+            })
+
+            def al_terminar(contenido: bytes) -> Optional[str]:
+                url_pdf = self._subir_pdf(contenido)
+                if url_pdf:
+                    self.itinerario_model.update_by_id(id_itinerario_digital, {"url_pdf": url_pdf})
+                return url_pdf
+
+            id_trabajo = trabajos_pdf.encolar(
+                f"Itinerario {nombre_pasajero}",
+                trabajos_pdf.renderizar_itinerario, (datos_render,),
+                al_terminar
+            )
+            return True, "Itinerario guardado. El PDF se está generando en segundo plano.", id_trabajo
         except Exception as e:
-            print(f"Error en registrar_generacion_itinerario: {e}")
+            print(f"Error en encolar_generacion_itinerario: {e}")
             return False, f"Error crítico: {e}", None
 
-    def get_imagenes_para_tour(self, id_tour: int) -> list:
-        """Helper para obtener las fotos oficiales del catálogo."""
-        return self.catalogo_model.get_imagenes_tour(id_tour)
+    def _agregar_fotos_catalogo(self, datos_render: Dict[str, Any]) -> None:
+        """Completa 'imagenes' de cada día con la foto principal de catalogo_tours_imagenes.
+        El tour se toma de 'id_tour' o, si no viene, del nombre del día (sin distinguir mayúsculas)."""
+        dias = [d for d in datos_render.get("itinerario_detalles") or [] if isinstance(d, dict) and not d.get("imagenes")]
+        if not dias:
+            return
+        ids_por_nombre = {str(nombre).strip().lower(): id_tour
+                          for id_tour, nombre in obtener_mapa_nombres(self.client, 'tour', 'id_tour').items()}
+        ids_dias = [d.get("id_tour") or ids_por_nombre.get(str(d.get("nombre") or "").strip().lower()) for d in dias]
+        portadas = self.catalogo_model.get_portadas_tours(sorted({i for i in ids_dias if i}))
+        for dia, id_tour in zip(dias, ids_dias):
+            if id_tour in portadas:
+                dia["imagenes"] = [portadas[id_tour]]
 
     def get_itinerario_by_id(self, it_id: str) -> Optional[Dict[str, Any]]:
         """Recupera un itinerario específico por su UUID."""
@@ -0,0 +1,102 @@
+# controllers/motor_plantillas.py
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_DIR = os.path.join(RAIZ, 'templates')
+# Bytecode compilado de las plantillas: sobrevive a reinicios y lo comparten los procesos de PDF
+BYTECODE_DIR = os.environ.get('SGVO_JINJA_CACHE_DIR', os.path.join(RAIZ, '.cache', 'jinja'))
+
+_entorno: Optional[Environment] = None
+_lock = threading.Lock()
+
+
+def _crear_entorno() -> Environment:
+    bytecode_cache = None
+    try:
+        os.makedirs(BYTECODE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(BYTECODE_DIR)
+    except Exception as e:
+        print(f"Error creando caché de bytecode Jinja: {e}")
+    # auto_reload: get_template solo vuelve a compilar si cambió el mtime del archivo
+    entorno = Environment(loader=FileSystemLoader(TEMPLATE_DIR), bytecode_cache=bytecode_cache,
+                          auto_reload=True, cache_size=100)
+    for nombre in entorno.list_templates(extensions=['html']):
+        try:
+            entorno.get_template(nombre)
+        except Exception as e:
+            print(f"Error precompilando plantilla {nombre}: {e}")
+    return entorno
+
+
+def obtener_entorno() -> Environment:
+    """Entorno Jinja único del proceso, con todas las plantillas ya compiladas."""
+    global _entorno
+    if _entorno is None:
+        with _lock:
+            if _entorno is None:
+                _entorno = _crear_entorno()
+    return _entorno
+
+
+@dataclass
+class MetricasPlantilla:
+    """Acumulado de renders de una plantilla en este proceso."""
+    plantilla: str
+    solicitudes: int = 0
+    renders: int = 0
+    errores: int = 0
+    html_ms: float = 0.0
+    pdf_ms: float = 0.0
+    max_ms: float = 0.0
+
+    @property
+    def aciertos_cache(self) -> int:
+        return self.solicitudes - self.renders
+
+    @property
+    def promedio_ms(self) -> float:
+        return round((self.html_ms + self.pdf_ms) / self.renders, 1) if self.renders else 0.0
+
+
+_metricas: Dict[str, MetricasPlantilla] = {}
+
+
+def _metrica(plantilla: str) -> MetricasPlantilla:
+    if plantilla not in _metricas:
+        _metricas[plantilla] = MetricasPlantilla(plantilla)
+    return _metricas[plantilla]
+
+
+def registrar_solicitud(plantilla: str) -> None:
+    """Un PDF pedido a _render_pdf (los que no llegan a registrar_render salieron de la caché)."""
+    with _lock:
+        _metrica(plantilla).solicitudes += 1
+
+
+def registrar_render(plantilla: str, html_ms: float, pdf_ms: float, error: bool = False) -> None:
+    """Tiempos de un render real (fallo de caché): Jinja -> HTML y HTML -> PDF."""
+    with _lock:
+        m = _metrica(plantilla)
+        m.renders += 1
+        m.errores += int(error)
+        m.html_ms += html_ms
+        m.pdf_ms += pdf_ms
+        m.max_ms = max(m.max_ms, html_ms + pdf_ms)
+
+
+def metricas_render() -> List[Dict[str, float]]:
+    """Métricas por plantilla (solo del proceso actual; los trabajos en el pool de procesos
+    registran las suyas en cada trabajador)."""
+    with _lock:
+        filas = []
+        for m in _metricas.values():
+            fila = asdict(m)
+            fila.update(aciertos_cache=m.aciertos_cache, promedio_ms=m.promedio_ms,
+                        html_ms=round(m.html_ms, 1), pdf_ms=round(m.pdf_ms, 1), max_ms=round(m.max_ms, 1))
+            filas.append(fila)
+        return filas
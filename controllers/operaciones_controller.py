@@ -1,10 +1,18 @@
 # controllers/operaciones_controller.py
 from models.operaciones_model import VentaModel, PasajeroModel, DocumentacionModel, TareaModel, RequerimientoModel
+from controllers.enriquecimiento_servicios import DiaOperativo, ServicioOperativo, cargar_servicios_enriquecidos
+from controllers.agregados_operaciones import calcular_resumen_local
+from models.cache_referencias import cache_resumen_mes, invalidar_tabla, obtener_mapa_nombres
 from datetime import date, timedelta
+from typing import Any, Dict
+import math
 from supabase import Client
 import pandas as pd
 
 class OperacionesController:
+    # RPCs no instaladas (migración add_rpc_resumen_mes.sql no aplicada): no se reintentan en este proceso
+    _rpc_no_disponibles = set()
+
     # Inyección de dependencia del Cliente Supabase
     def __init__(self, supabase_client: Client):
         self.client = supabase_client
@@ -22,260 +30,162 @@ class OperacionesController:
     # LÓGICA DE TABLERO DE EJECUCIÓN DIARIA (Dashboard #2)
     # ------------------------------------------------------------------
 
-    def get_fechas_con_servicios(self, year: int, month: int):
-        # Limpieza completa de simulación
+    # Nivel de carga del calendario (0 = sin servicios, NIVELES_CARGA = el día más cargado del mes)
+    NIVELES_CARGA = 4
+
+    def get_resumen_mes(self, year: int, month: int) -> Dict[date, Dict[str, int]]:
+        """
+        Resumen por día del mes: {fecha: {servicios, pax, sin_guia, pago_pendiente, nivel}}.
+        Una consulta agrupada (RPC operaciones_resumen_mes) cacheada por mes; escribir en
+        venta_tour, venta, pago o venta_servicio_proveedor invalida la caché.
+        """
         try:
-            start_date = date(year, month, 1)
-            if month == 12:
-                end_date = date(year + 1, 1, 1)
-            else:
-                end_date = date(year, month + 1, 1)
-                
-            res = (
-                self.client.table('venta_tour')
-                .select('fecha_servicio')
-                .gte('fecha_servicio', start_date.isoformat())
-                .lt('fecha_servicio', end_date.isoformat())
-                .execute()
-            )
-            
-            fechas_activas = set()
-            if res.data:
-                for item in res.data:
-                    try:
-                        fechas_activas.add(date.fromisoformat(item['fecha_servicio']))
-                    except: pass
-            return fechas_activas
+            return cache_resumen_mes.obtener('resumen_mes', (year, month), lambda: self._cargar_resumen_mes(year, month))
         except Exception as e:
-            print(f"Error fetching fechas activas: {e}")
-            return set()
+            print(f"Error obteniendo resumen del mes: {e}")
+            return {}
 
-    def get_servicios_rango_fechas(self, start_date: date, end_date: date):
-        try:
-            res_servicios = (
-                self.client.table('venta_tour')
-                .select('*')
-                .gte('fecha_servicio', start_date.isoformat())
-                .lte('fecha_servicio', end_date.isoformat())
-                .execute()
-            )
-            
-            if not res_servicios.data:
-                return []
-                
-            servicios_data = res_servicios.data
-            ids_ventas = list(set([s['id_venta'] for s in servicios_data]))
-            ids_tours = list(set([s['id_tour'] for s in servicios_data if s.get('id_tour')]))
-            
-            ventas_map = {}
-            if ids_ventas:
-                res_v = self.client.table('venta').select('*').in_('id_venta', ids_ventas).execute()
-                for v in res_v.data:
-                    ventas_map[v['id_venta']] = v
-                    
-            tours_map = {}
-            if ids_tours:
-                res_t = self.client.table('tour').select('id_tour, nombre').in_('id_tour', ids_tours).execute()
-                for t in res_t.data:
-                    tours_map[t['id_tour']] = t['nombre']
-            ids_clientes = list(set([v['id_cliente'] for v in ventas_map.values() if v.get('id_cliente')]))
-            clientes_map = {}
-            if ids_clientes:
-                res_c = self.client.table('cliente').select('id_cliente, nombre').in_('id_cliente', ids_clientes).execute()
-                for c in res_c.data:
-                    clientes_map[c['id_cliente']] = c['nombre']
+    def _cargar_resumen_mes(self, year: int, month: int) -> Dict[date, Dict[str, int]]:
+        desde = date(year, month, 1).isoformat()
+        hasta = (date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)).isoformat()
+        filas = None
+        if 'operaciones_resumen_mes' not in self._rpc_no_disponibles:
+            try:
+                filas = self.client.rpc('operaciones_resumen_mes', {'p_desde': desde, 'p_hasta': hasta}).execute().data
+            except Exception as e:
+                print(f"RPC operaciones_resumen_mes no disponible, usando cálculo local: {e}")
+                # PGRST202: la función no existe en el esquema (un error de red sí se reintenta)
+                if getattr(e, 'code', None) == 'PGRST202':
+                    self._rpc_no_disponibles.add('operaciones_resumen_mes')
+        if filas is None:
+            filas = calcular_resumen_local(self.client, desde, hasta)
 
-            # 4. Pagos acumulados
-            pagos_map = {}
-            if ids_ventas:
-                res_p = self.client.table('pago').select('id_venta, monto_pagado').in_('id_venta', ids_ventas).execute()
-                for p in res_p.data:
-                    vid = p['id_venta']
-                    pagos_map[vid] = pagos_map.get(vid, 0) + (p['monto_pagado'] or 0)
+        maximo = max((f['servicios'] for f in filas), default=0)
+        resumen = {}
+        for f in filas:
+            dia = {k: int(f.get(k) or 0) for k in ('servicios', 'pax', 'sin_guia', 'pago_pendiente')}
+            dia['nivel'] = math.ceil(self.NIVELES_CARGA * dia['servicios'] / maximo) if maximo else 0
+            resumen[date.fromisoformat(str(f['fecha'])[:10])] = dia
+        return resumen
 
-            # Guías y Endosos (Tabla 'venta_servicio_proveedor' + 'proveedor')
-            guias_map = {}
-            proveedor_endoso_map = {}
-            if ids_ventas:
-                res_g = (
-                    self.client.table('venta_servicio_proveedor')
-                    .select('id_venta, n_linea, tipo_servicio, proveedor(nombre_comercial)')
-                    .in_('id_venta', ids_ventas)
-                    .execute()
-                )
-                for g in res_g.data:
-                    key = f"{g['id_venta']}-{g['n_linea']}"
-                    if g.get('tipo_servicio') == 'GUIA':
-                        guias_map[key] = g['proveedor']['nombre_comercial'] if g.get('proveedor') else "Desconocido"
-                    elif g.get('tipo_servicio') == 'PROVEEDOR_ENDOSO' or g.get('tipo_servicio') == 'AGENCIA_ENDOSO':
-                        proveedor_endoso_map[key] = g['proveedor']['nombre_comercial'] if g.get('proveedor') else "Desconocido"
-            
-            resultado = []
-            for s in servicios_data:
-                v = ventas_map.get(s['id_venta'], {})
-                
-                # FILTRO: Excluir ventas B2B del tablero diario (solo mostrar ventas directas)
-                if v.get('id_agencia_aliada') is not None:
-                    continue
-                
-                id_cliente = v.get('id_cliente')
-                nombre_cliente = clientes_map.get(id_cliente, "Desconocido")
-                
-                precio_total = v.get('precio_total_cierre', 0) or 0
-                total_pagado = pagos_map.get(s['id_venta'], 0)
-                saldo = precio_total - total_pagado
-                estado_pago = "✅ SALDADO" if float(saldo or 0) <= 0.1 else "🔴 PENDIENTE"
-                
-                # Prioridad: 1. Observaciones del día, 2. Catálogo de tours, 3. Nombre general de la venta
-                nombre_tour = s.get('observaciones') or tours_map.get(s['id_tour']) or v.get('tour_nombre') or "Tour Desconocido"
-                
-                # Guía y Endoso desde el mapa relacional
-                key_g = f"{s['id_venta']}-{s['n_linea']}"
-                nombre_guia = guias_map.get(key_g, "Por Asignar")
-                nombre_endoso = proveedor_endoso_map.get(key_g, "---")
-                es_endoso = s.get('es_endoso', False)
-                
-                resultado.append({
-                    'ID Venta': s['id_venta'],
-                    'N Linea': s['n_linea'],
-                    'Fecha': s['fecha_servicio'],
-                    'Hora': "08:00 AM",
-                    'Servicio': nombre_tour,
-                    'Endoso?': es_endoso,
-                    'Pax': s.get('cantidad_pasajeros', 1),
-                    'Cliente': nombre_cliente,
-                    'Guía': nombre_guia,
-                    'Agencia Endoso': nombre_endoso,
-                    'Estado Pago': estado_pago,
-                    'Tipo': '👤 B2C',
-                    'Día Itin.': s.get('id_itinerario_dia_index', 1),
-                    'ID Itinerario': v.get('id_itinerario_digital'),
-                    'URL Cloud': v.get('url_itinerario') or ""
-                })
-            return resultado
+    def get_fechas_con_servicios(self, year: int, month: int):
+        """Días del mes con al menos un servicio (sale del resumen cacheado del mes)."""
+        return set(self.get_resumen_mes(year, month))
+
+    @staticmethod
+    def _fila_servicio(srv: ServicioOperativo) -> Dict[str, Any]:
+        """Fila de un servicio para las vistas de semana y rango."""
+        return {
+            'ID Venta': srv.id_venta,
+            'N Linea': srv.n_linea,
+            'Fecha': srv.fecha,
+            'Hora': "08:00 AM",
+            'Servicio': srv.servicio,
+            'Endoso?': srv.es_endoso,
+            'Pax': srv.pax,
+            'Cliente': srv.cliente,
+            'Guía': srv.guia,
+            'Agencia Endoso': srv.agencia_endoso,
+            'Estado Pago': "✅ SALDADO" if srv.saldado else "🔴 PENDIENTE",
+            'Tipo': '👤 B2C',
+            'Día Itin.': srv.dia_itinerario,
+            'ID Itinerario': srv.id_itinerario,
+            'URL Cloud': srv.url_itinerario
+        }
+
+    def get_servicios_rango_fechas(self, start_date: date, end_date: date):
+        try:
+            return [self._fila_servicio(srv) for srv in cargar_servicios_enriquecidos(self.client, start_date, end_date)]
         except Exception as e:
             print(f"Error en Rango de Fechas: {e}")
             return []
 
-    def get_servicios_por_fecha(self, fecha_filtro: date):
+    def get_servicios_por_dia(self, start_date: date, end_date: date) -> Dict[date, DiaOperativo]:
+        """
+        {fecha: DiaOperativo} con todos los días del rango (también los vacíos), en orden.
+        Se arma en una sola pasada sobre los servicios; cada día queda ordenado por hora y servicio.
+        Sirve para la semana del tablero o para rangos más largos (planificación a 30 días).
+        """
+        dias = {start_date + timedelta(days=i): DiaOperativo(start_date + timedelta(days=i))
+                for i in range((end_date - start_date).days + 1)}
         try:
-            start_date = fecha_filtro
-            end_date = fecha_filtro + timedelta(days=1)
-            
-            res_servicios = (
-                self.client.table('venta_tour')
-                .select('*')
-                .gte('fecha_servicio', start_date.isoformat())
-                .lt('fecha_servicio', end_date.isoformat())
-                .execute()
-            )
-            
-            if not res_servicios.data:
-                return []
-                
-            servicios_data = res_servicios.data
-            ids_ventas = list(set([s['id_venta'] for s in servicios_data]))
-            ids_tours = list(set([s['id_tour'] for s in servicios_data if s.get('id_tour')]))
-            
-            ventas_map = {}
-            clientes_map = {}
-            if ids_ventas:
-                res_v = self.client.table('venta').select('*').in_('id_venta', ids_ventas).execute()
-                for v in res_v.data:
-                    ventas_map[v['id_venta']] = v
-                    
-            tours_map = {}
-            if ids_tours:
-                res_t = self.client.table('tour').select('id_tour, nombre').in_('id_tour', ids_tours).execute()
-                for t in res_t.data:
-                    tours_map[t['id_tour']] = t['nombre']
-                    
-            ids_clientes = list(set([v['id_cliente'] for v in ventas_map.values() if v.get('id_cliente')]))
-            clientes_map = {}
-            if ids_clientes:
-                res_c = self.client.table('cliente').select('id_cliente, nombre').in_('id_cliente', ids_clientes).execute()
-                for c in res_c.data:
-                    clientes_map[c['id_cliente']] = c['nombre']
-
-            pagos_map = {} 
-            if ids_ventas:
-                res_p = self.client.table('pago').select('id_venta, monto_pagado').in_('id_venta', ids_ventas).execute()
-                for p in res_p.data:
-                    vid = p['id_venta']
-                    pagos_map[vid] = pagos_map.get(vid, 0) + (p['monto_pagado'] or 0)
+            for srv in cargar_servicios_enriquecidos(self.client, start_date, end_date):
+                dia = dias.get(date.fromisoformat(str(srv.fecha)[:10]))
+                if dia is None:
+                    continue
+                dia.servicios.append(self._fila_servicio(srv))
+                dia.pax += srv.pax or 0
+                dia.sin_guia += int(not srv.es_endoso and srv.guia == "Por Asignar")
+                dia.pago_pendiente += int(not srv.saldado)
+            for dia in dias.values():
+                dia.servicios.sort(key=lambda s: (s['Hora'], s['Servicio'], s['ID Venta'], s['N Linea']))
+        except Exception as e:
+            print(f"Error agrupando servicios por día: {e}")
+            return {f: DiaOperativo(f) for f in dias}
+        return dias
 
-            # Guías y Endosos (Tabla 'venta_servicio_proveedor' + 'proveedor')
-            guias_map = {}
-            proveedor_endoso_map = {}
-            if ids_ventas:
-                res_g = (
-                    self.client.table('venta_servicio_proveedor')
-                    .select('id_venta, n_linea, tipo_servicio, proveedor(nombre_comercial)')
-                    .in_('id_venta', ids_ventas)
-                    .execute()
-                )
-                for g in res_g.data:
-                    key = f"{g['id_venta']}-{g['n_linea']}"
-                    if g.get('tipo_servicio') == 'GUIA':
-                        guias_map[key] = g['proveedor']['nombre_comercial'] if g.get('proveedor') else "Desconocido"
-                    elif g.get('tipo_servicio') == 'PROVEEDOR_ENDOSO' or g.get('tipo_servicio') == 'AGENCIA_ENDOSO':
-                        proveedor_endoso_map[key] = g['proveedor']['nombre_comercial'] if g.get('proveedor') else "Desconocido"
-            
+    def get_servicios_por_fecha(self, fecha_filtro: date):
+        try:
             resultado = []
-            for s in servicios_data:
-                v = ventas_map.get(s['id_venta'], {})
-                
-                # FILTRO: Excluir ventas B2B del tablero diario (solo mostrar ventas directas)
-                if v.get('id_agencia_aliada') is not None:
-                    continue
-                
-                id_cliente = v.get('id_cliente')
-                nombre_cliente = clientes_map.get(id_cliente, "Desconocido")
-                
-                precio_total = v.get('precio_total_cierre', 0) or 0
-                total_pagado = pagos_map.get(s['id_venta'], 0)
-                saldo = precio_total - total_pagado
-                estado_pago = "✅ SALDADO" if float(saldo or 0) <= 0.1 else f"🔴 PENDIENTE (${float(saldo or 0):.2f})"
-                
-                # Prioridad: 1. Observaciones del día, 2. Catálogo de tours, 3. Nombre general de la venta
-                nombre_tour = s.get('observaciones') or tours_map.get(s['id_tour']) or v.get('tour_nombre') or "Tour Desconocido"
-                
-                # Guía y Endoso desde el mapa relacional
-                key_g = f"{s['id_venta']}-{s['n_linea']}"
-                nombre_guia = guias_map.get(key_g, "Por Asignar")
-                nombre_endoso = proveedor_endoso_map.get(key_g, "---")
-                
+            for srv in cargar_servicios_enriquecidos(self.client, fecha_filtro, fecha_filtro):
                 # Semáforo de Logística
-                es_endoso = s.get('es_endoso', False)
                 status_log = "🟢"
-                if es_endoso:
-                    if nombre_endoso == "---" or nombre_endoso == "Por Asignar": status_log = "🔴"
+                if srv.es_endoso:
+                    if srv.agencia_endoso == "---" or srv.agencia_endoso == "Por Asignar": status_log = "🔴"
                 else:
-                    if nombre_guia == "Por Asignar": status_log = "🔴"
+                    if srv.guia == "Por Asignar": status_log = "🔴"
 
                 resultado.append({
-                    'ID Servicio': f"{s['id_venta']}-{s['n_linea']}", 
+                    'ID Servicio': f"{srv.id_venta}-{srv.n_linea}", 
                     'Hora': "08:00 AM",
                     'Log.': status_log,
-                    'Servicio': nombre_tour,
-                    'Endoso?': es_endoso,
-                    'Pax': s.get('cantidad_pasajeros', 1),
-                    'Cliente': nombre_cliente,
-                    'Guía': nombre_guia,
-                    'Agencia Endoso': nombre_endoso,
-                    'Estado Pago': estado_pago,
+                    'Servicio': srv.servicio,
+                    'Endoso?': srv.es_endoso,
+                    'Pax': srv.pax,
+                    'Cliente': srv.cliente,
+                    'Guía': srv.guia,
+                    'Agencia Endoso': srv.agencia_endoso,
+                    'Estado Pago': "✅ SALDADO" if srv.saldado else f"🔴 PENDIENTE (${srv.saldo:.2f})",
                     'Tipo': '👤 B2C',
-                    'ID Venta': s['id_venta'],
-                    'N Linea': s['n_linea'],
-                    'Día Itin.': s.get('id_itinerario_dia_index', 1),
-                    'ID Itinerario': v.get('id_itinerario_digital'),
-                    'URL Cloud': v.get('url_itinerario') or ""
+                    'ID Venta': srv.id_venta,
+                    'N Linea': srv.n_linea,
+                    'Día Itin.': srv.dia_itinerario,
+                    'ID Itinerario': srv.id_itinerario,
+                    'URL Cloud': srv.url_itinerario
                 })
             return resultado
         except Exception as e:
             print(f"Error en Tablero Diario: {e}")
             return []
 
+    def get_vales_endoso(self, start_date: date, end_date: date, proveedor: str = None):
+        """Datos de vale de endose (voucher_endose_template.html) de los servicios endosados del rango,
+        ordenados por fecha y proveedor. `proveedor` filtra por nombre comercial."""
+        try:
+            nombres_proveedor = obtener_mapa_nombres(self.client, 'proveedor', 'id_proveedor', 'nombre_comercial')
+            vales = []
+            for srv in cargar_servicios_enriquecidos(self.client, start_date, end_date, incluir_b2b=True):
+                # Proveedor: asignación del tablero (venta_servicio_proveedor) o del estructurador (venta_tour)
+                nombre_prov = srv.agencia_endoso if srv.agencia_endoso != "---" else nombres_proveedor.get(srv.id_proveedor)
+                if not srv.es_endoso or not nombre_prov:
+                    continue
+                if proveedor and nombre_prov != proveedor:
+                    continue
+                vales.append(((srv.fecha, nombre_prov, srv.id_venta, srv.n_linea), {
+                    "nombre_proveedor": nombre_prov,
+                    "fecha_servicio": date.fromisoformat(srv.fecha).strftime("%d/%m/%Y"),
+                    "nombre_servicio": srv.servicio,
+                    "hora_encuentro": "Por confirmar",
+                    "nombre_pasajero": srv.cliente,
+                    "cantidad_pax": srv.pax,
+                    "id_venta": srv.id_venta,
+                    "observaciones": srv.info_pago_operativo
+                }))
+            return [vale for _, vale in sorted(vales, key=lambda x: x[0])]
+        except Exception as e:
+            print(f"Error obteniendo vales de endose: {e}")
+            return []
+
     def actualizar_guia_servicio(self, id_venta, n_linea, nombre_guia):
         """Asigna un guía a un servicio específico según el esquema SQL venta_servicio_proveedor."""
         try:
@@ -298,6 +208,7 @@ class OperacionesController:
                 "estado_pago": 'PENDIENTE'
             }
             self.client.table('venta_servicio_proveedor').upsert(datos, on_conflict='id_venta, n_linea, tipo_servicio').execute()
+            invalidar_tabla('venta_servicio_proveedor')
             return True, f"Guía {nombre_guia} asignado correctamente."
         except Exception as e:
             print(f"Error asignando guía: {e}")
@@ -329,6 +240,8 @@ class OperacionesController:
             
             # Además actualizar la tabla venta_tour para marcar es_endoso = True
             self.client.table('venta_tour').update({"es_endoso": True}).match({"id_venta": id_venta, "n_linea": n_linea}).execute()
+            invalidar_tabla('venta_servicio_proveedor')
+            invalidar_tabla('venta_tour')
             
             return True, f"Endoso a {nombre_agencia} registrado."
         except Exception as e:
@@ -339,6 +252,7 @@ class OperacionesController:
         """Activa o desactiva el flag de endoso para un servicio."""
         try:
             self.client.table('venta_tour').update({"es_endoso": es_endoso}).match({"id_venta": id_venta, "n_linea": n_linea}).execute()
+            invalidar_tabla('venta_tour')
             return True, "Estado de endoso actualizado."
         except Exception as e:
             print(f"Error haciendo toggle de endoso: {e}")
@@ -369,24 +283,22 @@ class OperacionesController:
         """Obtiene todas las ventas registradas para vista compartida."""
         try:
             # Sincronizado: tabla 'venta', columna 'precio_total_cierre'
-            res = self.client.table('venta').select('*').order('fecha_venta', desc=True).execute()
-            ventas = res.data
+            # Join embebido con cliente y vendedor: una sola consulta sin importar el número de ventas
+            res = (
+                self.client.table('venta')
+                .select('id_venta, fecha_venta, precio_total_cierre, estado_venta, cliente(nombre), vendedor(nombre)')
+                .order('fecha_venta', desc=True)
+                .execute()
+            )
+            ventas = res.data or []
             
             resultado = []
             for v in ventas:
-                # Buscar cliente (tabla 'cliente')
-                res_c = self.client.table('cliente').select('nombre').eq('id_cliente', v['id_cliente']).single().execute()
-                nombre_cliente = res_c.data['nombre'] if res_c.data else "Desconocido"
-                
-                # Buscar vendedor (tabla 'vendedor')
-                res_v = self.client.table('vendedor').select('nombre').eq('id_vendedor', v['id_vendedor']).single().execute()
-                nombre_vendedor = res_v.data['nombre'] if res_v.data else "Desconocido"
-
                 resultado.append({
                     'ID': v['id_venta'],
                     'Fecha': v['fecha_venta'],
-                    'Cliente': nombre_cliente,
-                    'Vendedor': nombre_vendedor,
+                    'Cliente': (v.get('cliente') or {}).get('nombre', "Desconocido"),
+                    'Vendedor': (v.get('vendedor') or {}).get('nombre', "Desconocido"),
                     'Total': v['precio_total_cierre'],
                     'Estado': v['estado_venta']
                 })
@@ -1,34 +1,37 @@
 # controllers/pdf_controller.py
-import os
-from jinja2 import Environment, FileSystemLoader
-from xhtml2pdf import pisa
+import re
+import zipfile
 from io import BytesIO
+from models.cache_pdf import cache_pdf, clave_pdf
+from models.cache_imagenes import cache_imagenes
+from controllers.motor_plantillas import TEMPLATE_DIR, obtener_entorno, registrar_solicitud
+from controllers.renderizadores_pdf import obtener_renderizador
 
 import datetime
+from typing import List
 
 class PDFController:
-    """Controlador para la generación de documentos PDF a partir de plantillas HTML."""
+    """Controlador para la generación de documentos PDF (plantillas HTML o dibujo directo con fpdf2)."""
     
-    def __init__(self):
-        # Localización de las plantillas
-        self.template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
-        self.env = Environment(loader=FileSystemLoader(self.template_dir))
+    def __init__(self, motor: str = None):
+        # Entorno Jinja compartido por el proceso (controllers/motor_plantillas.py): crear
+        # PDFController() en cada rerun ya no vuelve a compilar las plantillas
+        self.template_dir = TEMPLATE_DIR
+        self.env = obtener_entorno()
+        # None = motor por tipo de documento (controllers/renderizadores_pdf.py)
+        self.motor = motor
 
     def _render_pdf(self, template_name: str, context: dict) -> BytesIO:
-        """Helper centralizado para renderizar HTML y convertir a PDF."""
+        """Helper centralizado para renderizar el documento con su motor (xhtml2pdf o fpdf2).
+        El resultado se cachea por hash de la fuente del documento + contexto (models/cache_pdf.py)."""
         try:
-            template = self.env.get_template(template_name)
-            html_content = template.render(context)
-            
-            pdf_output = BytesIO()
-            pisa_status = pisa.CreatePDF(html_content, dest=pdf_output)
-            
-            if pisa_status.err:
-                print(f"Error en xhtml2pdf ({template_name}): {pisa_status.err}")
-                return None
-            
-            pdf_output.seek(0)
-            return pdf_output
+            registrar_solicitud(template_name)
+            renderizador = obtener_renderizador(template_name, self.motor)
+            contenido = cache_pdf.obtener(
+                clave_pdf(renderizador.fuente(template_name), context),
+                lambda: renderizador.renderizar(template_name, context)
+            )
+            return BytesIO(contenido) if contenido else None
         except Exception as e:
             print(f"Error renderizando PDF {template_name}: {e}")
             return None
@@ -47,8 +50,30 @@ class PDFController:
                            datos_render.get("itinerario") or []),
             "total": datos_render.get("precios", {}).get("extranjero", 0)
         }
+        context["itinerario"] = self._localizar_imagenes(context["itinerario"])
         return self._render_pdf('itinerario_template.html', context)
 
+    @staticmethod
+    def _localizar_imagenes(dias: list) -> list:
+        """Reemplaza las fotos de cada día (URLs de catalogo_tours_imagenes en 'imagenes',
+        'urls_imagenes' o 'imagen') por JPEG reducidos del almacén local (models/cache_imagenes.py):
+        xhtml2pdf ya no las descarga en cada render y el PDF pesa mucho menos."""
+        urls_por_dia = []
+        for dia in dias:
+            urls = (dia.get("imagenes") or dia.get("urls_imagenes") or dia.get("imagen") or []) if isinstance(dia, dict) else []
+            urls_por_dia.append([urls] if isinstance(urls, str) else list(urls))
+        unicas = sorted({u for urls in urls_por_dia for u in urls if u})
+        if not unicas:
+            return dias
+
+        rutas = cache_imagenes.rutas_locales(unicas)
+        resultado = []
+        for dia, urls in zip(dias, urls_por_dia):
+            if isinstance(dia, dict) and urls:
+                dia = {**dia, "imagenes": [rutas[u] for u in urls if rutas.get(u)]}
+            resultado.append(dia)
+        return resultado
+
     def generar_itinerario_simple_pdf(self, datos_render: dict) -> BytesIO:
         """Genera un PDF de itinerario SIMPLE (Ink Saver)."""
         context = {
@@ -70,3 +95,47 @@ class PDFController:
         """Genera un Vale de Endose para un proveedor específico."""
         data['hoy'] = datetime.date.today().strftime("%d/%m/%Y")
         return self._render_pdf('voucher_endose_template.html', data)
+
+    def generar_vouchers_endose_lote(self, vales: List[dict], formato: str = 'pdf') -> BytesIO:
+        """Genera varios Vales de Endose en paralelo (procesos) y los entrega en un solo PDF
+        (formato='pdf') o en un ZIP con un archivo por vale (formato='zip')."""
+        from controllers.trabajos_pdf import renderizar_en_paralelo, renderizar_voucher
+        try:
+            pdfs = renderizar_en_paralelo(renderizar_voucher, [(dict(v),) for v in vales])
+            generados = [(v, pdf) for v, pdf in zip(vales, pdfs) if pdf]
+            if len(generados) < len(vales):
+                print(f"Vales de endose: {len(vales) - len(generados)} de {len(vales)} no se pudieron generar")
+            if not generados:
+                return None
+            return self._unir_pdfs([pdf for _, pdf in generados]) if formato == 'pdf' else self._empaquetar_zip(generados)
+        except Exception as e:
+            print(f"Error generando vales de endose en lote: {e}")
+            return None
+
+    @staticmethod
+    def _unir_pdfs(pdfs: List[bytes]) -> BytesIO:
+        from pypdf import PdfWriter
+        writer = PdfWriter()
+        for pdf in pdfs:
+            writer.append(BytesIO(pdf))
+        salida = BytesIO()
+        writer.write(salida)
+        salida.seek(0)
+        return salida
+
+    @staticmethod
+    def _empaquetar_zip(generados: list) -> BytesIO:
+        salida = BytesIO()
+        usados = set()
+        with zipfile.ZipFile(salida, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for vale, pdf in generados:
+                base = re.sub(r'\W+', '_', f"vale_{vale.get('fecha_servicio', '')}_{vale.get('nombre_proveedor', '')}"
+                                          f"_{vale.get('id_venta', '')}").strip('_')
+                nombre, n = f"{base}.pdf", 1
+                while nombre in usados:
+                    n += 1
+                    nombre = f"{base}_{n}.pdf"
+                usados.add(nombre)
+                zf.writestr(nombre, pdf)
+        salida.seek(0)
+        return salida
@@ -0,0 +1,251 @@
+# controllers/renderizadores_pdf.py
+import os
+import time
+from abc import ABC, abstractmethod
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fpdf import FPDF
+from xhtml2pdf import pisa
+
+from controllers.motor_plantillas import obtener_entorno, registrar_render
+
+
+class RenderizadorPDF(ABC):
+    """Interfaz de un motor de PDF. `documento` es el nombre de la plantilla
+    (p. ej. 'voucher_endose_template.html'), que identifica el tipo de documento.
+    Cada motor implementa `_dibujar`; el tiempo se mide y registra solo en `renderizar`."""
+    nombre = ''
+
+    @abstractmethod
+    def soporta(self, documento: str) -> bool:
+        ...
+
+    @abstractmethod
+    def fuente(self, documento: str) -> str:
+        """Texto que identifica cómo se dibuja el documento (parte de la clave de caché)."""
+
+    @abstractmethod
+    def _dibujar(self, documento: str, contexto: Dict[str, Any]) -> Tuple[Optional[bytes], float]:
+        """Retorna (bytes del PDF o None, ms de la etapa HTML si el motor la tiene)."""
+
+    def renderizar(self, documento: str, contexto: Dict[str, Any]) -> Optional[bytes]:
+        """Dibuja el documento y registra su tiempo en las métricas por plantilla
+        (separando la etapa HTML, si la hay, de la del PDF)."""
+        t0 = time.perf_counter()
+        contenido, html_ms = None, 0.0
+        try:
+            contenido, html_ms = self._dibujar(documento, contexto)
+            return contenido
+        finally:
+            registrar_render(documento, html_ms, (time.perf_counter() - t0) * 1000 - html_ms, error=not contenido)
+
+
+class RenderizadorXhtml2pdf(RenderizadorPDF):
+    """Plantilla Jinja -> HTML -> PDF con xhtml2pdf. Soporta cualquier plantilla (CSS, imágenes)."""
+    nombre = 'xhtml2pdf'
+
+    def soporta(self, documento: str) -> bool:
+        return True
+
+    def fuente(self, documento: str) -> str:
+        entorno = obtener_entorno()
+        return entorno.loader.get_source(entorno, documento)[0]
+
+    def _dibujar(self, documento: str, contexto: Dict[str, Any]) -> Tuple[Optional[bytes], float]:
+        # Se separa el tiempo de Jinja (HTML) del de xhtml2pdf (PDF)
+        t0 = time.perf_counter()
+        html_content = obtener_entorno().get_template(documento).render(contexto)
+        html_ms = (time.perf_counter() - t0) * 1000
+
+        pdf_output = BytesIO()
+        pisa_status = pisa.CreatePDF(html_content, dest=pdf_output)
+        if pisa_status.err:
+            print(f"Error en xhtml2pdf ({documento}): {pisa_status.err}")
+            return None, html_ms
+        return pdf_output.getvalue(), html_ms
+
+
+def _texto(valor: Any) -> str:
+    """Las fuentes base de PDF (Helvetica) solo cubren latin-1: el resto se reemplaza por '?'."""
+    return str('' if valor is None else valor).encode('latin-1', 'replace').decode('latin-1')
+
+
+class _DocumentoFpdf(FPDF):
+    """FPDF con pie de página centrado en cada hoja."""
+
+    def __init__(self, pie: str = '', **kwargs):
+        super().__init__(**kwargs)
+        self.pie = pie
+
+    def footer(self):
+        if not self.pie:
+            return
+        self.set_y(-12)
+        self.set_font('Helvetica', '', 7)
+        self.set_text_color(170, 170, 170)
+        self.cell(0, 5, _texto(self.pie), align='C')
+
+
+class RenderizadorFpdf(RenderizadorPDF):
+    """Dibuja directamente con fpdf2 (sin HTML ni CSS) los documentos simples: el mismo contenido
+    que su plantilla, en una fracción del tiempo de xhtml2pdf. Solo fuentes base (latin-1)."""
+    nombre = 'fpdf2'
+    # Subir al cambiar el dibujo de un documento (invalida la caché de PDFs)
+    VERSION = 1
+
+    def __init__(self):
+        self._documentos: Dict[str, Callable[[Dict[str, Any]], FPDF]] = {
+            'itinerario_simple_template.html': self._itinerario_simple,
+            'voucher_endose_template.html': self._voucher_endose,
+        }
+
+    def soporta(self, documento: str) -> bool:
+        return documento in self._documentos
+
+    def fuente(self, documento: str) -> str:
+        return f'{self.nombre}:{self.VERSION}:{documento}'
+
+    def _dibujar(self, documento: str, contexto: Dict[str, Any]) -> Tuple[Optional[bytes], float]:
+        return bytes(self._documentos[documento](contexto).output()), 0.0
+
+    @staticmethod
+    def _itinerario_simple(ctx: Dict[str, Any]) -> FPDF:
+        pdf = _DocumentoFpdf(pie=f"Viajes Cusco Perú | www.viajescuscoperu.com | Impreso el {ctx.get('hoy', '')}",
+                             format='A4')
+        pdf.set_margins(15, 15, 15)
+        pdf.set_auto_page_break(True, margin=20)
+        pdf.add_page()
+        ancho = pdf.epw
+
+        pdf.set_font('Helvetica', 'B', 18)
+        pdf.cell(0, 10, 'RESUMEN DE ITINERARIO', align='C', new_x='LMARGIN', new_y='NEXT')
+        pdf.set_line_width(0.7)
+        pdf.line(pdf.l_margin, pdf.get_y(), pdf.l_margin + ancho, pdf.get_y())
+        pdf.ln(5)
+
+        for etiqueta, valor in (('Pasajero:', ctx.get('cliente_nombre')),
+                                ('Fecha de Viaje:', ctx.get('fecha_viaje')),
+                                ('Pax:', f"{ctx.get('num_adultos', 1)} Adultos / {ctx.get('num_ninos', 0)} Niños")):
+            pdf.set_font('Helvetica', 'B', 10)
+            pdf.cell(pdf.get_string_width(etiqueta) + 1.5, 5, _texto(etiqueta))
+            pdf.set_font('Helvetica', '', 10)
+            pdf.cell(0, 5, _texto(valor), new_x='LMARGIN', new_y='NEXT')
+        pdf.ln(6)
+
+        sangria = 5
+        columna = (ancho - sangria) / 2
+        for i, tour in enumerate(ctx.get('itinerario') or [], start=1):
+            tour = tour if isinstance(tour, dict) else {}
+            titulo = tour.get('nombre') or tour.get('titulo') or ''
+            pdf.set_font('Helvetica', 'B', 11)
+            pdf.multi_cell(0, 5.5, _texto(f"DÍA 0{i}: {titulo}".upper()), new_x='LMARGIN', new_y='NEXT')
+
+            pdf.set_x(pdf.l_margin + sangria)
+            pdf.set_font('Helvetica', 'I', 10)
+            pdf.set_text_color(51, 51, 51)
+            pdf.multi_cell(ancho - sangria, 4.5, _texto(f"{(tour.get('descripcion') or '')[:200]}..."),
+                           new_x='LMARGIN', new_y='NEXT')
+            pdf.set_text_color(0, 0, 0)
+            pdf.ln(1)
+
+            if pdf.will_page_break(20):
+                pdf.add_page()
+            y0 = pdf.get_y()
+            for desplazamiento, encabezado, items in ((0, 'INCLUYE:', ('Transporte', 'Guía', 'Tickets')),
+                                                      (columna, 'NO INCLUYE:', ('Alimentación', 'Gastos extras'))):
+                pdf.set_xy(pdf.l_margin + sangria + desplazamiento, y0)
+                pdf.set_font('Helvetica', 'B', 8)
+                pdf.cell(columna, 4, encabezado, new_x='LEFT', new_y='NEXT')
+                pdf.set_font('Helvetica', '', 9)
+                marca = '+' if desplazamiento == 0 else 'x'
+                for item in items:
+                    pdf.cell(columna, 4, _texto(f"{marca} {item}"), new_x='LEFT', new_y='NEXT')
+            pdf.set_y(y0 + 4 + 4 * 3)
+            pdf.ln(4)
+
+        pdf.ln(8)
+        pdf.set_line_width(0.3)
+        pdf.line(pdf.l_margin, pdf.get_y(), pdf.l_margin + ancho, pdf.get_y())
+        pdf.ln(2)
+        pdf.set_font('Helvetica', 'B', 12)
+        total = ctx.get('total') or 0
+        try:
+            total = round(float(total), 2)
+        except (TypeError, ValueError):
+            pass
+        pdf.cell(0, 6, _texto(f"PRECIO TOTAL: USD {total}"), align='R')
+        return pdf
+
+    @staticmethod
+    def _voucher_endose(ctx: Dict[str, Any]) -> FPDF:
+        pdf = _DocumentoFpdf(orientation='L', format=(148, 210))  # A5
+        pdf.set_margins(10, 10, 10)
+        pdf.set_auto_page_break(True, margin=10)
+        pdf.add_page()
+        ancho = pdf.epw
+
+        # Encabezado recuadrado
+        y0 = pdf.get_y()
+        pdf.set_font('Courier', 'B', 16)
+        pdf.cell(0, 8, 'ORCHID DE ENDOSE / VOUCHER', align='C', new_x='LMARGIN', new_y='NEXT')
+        pdf.set_font('Courier', '', 10)
+        pdf.cell(0, 5, _texto('VIAJES CUSCO PERÚ'), align='C', new_x='LMARGIN', new_y='NEXT')
+        pdf.set_line_width(0.7)
+        pdf.rect(pdf.l_margin, y0 - 1, ancho, pdf.get_y() - y0 + 2)
+        pdf.ln(5)
+
+        tercio = ancho / 3
+        filas: List[List[tuple]] = [
+            [('Proveedor / Endosado a:', ctx.get('nombre_proveedor'), 2), ('Fecha Servicio:', ctx.get('fecha_servicio'), 1)],
+            [('Servicio a Realizar:', ctx.get('nombre_servicio'), 2), ('Hora:', ctx.get('hora_encuentro'), 1)],
+            [('Pasajero Principal:', ctx.get('nombre_pasajero'), 1), ('Cantidad Pax:', ctx.get('cantidad_pax'), 1),
+             ('Venta Ref:', f"#{ctx.get('id_venta', '')}", 1)],
+            [('Observaciones / Inclusiones de Endose:', ctx.get('observaciones'), 3)],
+        ]
+        pdf.set_line_width(0.3)
+        for fila in filas:
+            y = pdf.get_y()
+            # Alto de la fila: el de la celda con más líneas
+            pdf.set_font('Courier', '', 11)
+            alto = max(pdf.multi_cell(tercio * span - 3, 5, _texto(valor), dry_run=True, output='HEIGHT')
+                       for _, valor, span in fila) + 9
+            x = pdf.l_margin
+            for etiqueta, valor, span in fila:
+                w = tercio * span
+                pdf.rect(x, y, w, alto)
+                pdf.set_xy(x + 1.5, y + 1.5)
+                pdf.set_font('Courier', 'B', 8)
+                pdf.cell(w - 3, 4, _texto(etiqueta.upper()), new_x='LEFT', new_y='NEXT')
+                pdf.set_font('Courier', '', 11)
+                pdf.multi_cell(w - 3, 5, _texto(valor))
+                x += w
+            pdf.set_xy(pdf.l_margin, y + alto)
+        pdf.ln(8)
+
+        pdf.set_dash_pattern(dash=1, gap=1)
+        pdf.line(pdf.l_margin, pdf.get_y(), pdf.l_margin + ancho, pdf.get_y())
+        pdf.set_dash_pattern()
+        pdf.ln(2)
+        pdf.set_font('Courier', '', 8)
+        pdf.multi_cell(0, 4, _texto(f"Este documento certifica el endose del servicio.\nGenerado el {ctx.get('hoy', '')}"),
+                       align='C')
+        return pdf
+
+
+_XHTML2PDF = RenderizadorXhtml2pdf()
+_FPDF = RenderizadorFpdf()
+MOTORES: Dict[str, RenderizadorPDF] = {r.nombre: r for r in (_XHTML2PDF, _FPDF)}
+
+# Motor por tipo de documento; el resto usa xhtml2pdf. SGVO_PDF_MOTOR=xhtml2pdf fuerza HTML en todos.
+MOTOR_POR_DOCUMENTO = {
+    'itinerario_simple_template.html': 'fpdf2',
+    'voucher_endose_template.html': 'fpdf2',
+}
+
+
+def obtener_renderizador(documento: str, motor: Optional[str] = None) -> RenderizadorPDF:
+    """Renderizador para el documento: `motor` explícito, SGVO_PDF_MOTOR o MOTOR_POR_DOCUMENTO."""
+    nombre = motor or os.environ.get('SGVO_PDF_MOTOR') or MOTOR_POR_DOCUMENTO.get(documento, 'xhtml2pdf')
+    renderizador = MOTORES.get(nombre, _XHTML2PDF)
+    return renderizador if renderizador.soporta(documento) else _XHTML2PDF
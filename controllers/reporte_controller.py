@@ -2,6 +2,7 @@
 from models.venta_model import VentaModel
 from models.lead_model import LeadModel
 from models.operaciones_model import RequerimientoModel
+from models.cache_referencias import obtener_mapa_nombres
 
 class ReporteController:
     """
@@ -67,8 +68,7 @@ class ReporteController:
         
         # Mapear Cliente (Nombre) para que el selector sea legible
         try:
-            res_c = self.venta_model.client.table('cliente').select('id_cliente, nombre').execute()
-            cli_map = {c['id_cliente']: c['nombre'] for c in res_c.data}
+            cli_map = obtener_mapa_nombres(self.client, 'cliente', 'id_cliente')
             for v in ventas:
                 v['cliente_nombre'] = cli_map.get(v.get('id_cliente'), "Desconocido")
         except:
@@ -81,9 +81,12 @@ class ReporteController:
         """Devuelve dataframes listos para pandas con nombres mapeados."""
         import pandas as pd
         
-        # 1. Ventas
-        ventas = self.venta_model.get_all()
-        df_ventas = pd.DataFrame(ventas) if ventas else pd.DataFrame()
+        # 1. Ventas (paginadas por llave, sin corte por max-rows)
+        try:
+            df_ventas = self.venta_model.get_dataframe()
+        except Exception as e:
+            print(f"Error obteniendo ventas para dashboard: {e}")
+            df_ventas = pd.DataFrame()
         
         if not df_ventas.empty:
             # Sincronizar columna de monto
@@ -91,24 +94,25 @@ class ReporteController:
             
             # Mapear Vendedor (Nombre)
             try:
-                # Tabla 'vendedor' en minúsculas según esquema
-                res_v = self.venta_model.client.table('vendedor').select('id_vendedor, nombre').execute()
-                vend_map = {v['id_vendedor']: v['nombre'] for v in res_v.data}
+                # Tabla 'vendedor' en minúsculas según esquema (caché compartida)
+                vend_map = obtener_mapa_nombres(self.client, 'vendedor', 'id_vendedor')
                 df_ventas['vendedor'] = df_ventas['id_vendedor'].map(vend_map)
             except:
                 df_ventas['vendedor'] = "Desconocido"
                 
             # Mapear Cliente (Nombre)
             try:
-                res_c = self.venta_model.client.table('cliente').select('id_cliente, nombre').execute()
-                cli_map = {c['id_cliente']: c['nombre'] for c in res_c.data}
+                cli_map = obtener_mapa_nombres(self.client, 'cliente', 'id_cliente')
                 df_ventas['cliente_nombre'] = df_ventas['id_cliente'].map(cli_map)
             except:
                 df_ventas['cliente_nombre'] = "Desconocido"
             
         # 2. Gastos (Requerimientos)
-        reqs = self.req_model.get_all()
-        df_reqs = pd.DataFrame(reqs) if reqs else pd.DataFrame()
+        try:
+            df_reqs = self.req_model.get_dataframe()
+        except Exception as e:
+            print(f"Error obteniendo requerimientos para dashboard: {e}")
+            df_reqs = pd.DataFrame()
         if not df_reqs.empty and 'total' not in df_reqs.columns:
             df_reqs['total'] = 0.0
             
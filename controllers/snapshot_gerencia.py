@@ -0,0 +1,112 @@
+# controllers/snapshot_gerencia.py
+import threading
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+from models.base_model import BaseModel
+from models.cache_incremental import CACHES_INCREMENTALES
+
+# tabla -> (PK para paginar (una o más columnas), columnas proyectadas, dtypes)
+# venta, pago y venta_tour salen de la copia local incremental (models/cache_incremental.py).
+TABLAS_SNAPSHOT: Dict[str, Tuple[Tuple[str, ...], str, Dict[str, str]]] = {
+    'venta': (
+        ('id_venta',),
+        'id_venta, fecha_venta, id_cliente, id_vendedor, canal_venta, precio_total_cierre, moneda, estado_venta',
+        {'id_venta': 'Int64', 'fecha_venta': 'datetime64[ns]', 'id_cliente': 'Int64', 'id_vendedor': 'Int64',
+         'canal_venta': 'category', 'precio_total_cierre': 'float64', 'moneda': 'category', 'estado_venta': 'category'}
+    ),
+    'lead': (
+        ('id_lead',),
+        'id_lead, id_vendedor, estado_lead, red_social',
+        {'id_lead': 'Int64', 'id_vendedor': 'Int64', 'estado_lead': 'category', 'red_social': 'category'}
+    ),
+    'pago': (
+        ('id_pago',),
+        'id_pago, id_venta, monto_pagado',
+        {'id_pago': 'Int64', 'id_venta': 'Int64', 'monto_pagado': 'float64'}
+    ),
+    'venta_tour': (
+        ('id_venta', 'n_linea'),
+        'id_venta, n_linea, cantidad_pasajeros',
+        {'id_venta': 'Int64', 'n_linea': 'Int64', 'cantidad_pasajeros': 'Int64'}
+    ),
+}
+
+
+def _tipar(df: pd.DataFrame, columnas: str, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """Asegura todas las columnas proyectadas (aunque la tabla esté vacía) y aplica los dtypes."""
+    for col in [c.strip() for c in columnas.split(',')]:
+        if col not in df.columns:
+            df[col] = None
+    for col, tipo in dtypes.items():
+        if tipo == 'datetime64[ns]':
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+        elif tipo in ('Int64', 'float64'):
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(tipo)
+        else:
+            df[col] = df[col].astype(tipo)
+    return df
+
+
+class SnapshotGerencia:
+    """Foto de las tablas de Gerencia para un solo rerun de la página.
+    Cada tabla se descarga una vez (solo las columnas necesarias) y todas las métricas
+    se calculan sobre los mismos DataFrames. El lock por tabla evita descargas duplicadas
+    cuando las métricas se piden en paralelo."""
+
+    def __init__(self, client):
+        self.client = client
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._locks = {tabla: threading.Lock() for tabla in TABLAS_SNAPSHOT}
+
+    def _cargar(self, tabla: str) -> pd.DataFrame:
+        pk, columnas, dtypes = TABLAS_SNAPSHOT[tabla]
+        if tabla in CACHES_INCREMENTALES:
+            # Copia: el DataFrame de la caché se comparte entre reruns
+            df = CACHES_INCREMENTALES[tabla].dataframe(self.client).copy()
+        else:
+            df = BaseModel(tabla, self.client, primary_key=pk[0],
+                           conflict_target=','.join(pk)).get_dataframe(columns=columnas)
+        df = _tipar(df, columnas, dtypes)
+        return df[[c.strip() for c in columnas.split(',')]]
+
+    def tabla(self, tabla: str) -> pd.DataFrame:
+        """DataFrame tipado de la tabla (se descarga solo la primera vez)."""
+        with self._locks[tabla]:
+            if tabla not in self._frames:
+                self._frames[tabla] = self._cargar(tabla)
+            return self._frames[tabla]
+
+    # --- Agregados con la misma forma que las RPC de migrations/add_rpc_gerencia.sql ---
+
+    def kpis_financieros(self) -> List[Dict[str, Any]]:
+        return [{
+            'ventas_totales': float(self.tabla('venta')['precio_total_cierre'].sum()),
+            'total_recaudado': float(self.tabla('pago')['monto_pagado'].sum())
+        }]
+
+    def pax_totales(self) -> int:
+        return int(self.tabla('venta_tour')['cantidad_pasajeros'].sum())
+
+    def ventas_por_canal(self) -> List[Dict[str, Any]]:
+        df = self.tabla('venta')
+        serie = df.groupby('canal_venta', observed=True)['precio_total_cierre'].sum()
+        return serie.rename_axis('canal').reset_index(name='monto').to_dict('records')
+
+    def ventas_por_estado(self) -> List[Dict[str, Any]]:
+        serie = self.tabla('venta').groupby('estado_venta', observed=True).size()
+        return serie.rename_axis('estado').reset_index(name='cantidad').to_dict('records')
+
+    def ventas_mensuales(self) -> List[Dict[str, Any]]:
+        df = self.tabla('venta').dropna(subset=['fecha_venta'])
+        serie = df.groupby(df['fecha_venta'].dt.strftime('%Y-%m'))['precio_total_cierre'].sum()
+        return serie.rename_axis('mes').reset_index(name='ventas').to_dict('records')
+
+    def distribucion_estados_leads(self) -> List[Dict[str, Any]]:
+        serie = self.tabla('lead').groupby('estado_lead', observed=True).size()
+        return serie.rename_axis('estado').reset_index(name='cantidad').to_dict('records')
+
+    def agregado(self, nombre_rpc: str) -> Any:
+        """Calcula localmente el resultado de una RPC de Gerencia (respaldo si no está instalada)."""
+        return getattr(self, nombre_rpc.replace('gerencia_', '', 1))()
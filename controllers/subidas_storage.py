@@ -0,0 +1,107 @@
+# controllers/subidas_storage.py
+import hashlib
+import mimetypes
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from controllers.concurrencia import ejecutar_en_paralelo
+from models.cache_imagenes import reducir_a_jpeg
+
+# Imágenes (fotos de vouchers de pago, capturas) se reducen antes de subir
+TIPOS_IMAGEN = {'image/jpeg', 'image/png', 'image/webp', 'image/bmp', 'image/tiff'}
+LADO_MAX_IMAGEN = 1600
+CALIDAD_IMAGEN = 80
+# Por debajo de este tamaño no vale la pena recomprimir
+MIN_BYTES_COMPRESION = 200 * 1024
+
+# (bucket, sha256 del original) -> URL pública, de lo ya subido (o encontrado) por este proceso.
+# LRU acotada: olvidar una entrada solo cuesta un exists() en la próxima subida del mismo archivo
+MAX_SUBIDOS = 2048
+_subidos: 'OrderedDict[Tuple[str, str], str]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def _es_duplicado(error: Exception) -> bool:
+    texto = str(error).lower()
+    return '409' in texto or 'duplicate' in texto or 'already exists' in texto
+
+
+class ServicioSubidas:
+    """Subidas a Supabase Storage direccionadas por contenido: la ruta es el sha256 del archivo,
+    así que un archivo ya subido (el mismo PDF o el mismo voucher) no se vuelve a enviar.
+    Las imágenes se comprimen a JPEG antes de subir y varias subidas se hacen en paralelo."""
+
+    def __init__(self, supabase_client):
+        self.client = supabase_client
+
+    @staticmethod
+    def _preparar(contenido: bytes, content_type: str, extension: str) -> Tuple[bytes, str, str]:
+        """Comprime imágenes grandes; si el resultado no es menor, se sube el original."""
+        if content_type not in TIPOS_IMAGEN or len(contenido) < MIN_BYTES_COMPRESION:
+            return contenido, content_type, extension
+        try:
+            reducido = reducir_a_jpeg(contenido, LADO_MAX_IMAGEN, LADO_MAX_IMAGEN, CALIDAD_IMAGEN)
+            if len(reducido) < len(contenido):
+                return reducido, 'image/jpeg', 'jpg'
+        except Exception as e:
+            print(f"Error comprimiendo imagen antes de subir: {e}")
+        return contenido, content_type, extension
+
+    def subir(self, bucket: str, contenido: bytes, content_type: Optional[str] = None,
+              extension: str = 'bin') -> Optional[str]:
+        """Sube `contenido` (si no existe ya) y retorna su URL pública; None si falla."""
+        if not contenido:
+            return None
+        extension = extension.lower().lstrip('.')
+        content_type = content_type or mimetypes.guess_type(f'x.{extension}')[0] or 'application/octet-stream'
+        # La ruta depende del original: el mismo archivo siempre cae en la misma ruta, sin recomprimir
+        hash_contenido = hashlib.sha256(contenido).hexdigest()
+        with _lock:
+            url = _subidos.get((bucket, hash_contenido))
+            if url:
+                _subidos.move_to_end((bucket, hash_contenido))
+        if url:
+            return url
+
+        try:
+            datos, content_type, extension = self._preparar(contenido, content_type, extension)
+            ruta = f"{hash_contenido}.{extension}"
+            almacen = self.client.storage.from_(bucket)
+            existe = False
+            if hasattr(almacen, 'exists'):
+                try:
+                    existe = almacen.exists(ruta)
+                except Exception:
+                    existe = False  # se intenta subir; un duplicado se detecta abajo
+            if not existe:
+                try:
+                    almacen.upload(path=ruta, file=datos, file_options={"content-type": content_type})
+                except Exception as e:
+                    if not _es_duplicado(e):
+                        raise
+            url = almacen.get_public_url(ruta)
+            with _lock:
+                _subidos[(bucket, hash_contenido)] = url
+                _subidos.move_to_end((bucket, hash_contenido))
+                while len(_subidos) > MAX_SUBIDOS:
+                    _subidos.popitem(last=False)
+            return url
+        except Exception as e:
+            print(f"Error subiendo archivo a {bucket}: {e}")
+            return None
+
+    def subir_archivo(self, bucket: str, archivo: Any) -> Optional[str]:
+        """Sube un UploadedFile de Streamlit (o cualquier objeto con getvalue/name/type)."""
+        if not archivo:
+            return None
+        nombre = getattr(archivo, 'name', '') or ''
+        extension = nombre.rsplit('.', 1)[-1] if '.' in nombre else 'bin'
+        return self.subir(bucket, archivo.getvalue(), getattr(archivo, 'type', None), extension)
+
+    def subir_varios(self, archivos: Dict[str, Tuple[str, Any]]) -> Dict[str, Optional[str]]:
+        """{nombre: (bucket, archivo)} -> {nombre: url}, con las subidas en paralelo."""
+        tareas = {nombre: (lambda b=bucket, a=archivo: self.subir_archivo(b, a))
+                  for nombre, (bucket, archivo) in archivos.items() if archivo}
+        urls = ejecutar_en_paralelo(tareas) if tareas else {}
+        return {nombre: urls.get(nombre) for nombre in archivos}
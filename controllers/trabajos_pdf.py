@@ -0,0 +1,207 @@
+# controllers/trabajos_pdf.py
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from controllers.concurrencia import en_segundo_plano
+
+# Estados de un trabajo
+PENDIENTE = 'PENDIENTE'    # en cola o renderizando en un proceso del pool
+SUBIENDO = 'SUBIENDO'      # PDF listo, subiendo a Storage / actualizando la base
+LISTO = 'LISTO'
+ERROR = 'ERROR'
+
+# xhtml2pdf es CPU puro y retiene el GIL: se renderiza en procesos aparte para que varios
+# vendedores no se encolen detrás del mismo intérprete. SGVO_PDF_PROCESOS=0 renderiza en hilos.
+MAX_PROCESOS = int(os.environ.get('SGVO_PDF_PROCESOS', str(min(4, os.cpu_count() or 1))))
+# Trabajos terminados que se conservan para consultar su estado
+MAX_TRABAJOS_TERMINADOS = 200
+
+# Respaldo en hilos (sin pool de procesos o con el pool roto): un executor propio y pequeño, para
+# que los renders (segundos de CPU cada uno) no ocupen el pool de I/O de las consultas de página
+_POOL_HILOS = ThreadPoolExecutor(max_workers=2, thread_name_prefix='sgvo-pdf')
+
+
+@dataclass
+class TrabajoPDF:
+    """Estado de un trabajo de generación de PDF (compartido por todas las sesiones del proceso)."""
+    id_trabajo: str
+    descripcion: str
+    estado: str = PENDIENTE
+    url_pdf: Optional[str] = None
+    mensaje: str = ''
+    creado: float = field(default_factory=time.time)
+    terminado: Optional[float] = None
+
+    @property
+    def terminado_ok(self) -> bool:
+        return self.estado == LISTO
+
+    @property
+    def en_curso(self) -> bool:
+        return self.estado in (PENDIENTE, SUBIENDO)
+
+
+_trabajos: Dict[str, TrabajoPDF] = {}
+_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _obtener_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool de procesos perezoso. Se usa 'spawn': hacer fork del servidor de Streamlit (con hilos
+    y sockets abiertos) no es seguro."""
+    global _pool
+    if MAX_PROCESOS <= 0:
+        return None
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=MAX_PROCESOS, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _descartar_pool() -> None:
+    global _pool
+    with _lock:
+        _pool = None
+
+
+def _actualizar(trabajo: TrabajoPDF, estado: str, mensaje: str = '', url_pdf: Optional[str] = None) -> None:
+    with _lock:
+        trabajo.estado = estado
+        trabajo.mensaje = mensaje or trabajo.mensaje
+        trabajo.url_pdf = url_pdf or trabajo.url_pdf
+        if estado in (LISTO, ERROR):
+            trabajo.terminado = time.time()
+            terminados = sorted((t for t in _trabajos.values() if not t.en_curso), key=lambda t: t.terminado)
+            for viejo in terminados[:max(0, len(terminados) - MAX_TRABAJOS_TERMINADOS)]:
+                del _trabajos[viejo.id_trabajo]
+
+
+def _finalizar(trabajo: TrabajoPDF, contenido: Optional[bytes],
+               al_terminar: Callable[[bytes], Optional[str]]) -> None:
+    """Corre en el pool de hilos: sube el PDF (al_terminar) y marca el trabajo."""
+    if not contenido:
+        _actualizar(trabajo, ERROR, "Error al generar el documento PDF.")
+        return
+    _actualizar(trabajo, SUBIENDO)
+    try:
+        url_pdf = al_terminar(contenido)
+        if url_pdf:
+            _actualizar(trabajo, LISTO, "PDF generado y guardado en la nube.", url_pdf)
+        else:
+            _actualizar(trabajo, ERROR, "El PDF se generó pero no se pudo subir a Storage.")
+    except Exception as e:
+        print(f"Error finalizando trabajo PDF {trabajo.id_trabajo}: {e}")
+        _actualizar(trabajo, ERROR, f"Error al subir el PDF: {e}")
+
+
+def _renderizar_en_hilo(trabajo: TrabajoPDF, renderizar: Callable[..., Optional[bytes]], args: tuple,
+                        al_terminar: Callable[[bytes], Optional[str]]) -> None:
+    try:
+        contenido = renderizar(*args)
+    except Exception as e:
+        print(f"Error renderizando trabajo PDF {trabajo.id_trabajo}: {e}")
+        contenido = None
+    _finalizar(trabajo, contenido, al_terminar)
+
+
+def encolar(descripcion: str, renderizar: Callable[..., Optional[bytes]], args: tuple,
+            al_terminar: Callable[[bytes], Optional[str]]) -> str:
+    """Encola un PDF y retorna el id del trabajo de inmediato.
+    `renderizar(*args)` corre en un proceso del pool (debe ser una función de módulo y args
+    serializables) y retorna los bytes del PDF; `al_terminar(bytes)` corre después en un hilo
+    del proceso principal (subida, actualización de la base) y retorna la URL pública."""
+    trabajo = TrabajoPDF(uuid.uuid4().hex[:12], descripcion)
+    with _lock:
+        _trabajos[trabajo.id_trabajo] = trabajo
+
+    pool = _obtener_pool()
+    if pool is not None:
+        try:
+            futuro = pool.submit(renderizar, *args)
+
+            def al_renderizar(f: Future):
+                try:
+                    contenido = f.result()
+                except BrokenProcessPool as e:
+                    # Un proceso murió (p. ej. sin memoria): se reintenta en hilo y el próximo
+                    # trabajo crea un pool nuevo
+                    print(f"Pool de PDF roto: {e}")
+                    _descartar_pool()
+                    _POOL_HILOS.submit(_renderizar_en_hilo, trabajo, renderizar, args, al_terminar)
+                    return
+                except Exception as e:
+                    print(f"Error renderizando trabajo PDF {trabajo.id_trabajo}: {e}")
+                    contenido = None
+                en_segundo_plano(_finalizar, trabajo, contenido, al_terminar)
+
+            futuro.add_done_callback(al_renderizar)
+            return trabajo.id_trabajo
+        except (BrokenProcessPool, RuntimeError) as e:
+            print(f"Pool de PDF no disponible, se renderiza en hilo: {e}")
+            _descartar_pool()
+
+    _POOL_HILOS.submit(_renderizar_en_hilo, trabajo, renderizar, args, al_terminar)
+    return trabajo.id_trabajo
+
+
+def renderizar_en_paralelo(renderizar: Callable[..., Optional[bytes]], lista_args: List[tuple]) -> List[Optional[bytes]]:
+    """Renderiza varios PDFs a la vez en el pool de procesos y espera a todos (en orden).
+    Un PDF que falla queda como None. Sin pool disponible, se renderiza en este hilo."""
+    pool = _obtener_pool()
+    if pool is not None and len(lista_args) > 1:
+        try:
+            futuros = [pool.submit(renderizar, *args) for args in lista_args]
+            resultados = []
+            for futuro in futuros:
+                try:
+                    resultados.append(futuro.result())
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    print(f"Error renderizando PDF en lote: {e}")
+                    resultados.append(None)
+            return resultados
+        except (BrokenProcessPool, RuntimeError) as e:
+            print(f"Pool de PDF no disponible, se renderiza en serie: {e}")
+            _descartar_pool()
+
+    resultados = []
+    for args in lista_args:
+        try:
+            resultados.append(renderizar(*args))
+        except Exception as e:
+            print(f"Error renderizando PDF en lote: {e}")
+            resultados.append(None)
+    return resultados
+
+
+def obtener_trabajo(id_trabajo: str) -> Optional[TrabajoPDF]:
+    """Estado actual de un trabajo (None si no existe o ya se descartó)."""
+    with _lock:
+        return _trabajos.get(id_trabajo)
+
+
+def obtener_trabajos(ids: List[str]) -> List[TrabajoPDF]:
+    with _lock:
+        return [_trabajos[i] for i in ids if i in _trabajos]
+
+
+def renderizar_itinerario(datos_render: Dict[str, Any]) -> Optional[bytes]:
+    """Render del itinerario premium dentro del proceso trabajador."""
+    from controllers.pdf_controller import PDFController
+    buffer = PDFController().generar_itinerario_pdf(datos_render)
+    return buffer.getvalue() if buffer else None
+
+
+def renderizar_voucher(data: Dict[str, Any]) -> Optional[bytes]:
+    """Render de un vale de endose dentro del proceso trabajador."""
+    from controllers.pdf_controller import PDFController
+    buffer = PDFController().generar_voucher_endose_pdf(data)
+    return buffer.getvalue() if buffer else None
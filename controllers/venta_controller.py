@@ -1,40 +1,51 @@
 # controllers/venta_controller.py
 
 from models.venta_model import VentaModel
+from controllers.subidas_storage import ServicioSubidas
 from supabase import Client
 from datetime import date
 from typing import Optional, Any
 
 class VentaController:
     """Controlador para manejar la lógica de Ventas."""
+    # False si la función registrar_venta_completa no está instalada (se usa el flujo por pasos)
+    _rpc_venta_disponible = True
+
     def __init__(self, supabase_client:Client):
         self.client = supabase_client
         self.model = VentaModel(table_name='venta', supabase_client=supabase_client)
+        self.subidas = ServicioSubidas(supabase_client)
 
-    def _subir_archivo(self, bucket: str, file: Any, nombre_base: str) -> Optional[str]:
-        """Sube un archivo al Storage de Supabase y retorna su URL pública."""
-        try:
-            if not file: return None
-            
-            # 1. Preparar nombre de archivo único
-            ext = file.name.split('.')[-1]
-            timestamp = date.today().strftime("%Y%m%d")
-            file_path = f"{timestamp}_{nombre_base}.{ext}"
-            
-            # 2. Subir (leemos el contenido binario del UploadedFile de Streamlit)
-            file_content = file.getvalue()
-            res = self.client.storage.from_(bucket).upload(
-                path=file_path,
-                file=file_content,
-                file_options={"content-type": file.type}
-            )
-            
-            # 3. Obtener URL Pública
-            return self.client.storage.from_(bucket).get_public_url(file_path)
-            
-        except Exception as e:
-            print(f"Error subiendo archivo a {bucket}: {e}")
-            return None
+    def _crear_venta(self, venta_data: dict, convertir_lead: bool = False) -> Optional[int]:
+        """Crea la venta en una sola transacción (RPC); si la migración no está aplicada, usa el flujo por pasos."""
+        if VentaController._rpc_venta_disponible:
+            try:
+                return self.model.create_venta_transaccional(venta_data, convertir_lead=convertir_lead)
+            except Exception as e:
+                # PGRST202: la función no existe. Cualquier otro error es de la venta en sí y se propaga.
+                if getattr(e, 'code', None) != 'PGRST202':
+                    raise
+                print(f"RPC registrar_venta_completa no disponible, usando flujo por pasos: {e}")
+                VentaController._rpc_venta_disponible = False
+
+        nuevo_id = self.model.create_venta(venta_data)
+        id_itinerario_digital = venta_data.get('id_itinerario_digital')
+        if nuevo_id and convertir_lead and id_itinerario_digital:
+            try:
+                # Buscar el id_lead desde el itinerario
+                res_it = self.client.table('itinerario_digital').select('id_lead').eq('id_itinerario_digital', id_itinerario_digital).single().execute()
+                if res_it.data and res_it.data.get('id_lead'):
+                    self.client.table('lead').update({'estado_lead': 'CONVERTIDO'}).eq('id_lead', res_it.data['id_lead']).execute()
+            except: pass
+        return nuevo_id
+
+    def _subir_itinerario_y_pago(self, file_itinerario: Any, file_pago: Any) -> tuple:
+        """Sube ambos archivos de la venta en paralelo. Retorna (url_itinerario, url_pago)."""
+        urls = self.subidas.subir_varios({
+            'itinerario': ("itinerarios", file_itinerario),
+            'pago': ("vouchers", file_pago),
+        })
+        return urls['itinerario'], urls['pago']
 
     def registrar_venta_directa(self, 
                                 nombre_cliente: str,
@@ -60,9 +71,7 @@ class VentaController:
              return False, "Campos obligatorios faltantes (Nombre, Teléfono, Tour o Monto)."
 
         # 2. Manejo de Archivos Reales (Supabase Storage)
-        clean_name = nombre_cliente.replace(" ", "_").lower()
-        url_itinerario = self._subir_archivo("itinerarios", file_itinerario, f"itin_{clean_name}")
-        url_pago = self._subir_archivo("vouchers", file_pago, f"pago_{clean_name}")
+        url_itinerario, url_pago = self._subir_itinerario_y_pago(file_itinerario, file_pago)
         
         # 3. Preparar datos
         saldo = monto_total - monto_depositado
@@ -91,19 +100,10 @@ class VentaController:
         # Corregir typo detectado
         venta_data["estado_pago"] = estado_pago
         
-        # 4. Guardar
+        # 4. Guardar (5. Si viene de un Lead, se marca como CONVERTIDO en la misma operación)
         try:
-            nuevo_id = self.model.create_venta(venta_data)
+            nuevo_id = self._crear_venta(venta_data, convertir_lead=True)
             if nuevo_id:
-                # 5. Si viene de un Lead, marcar como CONVERTIDO
-                if id_itinerario_digital:
-                    try:
-                        # Buscar el id_lead desde el itinerario
-                        res_it = self.client.table('itinerario_digital').select('id_lead').eq('id_itinerario_digital', id_itinerario_digital).single().execute()
-                        if res_it.data and res_it.data.get('id_lead'):
-                            self.client.table('lead').update({'estado_lead': 'CONVERTIDO'}).eq('id_lead', res_it.data['id_lead']).execute()
-                    except: pass
-                
                 return True, f"Venta registrada. ID: {nuevo_id}. Saldo pendiente: {moneda} {float(saldo or 0):.2f}"
             else:
                 return False, "Error: no se pudo crear la venta."
@@ -130,9 +130,7 @@ class VentaController:
         """Registra una venta proveniente de una agencia externa (B2B)."""
         try:
             # 1. Manejo de Archivos
-            clean_name = nombre_cliente.replace(" ", "_").lower()
-            url_it = self._subir_archivo("itinerarios", file_itinerario, f"itin_b2b_{clean_name}")
-            url_pago = self._subir_archivo("vouchers", file_pago, f"pago_b2b_{clean_name}")
+            url_it, url_pago = self._subir_itinerario_y_pago(file_itinerario, file_pago)
 
             # 2. Lógica de Pago
             saldo = monto_total - monto_depositado
@@ -157,7 +155,7 @@ class VentaController:
                 "url_comprobante_pago": url_pago
             }
             
-            res_id = self.model.create_venta(venta_data)
+            res_id = self._crear_venta(venta_data)
             
             if res_id:
                 return True, f"Venta B2B de {nombre_proveedor} registrada éxito (ID: {res_id})"
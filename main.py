@@ -3,6 +3,7 @@ import streamlit as st
 import sys
 import os
 import importlib
+from contextlib import nullcontext
 from supabase import create_client, Client
 
 # --- 1. Configuración de Roles y Rutas ---
@@ -25,6 +26,20 @@ if vistas_path not in sys.path:
 if models_path not in sys.path:
     sys.path.insert(1, models_path)
 
+from models.instrumentacion import ClienteInstrumentado, iniciar_rerun, registro_consultas
+from models.perfilador import perfilar_pagina
+
+# Diagnóstico opcional de consultas (SGVO_DIAGNOSTICO=1): panel en el sidebar y,
+# si se indica SGVO_DIAGNOSTICO_JSON=<ruta>, volcado a JSON en cada rerun
+DIAGNOSTICO_ACTIVO = os.environ.get('SGVO_DIAGNOSTICO') == '1'
+DIAGNOSTICO_JSON = os.environ.get('SGVO_DIAGNOSTICO_JSON')
+# Perfilado opcional por página y sección (SGVO_PERFIL=1): reparto del tiempo entre DB, pandas
+# y render en el sidebar; con SGVO_PERFIL_DIR=<ruta> guarda un .prof (cProfile) por rerun
+PERFIL_ACTIVO = os.environ.get('SGVO_PERFIL') == '1'
+PERFIL_DIR = os.environ.get('SGVO_PERFIL_DIR')
+# Backend inyectado por session_state['cliente_pruebas'] (benchmarks/bench_reruns.py); nunca en producción
+CLIENTE_PRUEBAS_ACTIVO = os.environ.get('SGVO_CLIENTE_PRUEBAS') == '1'
+
 # Mapeo de roles a las funcionalidades (Actualizado para Usuario Maestro)
 MODULOS_VISIBLES = {
     "VENTAS": [
@@ -56,9 +71,11 @@ except KeyError:
 @st.cache_resource
 def init_supabase_client() -> Client:
     """Inicializa y cachea el cliente se Supabase."""
-    return create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+    client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+    return ClienteInstrumentado(client) if DIAGNOSTICO_ACTIVO else client
 
-supabase: Client = init_supabase_client()
+# benchmarks/bench_reruns.py (AppTest) inyecta el backend en memoria por session_state
+supabase: Client = (CLIENTE_PRUEBAS_ACTIVO and st.session_state.get('cliente_pruebas')) or init_supabase_client()
 st.session_state['supabase_client'] = supabase
 
 # --- 3. Logica de Autenticación y Estado ---
@@ -121,6 +138,8 @@ def logout_user():
 
 def main():
     st.set_page_config(page_title="SGVO - Cusco", layout="wide") # Nombre de la pestaña
+    rerun = iniciar_rerun('(login)') if DIAGNOSTICO_ACTIVO else None
+    perfil = None
 
     if not st.session_state['authenticated']:
         # ... Lógica de Login (Correcta) ...
@@ -163,6 +182,8 @@ def main():
         # Capturamos el nombre de la funcionalidad (Ej. "Registro de Leads")
         funcionalidad_seleccionada = paginas_permitidas[index_seleccionado][0]# <<-- CORRECCIÓN A: funcionalidad_seleccionada
         pagina_seleccionada_archivo = paginas_permitidas[index_seleccionado][1]
+        if rerun:
+            rerun.pagina = f"{pagina_seleccionada_archivo}: {funcionalidad_seleccionada}"
 
         try:
             nombres_modulo_completo = f'vistas.{pagina_seleccionada_archivo}'
@@ -174,8 +195,13 @@ def main():
             importlib.reload(modulo) # <--- FORZAR RECARGA PARA DESARROLLO
 
             if hasattr(modulo, 'mostrar_pagina'):
-                # Pasamos el cliente Supabase para que las vistas puedan hacer consultas seguras
-                modulo.mostrar_pagina(funcionalidad_seleccionada, rol_actual=rol, user_id=st.session_state.get('user_id'), supabase_client=supabase)
+                contexto_perfil = (
+                    perfilar_pagina(f"{pagina_seleccionada_archivo}: {funcionalidad_seleccionada}", PERFIL_DIR)
+                    if PERFIL_ACTIVO else nullcontext()
+                )
+                with contexto_perfil as perfil:
+                    # Pasamos el cliente Supabase para que las vistas puedan hacer consultas seguras
+                    modulo.mostrar_pagina(funcionalidad_seleccionada, rol_actual=rol, user_id=st.session_state.get('user_id'), supabase_client=supabase)
             else:
                  st.error(f"Error: El módulo {pagina_seleccionada_archivo} no tiene la función de entrada esperada.")
  
@@ -187,5 +213,15 @@ def main():
     st.sidebar.markdown("---")
     st.sidebar.button("Cerrar Sesión", on_click=logout_user)
 
+    if perfil:
+        from vistas.panel_diagnostico import mostrar_panel_perfil
+        mostrar_panel_perfil(perfil)
+
+    if rerun:
+        from vistas.panel_diagnostico import mostrar_panel_diagnostico
+        mostrar_panel_diagnostico(rerun)
+        if DIAGNOSTICO_JSON:
+            registro_consultas.volcar_json(DIAGNOSTICO_JSON)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
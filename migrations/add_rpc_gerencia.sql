@@ -0,0 +1,62 @@
+-- Migración: funciones de agregación para el panel de Gerencia
+-- Se llaman vía client.rpc('<nombre>') y devuelven solo el resultado agregado,
+-- así el payload no crece con el tamaño de las tablas.
+
+CREATE OR REPLACE FUNCTION gerencia_kpis_financieros()
+RETURNS TABLE (ventas_totales NUMERIC, total_recaudado NUMERIC)
+LANGUAGE sql STABLE AS $$
+    SELECT
+        (SELECT COALESCE(SUM(precio_total_cierre), 0) FROM venta),
+        (SELECT COALESCE(SUM(monto_pagado), 0) FROM pago);
+$$;
+
+CREATE OR REPLACE FUNCTION gerencia_pax_totales()
+RETURNS BIGINT
+LANGUAGE sql STABLE AS $$
+    SELECT COALESCE(SUM(cantidad_pasajeros), 0) FROM venta_tour;
+$$;
+
+CREATE OR REPLACE FUNCTION gerencia_ventas_por_canal()
+RETURNS TABLE (canal VARCHAR, monto NUMERIC)
+LANGUAGE sql STABLE AS $$
+    SELECT canal_venta, COALESCE(SUM(precio_total_cierre), 0)
+    FROM venta
+    WHERE canal_venta IS NOT NULL
+    GROUP BY canal_venta;
+$$;
+
+CREATE OR REPLACE FUNCTION gerencia_ventas_por_estado()
+RETURNS TABLE (estado VARCHAR, cantidad BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT estado_venta, COUNT(*)
+    FROM venta
+    WHERE estado_venta IS NOT NULL
+    GROUP BY estado_venta;
+$$;
+
+CREATE OR REPLACE FUNCTION gerencia_ventas_mensuales()
+RETURNS TABLE (mes TEXT, ventas NUMERIC)
+LANGUAGE sql STABLE AS $$
+    SELECT to_char(fecha_venta, 'YYYY-MM'), COALESCE(SUM(precio_total_cierre), 0)
+    FROM venta
+    WHERE fecha_venta IS NOT NULL
+    GROUP BY 1;
+$$;
+
+CREATE OR REPLACE FUNCTION gerencia_distribucion_estados_leads()
+RETURNS TABLE (estado VARCHAR, cantidad BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT estado_lead, COUNT(*)
+    FROM lead
+    WHERE estado_lead IS NOT NULL
+    GROUP BY estado_lead;
+$$;
+
+GRANT EXECUTE ON FUNCTION
+    gerencia_kpis_financieros(),
+    gerencia_pax_totales(),
+    gerencia_ventas_por_canal(),
+    gerencia_ventas_por_estado(),
+    gerencia_ventas_mensuales(),
+    gerencia_distribucion_estados_leads()
+TO anon, authenticated;
@@ -0,0 +1,142 @@
+-- Migración: registro de venta completo en una sola transacción
+-- Equivale a VentaModel.create_venta (cliente, vendedor, tour, itinerario, venta, pago
+-- inicial y expansión de días en venta_tour) más la conversión del lead.
+-- Se llama con client.rpc('registrar_venta_completa', {'p_venta': {...}}): un solo round trip
+-- y, si cualquier paso falla, no queda ninguna venta a medio escribir.
+
+CREATE OR REPLACE FUNCTION registrar_venta_completa(p_venta JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_nombre TEXT := NULLIF(trim(p_venta->>'nombre_cliente'), '');
+    v_vendedor_q TEXT := NULLIF(trim(p_venta->>'vendedor'), '');
+    v_tour_raw TEXT := COALESCE(p_venta->>'tour', '');
+    v_id_itin UUID := NULLIF(p_venta->>'id_itinerario_digital', '')::UUID;
+    v_monto_total NUMERIC := COALESCE(NULLIF(p_venta->>'monto_total', '')::NUMERIC, 0);
+    v_monto_dep NUMERIC := COALESCE(NULLIF(p_venta->>'monto_depositado', '')::NUMERIC, 0);
+    v_moneda TEXT := COALESCE(NULLIF(p_venta->>'moneda', ''), 'USD');
+    v_id_cliente INTEGER;
+    v_id_vendedor INTEGER;
+    v_id_tour INTEGER;
+    v_id_paquete INTEGER;
+    v_id_lead INTEGER;
+    v_render JSONB := '{}'::JSONB;
+    v_detalles JSONB := '[]'::JSONB;
+    v_num_pax INTEGER := 1;
+    v_inicio DATE;
+    v_fin DATE;
+    v_id_venta INTEGER;
+BEGIN
+    IF v_nombre IS NULL THEN
+        RAISE EXCEPTION 'El nombre del cliente es obligatorio';
+    END IF;
+
+    -- 1. Cliente (buscar por nombre o crear)
+    SELECT id_cliente INTO v_id_cliente FROM cliente WHERE nombre = v_nombre LIMIT 1;
+    IF v_id_cliente IS NULL THEN
+        INSERT INTO cliente (nombre, tipo_cliente, pais, genero)
+        VALUES (v_nombre, 'B2C', 'Desconocido', 'N/A')
+        RETURNING id_cliente INTO v_id_cliente;
+    END IF;
+
+    -- 2. Vendedor (email exacto, nombre parcial o el primero disponible)
+    IF v_vendedor_q IS NOT NULL THEN
+        SELECT id_vendedor INTO v_id_vendedor FROM vendedor WHERE email = v_vendedor_q LIMIT 1;
+        IF v_id_vendedor IS NULL THEN
+            SELECT id_vendedor INTO v_id_vendedor FROM vendedor WHERE nombre ILIKE '%' || v_vendedor_q || '%' LIMIT 1;
+        END IF;
+    END IF;
+    IF v_id_vendedor IS NULL THEN
+        SELECT id_vendedor INTO v_id_vendedor FROM vendedor LIMIT 1;
+    END IF;
+    IF v_id_vendedor IS NULL THEN
+        RAISE EXCEPTION 'No hay vendedores en la base de datos.';
+    END IF;
+
+    -- 3. Tour del catálogo ('T-<id>'), paquete ('P-<id>') o búsqueda por nombre
+    IF v_tour_raw ~ '^P-[0-9]+$' THEN
+        v_id_paquete := substring(v_tour_raw FROM 3)::INTEGER;
+    ELSIF v_tour_raw ~ '^T-[0-9]+$' THEN
+        v_id_tour := substring(v_tour_raw FROM 3)::INTEGER;
+    ELSIF v_tour_raw <> '' THEN
+        SELECT id_tour INTO v_id_tour FROM tour WHERE nombre ILIKE '%' || v_tour_raw || '%' LIMIT 1;
+    END IF;
+
+    -- 4. Itinerario digital (una sola lectura: pax, días y lead de origen)
+    IF v_id_itin IS NOT NULL THEN
+        SELECT datos_render, id_lead INTO v_render, v_id_lead
+        FROM itinerario_digital WHERE id_itinerario_digital = v_id_itin;
+        v_render := COALESCE(v_render, '{}'::JSONB);
+
+        v_num_pax := COALESCE(
+            NULLIF(substring(v_render->>'cantidad_pax' FROM '^[0-9]+')::INTEGER, 0),
+            NULLIF(substring(v_render->>'pax_count' FROM '^[0-9]+')::INTEGER, 0),
+            1);
+
+        -- Soportar 'itinerario_detalles' (nuevo), 'itinerario_detales' (viejo) o 'days' (externo)
+        v_detalles := COALESCE(
+            NULLIF(v_render->'itinerario_detalles', '[]'::JSONB),
+            NULLIF(v_render->'itinerario_detales', '[]'::JSONB),
+            NULLIF(v_render->'days', '[]'::JSONB),
+            '[]'::JSONB);
+        IF jsonb_typeof(v_detalles) <> 'array' THEN
+            v_detalles := '[]'::JSONB;
+        END IF;
+    END IF;
+
+    -- 5. Venta
+    INSERT INTO venta (
+        id_cliente, id_vendedor, fecha_venta, canal_venta, precio_total_cierre, moneda,
+        estado_pago, estado_venta, id_paquete, tour_nombre, num_pasajeros,
+        id_agencia_aliada, id_itinerario_digital
+    ) VALUES (
+        v_id_cliente, v_id_vendedor,
+        COALESCE(NULLIF(p_venta->>'fecha_registro', '')::DATE, CURRENT_DATE),
+        COALESCE(NULLIF(p_venta->>'origen', ''), 'DIRECTO'),
+        v_monto_total, v_moneda,
+        CASE WHEN v_monto_total - v_monto_dep <= 0 THEN 'COMPLETADO' ELSE 'PENDIENTE' END,
+        'CONFIRMADO', v_id_paquete, v_tour_raw, v_num_pax,
+        NULLIF(p_venta->>'id_agencia_aliada', '')::INTEGER, v_id_itin
+    )
+    RETURNING id_venta INTO v_id_venta;
+
+    -- 6. Pago inicial
+    IF v_monto_dep > 0 THEN
+        INSERT INTO pago (id_venta, fecha_pago, monto_pagado, moneda, metodo_pago, tipo_pago, observacion)
+        VALUES (v_id_venta, CURRENT_DATE, v_monto_dep, v_moneda, 'OTRO', 'ADELANTO',
+                'Pago inicial registrado. Saldo: ' || COALESCE(p_venta->>'saldo', ''));
+    END IF;
+
+    -- 7. Expansión de días para Operaciones (un día por fecha entre inicio y fin)
+    v_inicio := COALESCE(NULLIF(p_venta->>'fecha_inicio', '')::DATE, CURRENT_DATE);
+    v_fin := GREATEST(COALESCE(NULLIF(p_venta->>'fecha_fin', '')::DATE, v_inicio), v_inicio);
+
+    INSERT INTO venta_tour (
+        id_venta, n_linea, id_tour, fecha_servicio, precio_applied, precio_vendedor,
+        costo_applied, cantidad_pasajeros, observaciones, id_itinerario_dia_index
+    )
+    SELECT
+        v_id_venta, d.i + 1,
+        CASE WHEN d.i = 0 THEN v_id_tour END,
+        v_inicio + d.i,
+        CASE WHEN d.i = 0 THEN v_monto_total ELSE 0 END,
+        CASE WHEN d.i = 0 THEN v_monto_total ELSE 0 END,
+        0, v_num_pax,
+        COALESCE(
+            NULLIF(v_detalles->d.i->>'titulo', ''),
+            NULLIF(v_detalles->d.i->>'nombre', ''),
+            NULLIF(v_detalles->d.i->>'title', ''),
+            p_venta->>'tour'),
+        d.i + 1
+    FROM generate_series(0, v_fin - v_inicio) AS d(i);
+
+    -- 8. Lead de origen -> CONVERTIDO
+    IF COALESCE((p_venta->>'convertir_lead')::BOOLEAN, FALSE) AND v_id_lead IS NOT NULL THEN
+        UPDATE lead SET estado_lead = 'CONVERTIDO' WHERE id_lead = v_id_lead;
+    END IF;
+
+    RETURN v_id_venta;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION registrar_venta_completa(JSONB) TO anon, authenticated;
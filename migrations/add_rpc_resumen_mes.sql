@@ -0,0 +1,44 @@
+-- Migración: resumen por día del calendario de operaciones
+-- Se llama vía client.rpc('operaciones_resumen_mes', {'p_desde': ..., 'p_hasta': ...}) y devuelve
+-- una fila por día con servicios: una sola consulta agrupada en lugar de descargar venta_tour.
+-- Referencia en Python puro: controllers/agregados_operaciones.py
+
+CREATE INDEX IF NOT EXISTS idx_venta_tour_fecha_servicio ON venta_tour(fecha_servicio);
+
+-- p_hasta es exclusivo (primer día del mes siguiente)
+CREATE OR REPLACE FUNCTION operaciones_resumen_mes(p_desde DATE, p_hasta DATE)
+RETURNS TABLE (fecha DATE, servicios BIGINT, pax BIGINT, sin_guia BIGINT, pago_pendiente BIGINT)
+LANGUAGE sql STABLE AS $$
+    -- Como el tablero de operaciones, sin los servicios de ventas B2B (con agencia aliada)
+    WITH servicios AS (
+        SELECT vt.id_venta, vt.n_linea, vt.fecha_servicio, vt.cantidad_pasajeros, vt.es_endoso,
+               v.precio_total_cierre
+        FROM venta_tour vt
+        LEFT JOIN venta v ON v.id_venta = vt.id_venta
+        WHERE vt.fecha_servicio >= p_desde AND vt.fecha_servicio < p_hasta
+          AND v.id_agencia_aliada IS NULL
+    ),
+    pagado AS (
+        SELECT id_venta, SUM(monto_pagado) AS total
+        FROM pago
+        WHERE id_venta IN (SELECT id_venta FROM servicios)
+        GROUP BY id_venta
+    )
+    SELECT
+        s.fecha_servicio,
+        COUNT(*),
+        COALESCE(SUM(s.cantidad_pasajeros), 0),
+        -- Los servicios endosados los opera el proveedor: no requieren guía propio
+        COUNT(*) FILTER (WHERE NOT COALESCE(s.es_endoso, FALSE) AND NOT EXISTS (
+            SELECT 1 FROM venta_servicio_proveedor g
+            WHERE g.id_venta = s.id_venta AND g.n_linea = s.n_linea AND g.tipo_servicio = 'GUIA'
+        )),
+        -- Mismo umbral que ServicioOperativo.saldado
+        COUNT(*) FILTER (WHERE COALESCE(s.precio_total_cierre, 0) - COALESCE(p.total, 0) > 0.1)
+    FROM servicios s
+    LEFT JOIN pagado p ON p.id_venta = s.id_venta
+    GROUP BY s.fecha_servicio
+    ORDER BY s.fecha_servicio;
+$$;
+
+GRANT EXECUTE ON FUNCTION operaciones_resumen_mes(DATE, DATE) TO anon, authenticated;
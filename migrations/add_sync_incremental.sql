@@ -0,0 +1,61 @@
+-- Migración: sincronización incremental de venta, pago y venta_tour
+-- La app guarda una copia local de estas tablas y en cada refresco pide solo las filas con
+-- updated_at posterior a su marca de agua, más las bajas registradas en registro_eliminado.
+-- (venta ya tiene updated_at y el trigger update_venta_updated_at)
+
+-- 1. updated_at en pago y venta_tour
+ALTER TABLE pago ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE venta_tour ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;
+
+DROP TRIGGER IF EXISTS update_pago_updated_at ON pago;
+CREATE TRIGGER update_pago_updated_at BEFORE UPDATE ON pago
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_venta_tour_updated_at ON venta_tour;
+CREATE TRIGGER update_venta_tour_updated_at BEFORE UPDATE ON venta_tour
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE INDEX IF NOT EXISTS idx_venta_updated_at ON venta(updated_at);
+CREATE INDEX IF NOT EXISTS idx_pago_updated_at ON pago(updated_at);
+CREATE INDEX IF NOT EXISTS idx_venta_tour_updated_at ON venta_tour(updated_at);
+
+-- 2. Lápidas (tombstones) de filas eliminadas
+CREATE TABLE IF NOT EXISTS registro_eliminado (
+    id_registro BIGSERIAL PRIMARY KEY,
+    tabla VARCHAR(50) NOT NULL,
+    pk JSONB NOT NULL, -- {"id_venta": 10, "n_linea": 2}
+    eliminado_en TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_registro_eliminado_tabla ON registro_eliminado(tabla, eliminado_en);
+
+-- Los argumentos del trigger son las columnas de la PK de la tabla
+CREATE OR REPLACE FUNCTION registrar_eliminado()
+RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER AS $$
+DECLARE
+    v_pk JSONB := '{}'::JSONB;
+    v_col TEXT;
+BEGIN
+    FOREACH v_col IN ARRAY TG_ARGV LOOP
+        v_pk := v_pk || jsonb_build_object(v_col, to_jsonb(OLD)->v_col);
+    END LOOP;
+    INSERT INTO registro_eliminado (tabla, pk) VALUES (TG_TABLE_NAME, v_pk);
+    RETURN OLD;
+END;
+$$;
+
+-- Se disparan también en los borrados en cascada (venta -> pago, venta_tour)
+DROP TRIGGER IF EXISTS trigger_eliminado_venta ON venta;
+CREATE TRIGGER trigger_eliminado_venta AFTER DELETE ON venta
+    FOR EACH ROW EXECUTE FUNCTION registrar_eliminado('id_venta');
+
+DROP TRIGGER IF EXISTS trigger_eliminado_pago ON pago;
+CREATE TRIGGER trigger_eliminado_pago AFTER DELETE ON pago
+    FOR EACH ROW EXECUTE FUNCTION registrar_eliminado('id_pago');
+
+DROP TRIGGER IF EXISTS trigger_eliminado_venta_tour ON venta_tour;
+CREATE TRIGGER trigger_eliminado_venta_tour AFTER DELETE ON venta_tour
+    FOR EACH ROW EXECUTE FUNCTION registrar_eliminado('id_venta', 'n_linea');
+
+GRANT SELECT ON registro_eliminado TO anon, authenticated;
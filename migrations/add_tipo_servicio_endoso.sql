@@ -0,0 +1,12 @@
+-- Migración: tipos de servicio de endoso en venta_servicio_proveedor
+-- OperacionesController.actualizar_endoso_servicio vincula el operador de un servicio endosado
+-- con tipo_servicio 'PROVEEDOR_ENDOSO' (y el enriquecimiento también lee 'AGENCIA_ENDOSO'),
+-- pero el CHECK de INSTALL_FINAL_SUPABASE.sql no los admitía: el upsert fallaba.
+
+ALTER TABLE venta_servicio_proveedor DROP CONSTRAINT IF EXISTS venta_servicio_proveedor_tipo_servicio_check;
+ALTER TABLE venta_servicio_proveedor ADD CONSTRAINT venta_servicio_proveedor_tipo_servicio_check
+    CHECK (tipo_servicio IN (
+        'TRANSPORTE', 'ALOJAMIENTO', 'ALIMENTACION',
+        'GUIA', 'TICKETS', 'OTRO',
+        'PROVEEDOR_ENDOSO', 'AGENCIA_ENDOSO'
+    ));
@@ -2,28 +2,71 @@
 
 # Mantenemos las importaciones de tipos
 from supabase import Client as SupabaseClient
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
+from .cache_referencias import invalidar_tabla
+from .cache_incremental import marcar_desactualizada
+from .paginacion import paginar_por_llave
 
 class BaseModel:
     """Clase base para interactuar directamente con una tabla específica de Supabase.
     Recibe el cliente de Supabase (inyección de dependencia) en la inicialización."""
     
-    # 1. Constructor: Añadido primary_key param
-    def __init__(self, table_name: str, supabase_client: SupabaseClient, primary_key: str = 'id'):
+    # 1. Constructor: Añadido primary_key param (y conflict_target para upserts con PK compuesta)
+    def __init__(self, table_name: str, supabase_client: SupabaseClient, primary_key: str = 'id', conflict_target: Optional[str] = None):
         self.table_name = table_name
         self.client = supabase_client 
         self.primary_key = primary_key
+        self.conflict_target = conflict_target or primary_key
 
-    # 2. get_all: Corregido el tipado (Dict) y el acceso al método (client.table)
+    # 2. get_all: Recorre la tabla completa por páginas (evita el corte por max-rows de PostgREST)
     def get_all(self) -> List[Dict[str, Any]]:
         """Obtiene todos los registros de la tabla Supabase."""
         try:
-            response = self.client.table(self.table_name).select('*').execute()
-            return response.data
+            return list(self.iter_all())
         except Exception as e:
             print(f'Error al obtener todos los datos de {self.table_name}: {e}')
             return []
 
+    def _llave_unica(self) -> List[str]:
+        """Columnas que identifican una fila: la PK, simple o compuesta (conflict_target)."""
+        return [c.strip() for c in self.conflict_target.split(',') if c.strip()]
+
+    def iter_pages(self, page_size: int = 1000, columns: str = '*', order_by: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Genera la tabla en páginas usando paginación por llave (keyset) sobre la PK.
+        Cada página pide filas posteriores a la última vista, así el costo no crece con el offset.
+        Con PK compuesta (p. ej. venta_tour: id_venta, n_linea) se compara la tupla completa.
+        `order_by` solo se acepta si es la PK: sobre una columna que se repite se saltarían filas."""
+        llave = self._llave_unica()
+        if order_by is not None and [c.strip() for c in order_by.split(',')] != llave:
+            raise ValueError(f"iter_pages en {self.table_name} solo pagina por su llave única "
+                             f"({', '.join(llave)}), no por '{order_by}'")
+        if columns != '*':
+            seleccion = [c.strip() for c in columns.split(',')]
+            faltantes = [c for c in llave if c not in seleccion]
+            if faltantes:
+                columns = ', '.join([columns] + faltantes)
+
+        yield from paginar_por_llave(lambda: self.client.table(self.table_name).select(columns), llave, page_size)
+
+    def iter_all(self, page_size: int = 1000, columns: str = '*', order_by: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Itera registro por registro sobre toda la tabla sin cargarla completa en memoria."""
+        for pagina in self.iter_pages(page_size=page_size, columns=columns, order_by=order_by):
+            yield from pagina
+
+    def get_dataframe(self, page_size: int = 1000, columns: str = '*', order_by: Optional[str] = None):
+        """Construye un DataFrame de la tabla completa, página por página."""
+        import pandas as pd
+
+        frames = [pd.DataFrame(p) for p in self.iter_pages(page_size=page_size, columns=columns, order_by=order_by)]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def _tras_escritura(self) -> None:
+        """Invalida las cachés de proceso que dependen de esta tabla."""
+        invalidar_tabla(self.table_name)
+        marcar_desactualizada(self.table_name)
+
     def get_by_id(self, item_id: Any) -> Optional[Dict[str, Any]]:
         """Busca un ítem en la tabla por su PK."""
         try:
@@ -35,15 +78,42 @@ class BaseModel:
     def save(self, data: dict) -> Optional[Any]:
         """Insertar un nuevo registro y devolver el valor de la PK."""
         response = self.client.table(self.table_name).insert(data).execute()
+        self._tras_escritura()
 
         if response.data:
             return response.data[0].get(self.primary_key)
         return None
     
+    def insert_many(self, rows: List[Dict[str, Any]], chunk_size: int = 500) -> List[Dict[str, Any]]:
+        """Inserta varios registros con una petición por lote y devuelve las filas creadas."""
+        insertados = []
+        for i in range(0, len(rows), chunk_size):
+            response = self.client.table(self.table_name).insert(rows[i:i + chunk_size]).execute()
+            insertados.extend(response.data or [])
+        if rows:
+            self._tras_escritura()
+        return insertados
+
+    def upsert_many(self, rows: List[Dict[str, Any]], on_conflict: Optional[str] = None, chunk_size: int = 500) -> List[Dict[str, Any]]:
+        """Inserta o actualiza varios registros por lotes, resolviendo conflictos sobre `on_conflict`
+        (por defecto el conflict_target del modelo)."""
+        guardados = []
+        for i in range(0, len(rows), chunk_size):
+            response = (
+                self.client.table(self.table_name)
+                .upsert(rows[i:i + chunk_size], on_conflict=on_conflict or self.conflict_target)
+                .execute()
+            )
+            guardados.extend(response.data or [])
+        if rows:
+            self._tras_escritura()
+        return guardados
+
     def update_by_id(self, item_id: Any, data: dict) -> bool:
         """Actualiza un registro filtrando por su PK."""
         try:
             response = self.client.table(self.table_name).update(data).eq(self.primary_key, item_id).execute()
+            self._tras_escritura()
             return len(response.data) > 0
         except Exception as e:
             print(f"Error al actualizar PK {item_id} en {self.table_name}: {e}")
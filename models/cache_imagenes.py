@@ -0,0 +1,162 @@
+# models/cache_imagenes.py
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Iterable, Optional, Tuple
+
+import httpx
+from PIL import Image
+
+# Ancho (px) de las fotos en el PDF: A4 a ~150 dpi
+ANCHO_PDF = 900
+CALIDAD_JPEG = 78
+
+# Descargas en un pool propio: se llaman desde renders que pueden estar corriendo en el pool
+# compartido de controllers/concurrencia.py, y esperar en ese mismo pool lo puede agotar
+_POOL_DESCARGAS = ThreadPoolExecutor(max_workers=4, thread_name_prefix='sgvo-img')
+
+
+def reducir_a_jpeg(contenido: bytes, ancho_max: int, alto_max: int, calidad: int = CALIDAD_JPEG) -> bytes:
+    """Reduce la imagen para que quepa en ancho_max x alto_max (sin agrandarla) y la codifica como JPEG."""
+    with Image.open(BytesIO(contenido)) as imagen:
+        imagen.load()
+        if imagen.mode in ('RGBA', 'LA', 'P'):
+            # JPEG no tiene transparencia: fondo blanco como el del PDF
+            imagen = imagen.convert('RGBA')
+            fondo = Image.new('RGB', imagen.size, (255, 255, 255))
+            fondo.paste(imagen, mask=imagen.split()[-1])
+            imagen = fondo
+        else:
+            imagen = imagen.convert('RGB')
+        if imagen.width > ancho_max or imagen.height > alto_max:
+            imagen.thumbnail((ancho_max, alto_max), Image.LANCZOS)
+        salida = BytesIO()
+        imagen.save(salida, 'JPEG', quality=calidad, optimize=True)
+        return salida.getvalue()
+
+
+class CacheImagenes:
+    """Almacén local de imágenes direccionado por contenido, para las plantillas PDF.
+    El original se guarda por sha256 de su contenido (originales/<hash>) y las variantes
+    reducidas como JPEG (variantes/<hash>_<ancho>.jpg). indice/<sha256(url)> apunta de la URL
+    al hash del contenido y guarda su ETag/Last-Modified: pasado `ttl_indice` se revalida con una
+    petición condicional, así una imagen reemplazada en la misma URL se vuelve a descargar.
+    Solo acepta URLs http(s)."""
+
+    def __init__(self, directorio: str, timeout: float = 10.0, ttl_indice: float = 6 * 3600,
+                 ttl_fallo: float = 300.0, max_memoria: int = 1024):
+        self.directorio = directorio
+        self.timeout = timeout
+        self.ttl_indice = ttl_indice
+        self.ttl_fallo = ttl_fallo
+        self.max_memoria = max_memoria
+        # (url, ancho) -> (ruta o None si falló, vence): LRU acotada; las fallas vencen antes
+        self._memoria: "OrderedDict[tuple, Tuple[Optional[str], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _ruta(self, *partes: str) -> str:
+        return os.path.join(self.directorio, *partes)
+
+    @staticmethod
+    def _escribir(ruta: str, contenido: bytes) -> None:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporal, 'wb') as f:
+            f.write(contenido)
+        os.replace(temporal, ruta)
+
+    @staticmethod
+    def _leer_indice(ruta: str) -> Dict[str, str]:
+        with open(ruta, encoding='utf-8') as f:
+            texto = f.read().strip()
+        try:
+            return json.loads(texto)
+        except ValueError:
+            return {'hash': texto}  # formato anterior: solo el hash
+
+    def _hash_original(self, url: str) -> str:
+        """Hash del contenido de la URL. Se descarga la primera vez y, vencido el índice,
+        se revalida (304 = sin cambios); si la revalidación falla se usa la copia local."""
+        indice = self._ruta('indice', hashlib.sha256(url.encode('utf-8')).hexdigest())
+        entrada = self._leer_indice(indice) if os.path.exists(indice) else None
+        if entrada and time.time() - os.path.getmtime(indice) < self.ttl_indice:
+            return entrada['hash']
+
+        encabezados = {}
+        if entrada and entrada.get('etag'):
+            encabezados['If-None-Match'] = entrada['etag']
+        if entrada and entrada.get('last_modified'):
+            encabezados['If-Modified-Since'] = entrada['last_modified']
+        try:
+            respuesta = httpx.get(url, timeout=self.timeout, follow_redirects=True, headers=encabezados)
+            if entrada and respuesta.status_code == 304:
+                os.utime(indice)
+                return entrada['hash']
+            respuesta.raise_for_status()
+        except Exception as e:
+            if entrada:
+                print(f"Error revalidando imagen {url}, se usa la copia local: {e}")
+                return entrada['hash']
+            raise
+
+        contenido = respuesta.content
+        hash_contenido = hashlib.sha256(contenido).hexdigest()
+        original = self._ruta('originales', hash_contenido)
+        if not os.path.exists(original):
+            self._escribir(original, contenido)
+        self._escribir(indice, json.dumps({
+            'hash': hash_contenido,
+            'etag': respuesta.headers.get('etag'),
+            'last_modified': respuesta.headers.get('last-modified'),
+        }).encode('utf-8'))
+        return hash_contenido
+
+    def _crear_variante(self, hash_contenido: str, ancho: int) -> str:
+        variante = self._ruta('variantes', f'{hash_contenido}_{ancho}.jpg')
+        if os.path.exists(variante):
+            return variante
+        with open(self._ruta('originales', hash_contenido), 'rb') as f:
+            self._escribir(variante, reducir_a_jpeg(f.read(), ancho, ancho * 10))
+        return variante
+
+    def ruta_local(self, url: str, ancho: int = ANCHO_PDF) -> Optional[str]:
+        """Ruta del JPEG reducido para `url` (None si no es http(s) o no se pudo descargar/abrir)."""
+        if not url or not url.startswith(('http://', 'https://')):
+            return None
+        llave = (url, ancho)
+        with self._lock:
+            entrada = self._memoria.get(llave)
+            if entrada and time.monotonic() < entrada[1]:
+                self._memoria.move_to_end(llave)
+                return entrada[0]
+        try:
+            ruta = self._crear_variante(self._hash_original(url), ancho)
+        except Exception as e:
+            print(f"Error cacheando imagen {url}: {e}")
+            ruta = None
+        # Las fallas también se recuerdan, pero poco tiempo: un corte de red no deja al PDF sin foto
+        vence = time.monotonic() + (self.ttl_indice if ruta else self.ttl_fallo)
+        with self._lock:
+            self._memoria[llave] = (ruta, vence)
+            self._memoria.move_to_end(llave)
+            while len(self._memoria) > self.max_memoria:
+                self._memoria.popitem(last=False)
+        return ruta
+
+    def rutas_locales(self, urls: Iterable[str], ancho: int = ANCHO_PDF) -> Dict[str, Optional[str]]:
+        """{url: ruta_local(url)} descargando en paralelo en el pool de imágenes."""
+        futuros = {u: _POOL_DESCARGAS.submit(self.ruta_local, u, ancho) for u in set(urls)}
+        return {u: futuro.result() for u, futuro in futuros.items()}
+
+
+# xhtml2pdf solo lee archivos locales dentro del directorio de trabajo: SGVO_IMAGENES_CACHE_DIR
+# debe quedar dentro de la carpeta de la app
+cache_imagenes = CacheImagenes(
+    os.environ.get('SGVO_IMAGENES_CACHE_DIR',
+                   os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'imagenes'))
+)
@@ -0,0 +1,173 @@
+# models/cache_incremental.py
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .paginacion import paginar_por_llave
+
+
+class CacheIncremental:
+    """Copia local de una tabla que se sincroniza por marca de agua (updated_at).
+    La primera vez descarga la tabla completa; después solo pide las filas modificadas desde
+    la última marca y las bajas de `registro_eliminado` (migrations/add_sync_incremental.sql),
+    y las combina por PK. Si la migración no está aplicada, recarga la tabla completa."""
+
+    def __init__(self, tabla: str, pk: Tuple[str, ...], columnas: str,
+                 col_marca: str = 'updated_at', intervalo: float = 15.0,
+                 solapamiento: timedelta = timedelta(seconds=60), page_size: int = 1000):
+        self.tabla = tabla
+        self.pk = pk
+        self.columnas = columnas
+        self.col_marca = col_marca
+        self.intervalo = intervalo
+        # Margen hacia atrás al pedir cambios: updated_at se fija al inicio de la transacción,
+        # así que una transacción larga puede confirmar filas con marca anterior a la ya vista.
+        self.solapamiento = solapamiento
+        self.page_size = page_size
+
+        self.incremental = True
+        self._filas: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        self._marca: Optional[str] = None
+        self._marca_bajas: Optional[str] = None
+        self._ultimo_refresco: Optional[float] = None
+        self._df = None
+        self._lock = threading.Lock()
+
+    def _llave(self, fila: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(fila[c] for c in self.pk)
+
+    def _paginar(self, crear_query: Callable[[], Any], llave: Sequence[str]) -> List[Dict[str, Any]]:
+        """Recorre una consulta por páginas con keyset sobre `llave` (models/paginacion.py).
+        Con offset, una fila actualizada durante el recorrido del delta cambia de página y
+        desplaza a las siguientes: alguna se saltaría hasta la próxima carga completa."""
+        return [fila for pagina in paginar_por_llave(crear_query, llave, self.page_size) for fila in pagina]
+
+    def _desde(self, marca: str) -> str:
+        return (datetime.fromisoformat(marca) - self.solapamiento).isoformat()
+
+    @staticmethod
+    def _posterior(a: Optional[str], b: Optional[str]) -> bool:
+        """True si la marca `a` es posterior a `b` (None es la más antigua)."""
+        if a is None:
+            return False
+        return b is None or datetime.fromisoformat(a) > datetime.fromisoformat(b)
+
+    def _aplicar(self, filas: List[Dict[str, Any]]) -> None:
+        for fila in filas:
+            self._filas[self._llave(fila)] = fila
+            marca = fila.get(self.col_marca)
+            if self._posterior(marca, self._marca):
+                self._marca = marca
+
+    def _carga_completa(self, client) -> int:
+        columnas = f'{self.columnas}, {self.col_marca}' if self.incremental else self.columnas
+
+        filas = self._paginar(lambda: client.table(self.tabla).select(columnas), self.pk)
+        self._filas, self._marca = {}, None
+        self._aplicar(filas)
+        return len(filas)
+
+    def _carga_delta(self, client) -> int:
+        desde = self._desde(self._marca)
+
+        # Keyset sobre (updated_at, pk): una fila que se actualiza a mitad del recorrido pasa al
+        # final (nueva marca) y se recibe en una página posterior, sin desplazar a las demás
+        filas = self._paginar(lambda: (
+            client.table(self.tabla)
+            .select(f'{self.columnas}, {self.col_marca}')
+            .gte(self.col_marca, desde)
+        ), (self.col_marca, *self.pk))
+        self._aplicar(filas)
+
+        # Bajas físicas (DELETE) registradas por trigger
+        desde_bajas = self._desde(self._marca_bajas) if self._marca_bajas else desde
+        bajas = self._paginar(lambda: (
+            client.table('registro_eliminado')
+            .select('id_registro, pk, eliminado_en')
+            .eq('tabla', self.tabla)
+            .gte('eliminado_en', desde_bajas)
+        ), ('id_registro',))
+        for baja in bajas:
+            llave = tuple(baja['pk'].get(c) for c in self.pk)
+            fila = self._filas.get(llave)
+            # Solo si la fila no se volvió a insertar después de la baja (venta_tour reutiliza su PK)
+            if fila is not None and self._posterior(baja['eliminado_en'], fila.get(self.col_marca)):
+                del self._filas[llave]
+            if self._posterior(baja['eliminado_en'], self._marca_bajas):
+                self._marca_bajas = baja['eliminado_en']
+        return len(filas) + len(bajas)
+
+    def refrescar(self, client, forzar: bool = False) -> int:
+        """Sincroniza la copia local y retorna cuántas filas se recibieron."""
+        with self._lock:
+            if not forzar and self._ultimo_refresco is not None and \
+                    (time.monotonic() - self._ultimo_refresco) < self.intervalo:
+                return 0
+
+            recibidas = 0
+            if self.incremental and self._marca is not None:
+                try:
+                    recibidas = self._carga_delta(client)
+                except Exception as e:
+                    print(f"Error en sincronización incremental de {self.tabla}, recargando completa: {e}")
+                    self._marca = None
+
+            if not self.incremental or self._marca is None:
+                try:
+                    recibidas = self._carga_completa(client)
+                except Exception as e:
+                    if not self.incremental:
+                        raise
+                    # Sin columna updated_at (migración no aplicada): cargas completas en cada refresco
+                    print(f"Sincronización incremental no disponible para {self.tabla}: {e}")
+                    self.incremental = False
+                    recibidas = self._carga_completa(client)
+                if self._marca is None:
+                    # Tabla vacía o sin marcas: el próximo refresco vuelve a ser completo
+                    self._marca_bajas = None
+
+            self._ultimo_refresco = time.monotonic()
+            if recibidas:
+                self._df = None
+            return recibidas
+
+    def marcar_desactualizada(self) -> None:
+        """Obliga a consultar cambios en el próximo acceso (sin esperar el intervalo)."""
+        with self._lock:
+            self._ultimo_refresco = None
+
+    def vaciar(self) -> None:
+        """Descarta la copia local; el próximo acceso vuelve a cargar la tabla completa."""
+        with self._lock:
+            self._filas, self._marca, self._marca_bajas = {}, None, None
+            self._ultimo_refresco, self._df = None, None
+            self.incremental = True
+
+    def dataframe(self, client):
+        """DataFrame de la copia local tras sincronizarla. No modificar: se comparte entre reruns."""
+        import pandas as pd
+
+        self.refrescar(client)
+        with self._lock:
+            if self._df is None:
+                self._df = pd.DataFrame(list(self._filas.values()))
+            return self._df
+
+
+# Copias locales compartidas por el proceso (tablas grandes de los dashboards)
+CACHES_INCREMENTALES: Dict[str, CacheIncremental] = {
+    'venta': CacheIncremental(
+        'venta', ('id_venta',),
+        'id_venta, fecha_venta, id_cliente, id_vendedor, canal_venta, precio_total_cierre, moneda, estado_venta'
+    ),
+    'pago': CacheIncremental('pago', ('id_pago',), 'id_pago, id_venta, monto_pagado'),
+    'venta_tour': CacheIncremental('venta_tour', ('id_venta', 'n_linea'), 'id_venta, n_linea, cantidad_pasajeros'),
+}
+
+
+def marcar_desactualizada(tabla: str) -> None:
+    """Tras escribir en una tabla con copia local, fuerza su sincronización en el próximo acceso."""
+    cache = CACHES_INCREMENTALES.get(tabla)
+    if cache:
+        cache.marcar_desactualizada()
@@ -0,0 +1,144 @@
+# models/cache_pdf.py
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+# Cambiar si cambia la forma de renderizar (motor, CSS base) para no servir PDFs viejos
+VERSION_RENDER = 1
+
+
+def clave_pdf(fuente_plantilla: str, contexto: Any) -> str:
+    """sha256 del código de la plantilla + el contexto canónico (claves ordenadas, fechas como texto)."""
+    h = hashlib.sha256()
+    h.update(f'v{VERSION_RENDER}\0'.encode())
+    h.update(fuente_plantilla.encode('utf-8'))
+    h.update(b'\0')
+    h.update(json.dumps(contexto, sort_keys=True, default=str, ensure_ascii=False,
+                        separators=(',', ':')).encode('utf-8'))
+    return h.hexdigest()
+
+
+class CachePDF:
+    """Caché de PDFs renderizados direccionada por contenido, en dos niveles:
+    memoria (LRU limitada a `max_bytes_memoria`) y disco (`directorio`, limitado a `max_bytes_disco`;
+    al superarlo se borran los archivos menos usados, por fecha de modificación)."""
+
+    def __init__(self, directorio: Optional[str], max_bytes_memoria: int = 64 * 1024 * 1024,
+                 max_bytes_disco: int = 512 * 1024 * 1024):
+        self.directorio = directorio
+        self.max_bytes_memoria = max_bytes_memoria
+        self.max_bytes_disco = max_bytes_disco
+        self._memoria: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes_memoria = 0
+        self._lock = threading.RLock()
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f'{clave}.pdf')
+
+    def _guardar_memoria(self, clave: str, contenido: bytes) -> None:
+        if len(contenido) > self.max_bytes_memoria:
+            return
+        with self._lock:
+            anterior = self._memoria.pop(clave, None)
+            if anterior is not None:
+                self._bytes_memoria -= len(anterior)
+            self._memoria[clave] = contenido
+            self._bytes_memoria += len(contenido)
+            while self._bytes_memoria > self.max_bytes_memoria:
+                _, viejo = self._memoria.popitem(last=False)
+                self._bytes_memoria -= len(viejo)
+
+    def _leer_disco(self, clave: str) -> Optional[bytes]:
+        if not self.directorio:
+            return None
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'rb') as f:
+                contenido = f.read()
+            os.utime(ruta)  # marca de uso para el recorte LRU
+            return contenido
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error leyendo caché de PDF {clave[:12]}: {e}")
+            return None
+
+    def _guardar_disco(self, clave: str, contenido: bytes) -> None:
+        if not self.directorio:
+            return
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            # Escritura atómica: otro proceso nunca lee un PDF a medias
+            temporal = f'{self._ruta(clave)}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(temporal, 'wb') as f:
+                f.write(contenido)
+            os.replace(temporal, self._ruta(clave))
+            self._recortar_disco()
+        except Exception as e:
+            print(f"Error guardando caché de PDF {clave[:12]}: {e}")
+
+    def _recortar_disco(self) -> None:
+        """Borra los PDFs menos usados hasta quedar bajo `max_bytes_disco`."""
+        archivos = []
+        with os.scandir(self.directorio) as entradas:
+            for entrada in entradas:
+                if entrada.name.endswith('.pdf'):
+                    info = entrada.stat()
+                    archivos.append((info.st_mtime, info.st_size, entrada.path))
+        total = sum(a[1] for a in archivos)
+        for _, tamano, ruta in sorted(archivos):
+            if total <= self.max_bytes_disco:
+                break
+            try:
+                os.remove(ruta)
+                total -= tamano
+            except FileNotFoundError:
+                pass
+
+    def obtener(self, clave: str, generar: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """Devuelve el PDF cacheado o lo genera con `generar()` (None = error, no se cachea)."""
+        with self._lock:
+            contenido = self._memoria.get(clave)
+            if contenido is not None:
+                self._memoria.move_to_end(clave)
+                self.aciertos_memoria += 1
+                return contenido
+
+        contenido = self._leer_disco(clave)
+        if contenido is not None:
+            self.aciertos_disco += 1
+            self._guardar_memoria(clave, contenido)
+            return contenido
+
+        # El render se hace fuera del lock (tarda segundos)
+        self.fallos += 1
+        contenido = generar()
+        if contenido:
+            self._guardar_memoria(clave, contenido)
+            self._guardar_disco(clave, contenido)
+        return contenido
+
+    def limpiar(self, disco: bool = False) -> None:
+        """Vacía el nivel de memoria (y el de disco si se indica)."""
+        with self._lock:
+            self._memoria.clear()
+            self._bytes_memoria = 0
+        if disco and self.directorio and os.path.isdir(self.directorio):
+            for nombre in os.listdir(self.directorio):
+                if nombre.endswith('.pdf'):
+                    os.remove(os.path.join(self.directorio, nombre))
+
+
+# SGVO_PDF_CACHE_DIR='' desactiva el nivel de disco
+_DIR_POR_DEFECTO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'pdf')
+cache_pdf = CachePDF(
+    os.environ.get('SGVO_PDF_CACHE_DIR', _DIR_POR_DEFECTO) or None,
+    max_bytes_memoria=int(os.environ.get('SGVO_PDF_CACHE_MEMORIA_MB', '64')) * 1024 * 1024,
+    max_bytes_disco=int(os.environ.get('SGVO_PDF_CACHE_DISCO_MB', '512')) * 1024 * 1024,
+)
@@ -0,0 +1,80 @@
+# models/cache_referencias.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class CacheReferencias:
+    """Caché de proceso para datos de referencia (mapas id -> nombre).
+    Cada entrada expira tras `ttl` segundos y el total se limita a `max_entradas` (LRU).
+    Las entradas se agrupan por tabla para poder invalidarlas cuando se escribe en ella; una carga
+    que empezó antes de invalidar no se guarda (su resultado puede ser anterior a la escritura)."""
+
+    def __init__(self, ttl: float = 300.0, max_entradas: int = 64):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._datos: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        # Generación por tabla (y global): invalidar() la incrementa
+        self._generaciones: Dict[str, int] = {}
+        self._generacion_global = 0
+
+    def obtener(self, tabla: str, clave: Hashable, cargar: Callable[[], Any]) -> Any:
+        """Devuelve el valor cacheado o lo carga con `cargar()` si no existe o expiró."""
+        llave = (tabla, clave)
+        with self._lock:
+            entrada = self._datos.get(llave)
+            if entrada and (time.monotonic() - entrada[0]) < self.ttl:
+                self._datos.move_to_end(llave)
+                return entrada[1]
+            generacion = (self._generacion_global, self._generaciones.get(tabla, 0))
+
+        # La carga se hace fuera del lock para no bloquear otras tablas durante la consulta
+        valor = cargar()
+        with self._lock:
+            if generacion != (self._generacion_global, self._generaciones.get(tabla, 0)):
+                return valor  # se invalidó durante la carga: no se cachea
+            self._datos[llave] = (time.monotonic(), valor)
+            self._datos.move_to_end(llave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+        return valor
+
+    def invalidar(self, tabla: Optional[str] = None) -> None:
+        """Elimina las entradas de una tabla (o todas si no se indica)."""
+        with self._lock:
+            if tabla is None:
+                self._generacion_global += 1
+                self._datos.clear()
+                return
+            self._generaciones[tabla] = self._generaciones.get(tabla, 0) + 1
+            for llave in [k for k in self._datos if k[0] == tabla]:
+                del self._datos[llave]
+
+
+# Tablas de referencia que se cachean (y que invalidan la caché al escribirse)
+TABLAS_REFERENCIA = {'vendedor', 'cliente', 'tour', 'proveedor'}
+
+cache_referencias = CacheReferencias()
+
+# Resumen por día del calendario de operaciones, por mes: depende de estas tablas
+TABLAS_RESUMEN_MES = {'venta_tour', 'venta', 'pago', 'venta_servicio_proveedor'}
+cache_resumen_mes = CacheReferencias(ttl=120.0, max_entradas=24)
+
+
+def invalidar_tabla(tabla: str) -> None:
+    """Invalida las cachés que dependen de una tabla (llamado tras insert/update)."""
+    if tabla in TABLAS_REFERENCIA:
+        cache_referencias.invalidar(tabla)
+    if tabla in TABLAS_RESUMEN_MES:
+        cache_resumen_mes.invalidar()
+
+
+def obtener_mapa_nombres(client, tabla: str, col_id: str, col_nombre: str = 'nombre') -> Dict[Any, Any]:
+    """Retorna {id: nombre} de una tabla de referencia, usando la caché compartida."""
+    def cargar():
+        res = client.table(tabla).select(f'{col_id}, {col_nombre}').execute()
+        return {r[col_id]: r[col_nombre] for r in (res.data or [])}
+
+    return cache_referencias.obtener(tabla, (col_id, col_nombre), cargar)
@@ -20,6 +20,24 @@ class CatalogoImagenesModel(BaseModel):
         except Exception as e:
             print(f"Error cargando imágenes del tour {id_tour}: {e}")
             return []
+
+    def get_portadas_tours(self, ids_tours: List[int]) -> Dict[int, str]:
+        """Retorna {id_tour: url} con la foto principal de cada tour (una sola consulta)."""
+        if not ids_tours:
+            return {}
+        try:
+            res = (self.client.table(self.table_name)
+                   .select('id_tour, urls_imagenes, url_principal')
+                   .in_('id_tour', list(ids_tours)).execute())
+            portadas = {}
+            for fila in res.data or []:
+                url = fila.get('url_principal') or next(iter(fila.get('urls_imagenes') or []), None)
+                if url:
+                    portadas[fila['id_tour']] = url
+            return portadas
+        except Exception as e:
+            print(f"Error cargando portadas de tours: {e}")
+            return {}
             
     def actualizar_imagenes_tour(self, id_tour: int, urls: List[str]) -> bool:
         """Actualiza o inserta las imágenes de un tour."""
@@ -0,0 +1,181 @@
+# models/instrumentacion.py
+import contextvars
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Métodos del query builder que definen la operación (el resto se registra como filtro/modificador)
+OPERACIONES = {'select', 'insert', 'update', 'upsert', 'delete'}
+
+
+@dataclass
+class LlamadaSupabase:
+    """Un `.execute()` contra Supabase."""
+    tabla: str
+    operacion: str
+    filtros: List[str]
+    filas: int
+    bytes: int
+    latencia_ms: float
+    error: Optional[str] = None
+
+
+@dataclass
+class Rerun:
+    """Llamadas hechas durante una ejecución del script de Streamlit."""
+    id_rerun: int
+    pagina: str
+    inicio: float = field(default_factory=time.time)
+    llamadas: List[LlamadaSupabase] = field(default_factory=list)
+
+    def resumen(self) -> Dict[str, Any]:
+        return {
+            'id_rerun': self.id_rerun,
+            'pagina': self.pagina,
+            'round_trips': len(self.llamadas),
+            'latencia_ms': round(sum(ll.latencia_ms for ll in self.llamadas), 1),
+            'filas': sum(ll.filas for ll in self.llamadas),
+            'bytes': sum(ll.bytes for ll in self.llamadas),
+        }
+
+
+class RegistroConsultas:
+    """Guarda los últimos `max_reruns` reruns con sus llamadas (agrupados por página)."""
+
+    def __init__(self, max_reruns: int = 200):
+        self.max_reruns = max_reruns
+        self._reruns: "OrderedDict[int, Rerun]" = OrderedDict()
+        self._contador = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def nuevo_rerun(self, pagina: str) -> Rerun:
+        with self._lock:
+            rerun = Rerun(next(self._contador), pagina)
+            self._reruns[rerun.id_rerun] = rerun
+            while len(self._reruns) > self.max_reruns:
+                self._reruns.popitem(last=False)
+            return rerun
+
+    def agregar(self, rerun: Rerun, llamada: LlamadaSupabase) -> None:
+        with self._lock:
+            rerun.llamadas.append(llamada)
+
+    def reruns(self) -> List[Rerun]:
+        with self._lock:
+            return list(self._reruns.values())
+
+    def a_dict(self) -> List[Dict[str, Any]]:
+        return [dict(r.resumen(), inicio=r.inicio, llamadas=[asdict(ll) for ll in r.llamadas]) for r in self.reruns()]
+
+    def volcar_json(self, ruta: str) -> None:
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(self.a_dict(), f, ensure_ascii=False, indent=2)
+
+
+registro_consultas = RegistroConsultas()
+
+# Rerun en curso. Se hereda en los hilos de controllers/concurrencia.py (copy_context)
+_rerun_actual: contextvars.ContextVar[Optional[Rerun]] = contextvars.ContextVar('rerun_actual', default=None)
+
+
+def iniciar_rerun(pagina: str) -> Rerun:
+    """Abre un rerun nuevo para la página; las llamadas siguientes de este hilo se asignan a él."""
+    rerun = registro_consultas.nuevo_rerun(pagina)
+    _rerun_actual.set(rerun)
+    return rerun
+
+
+def rerun_actual() -> Optional[Rerun]:
+    return _rerun_actual.get()
+
+
+def _describir(metodo: str, args: tuple, kwargs: dict) -> str:
+    partes = []
+    for a in args:
+        if isinstance(a, (list, tuple, set)) and len(a) > 5:
+            partes.append(f'[{len(a)} valores]')
+        elif isinstance(a, (dict, list)):
+            partes.append('{...}')
+        else:
+            partes.append(repr(a))
+    partes.extend(f'{k}={v!r}' for k, v in kwargs.items() if not isinstance(v, (dict, list)))
+    return f"{metodo}({', '.join(partes)})"
+
+
+class _ConsultaInstrumentada:
+    """Envuelve un query builder de postgrest y mide su `.execute()`."""
+
+    def __init__(self, builder, tabla: str, operacion: str = 'select', filtros: Optional[List[str]] = None):
+        self._builder = builder
+        self._tabla = tabla
+        self._operacion = operacion
+        self._filtros = filtros or []
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self._builder, nombre)
+        if not callable(atributo):
+            return atributo
+
+        def llamar(*args, **kwargs):
+            resultado = atributo(*args, **kwargs)
+            if nombre in OPERACIONES:
+                return _ConsultaInstrumentada(resultado, self._tabla, nombre, self._filtros)
+            if hasattr(resultado, 'execute'):
+                return _ConsultaInstrumentada(resultado, self._tabla, self._operacion,
+                                              self._filtros + [_describir(nombre, args, kwargs)])
+            return resultado
+        return llamar
+
+    @property
+    def not_(self):
+        return _ConsultaInstrumentada(self._builder.not_, self._tabla, self._operacion, self._filtros + ['not'])
+
+    def execute(self):
+        inicio = time.perf_counter()
+        error, filas, tamano = None, 0, 0
+        try:
+            respuesta = self._builder.execute()
+            datos = respuesta.data if respuesta is not None else None
+            filas = len(datos) if isinstance(datos, list) else (0 if datos is None else 1)
+            tamano = len(json.dumps(datos, default=str)) if datos is not None else 0
+            return respuesta
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            # Fuera de un rerun (p. ej. subidas en segundo plano) no se registra: no hay a quién atribuirla
+            rerun = rerun_actual()
+            if rerun is not None:
+                registro_consultas.agregar(rerun, LlamadaSupabase(
+                    tabla=self._tabla,
+                    operacion=self._operacion,
+                    filtros=self._filtros,
+                    filas=filas,
+                    bytes=tamano,
+                    latencia_ms=round((time.perf_counter() - inicio) * 1000, 2),
+                    error=error
+                ))
+
+
+class ClienteInstrumentado:
+    """Cliente de Supabase que registra cada `.execute()` (tabla, operación, filtros, filas,
+    bytes y latencia) en el rerun en curso. Todo lo demás (auth, storage...) se delega."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, nombre: str) -> _ConsultaInstrumentada:
+        return _ConsultaInstrumentada(self._client.table(nombre), nombre)
+
+    def from_(self, nombre: str) -> _ConsultaInstrumentada:
+        return self.table(nombre)
+
+    def rpc(self, funcion: str, params: Optional[Dict[str, Any]] = None, *args, **kwargs) -> _ConsultaInstrumentada:
+        return _ConsultaInstrumentada(self._client.rpc(funcion, params or {}, *args, **kwargs), f'rpc:{funcion}', 'rpc')
+
+    def __getattr__(self, nombre):
+        return getattr(self._client, nombre)
@@ -6,7 +6,7 @@ class ItinerarioModel(BaseModel):
     """Modelo para la gestión modular de itinerarios y tours."""
 
     def __init__(self, supabase_client):
-        super().__init__('tour', supabase_client)
+        super().__init__('tour', supabase_client, primary_key='id_tour')
 
     def get_catalogo_tours(self) -> List[Dict[str, Any]]:
         """Obtiene el catálogo completo de servicios/tours."""
@@ -1,6 +1,7 @@
 # models/lead_model.py (CÓDIGO FINAL CORREGIDO Y COMPLETO)
 
 from .base_model import BaseModel
+from .cache_referencias import obtener_mapa_nombres
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from supabase import Client
@@ -52,9 +53,8 @@ class LeadModel(BaseModel):
     def get_vendedores_mapping(self) -> Dict[int, str]:
         """Retorna un diccionario {id: nombre} de todos los vendedores activos."""
         try:
-            # Nota: Tabla 'vendedor' en minúsculas según corrección reciente
-            response = self.client.table('vendedor').select('id_vendedor, nombre').execute()
-            return {v['id_vendedor']: v['nombre'] for v in response.data}
+            # Nota: Tabla 'vendedor' en minúsculas según corrección reciente (caché compartida)
+            return obtener_mapa_nombres(self.client, 'vendedor', 'id_vendedor')
         except Exception as e:
             print(f"Error obteniendo vendedores: {e}")
             return {}
@@ -12,6 +12,11 @@ class VentaModel(BaseModel):
     def __init__(self, supabase_client: Client):
         super().__init__('venta', supabase_client, primary_key='id_venta')
 
+class VentaTourModel(BaseModel):
+    def __init__(self, supabase_client: Client):
+        # PK compuesta (id_venta, n_linea): get_by_id no aplica, se usa para inserciones/upserts masivos
+        super().__init__('venta_tour', supabase_client, primary_key='id_venta', conflict_target='id_venta,n_linea')
+
 class PasajeroModel(BaseModel):
     def __init__(self, supabase_client: Client):
         super().__init__('pasajero', supabase_client, primary_key='id_pasajero')
@@ -25,6 +30,16 @@ class PasajeroModel(BaseModel):
             print(f"Error obteniendo pasajeros venta {venta_id}: {e}")
             return []
 
+    def guardar_lista(self, pasajeros: List[Dict[str, Any]]) -> int:
+        """Guarda la rooming list en lote: upsert de los existentes (con id_pasajero) e insert de los nuevos."""
+        existentes = [p for p in pasajeros if p.get('id_pasajero') is not None]
+        nuevos = [p for p in pasajeros if p.get('id_pasajero') is None]
+        for p in nuevos:
+            p.pop('id_pasajero', None)
+        self.upsert_many(existentes)
+        self.insert_many(nuevos)
+        return len(existentes) + len(nuevos)
+
 class DocumentacionModel(BaseModel):
     def __init__(self, supabase_client: Client):
         # Según esquema SQL, usa 'id' como bigint
@@ -0,0 +1,42 @@
+# models/paginacion.py
+from typing import Any, Callable, Dict, Iterator, List, Sequence
+
+
+def valor_filtro(valor: Any) -> str:
+    """Valor para un filtro lógico de PostgREST (entre comillas si tiene caracteres reservados)."""
+    texto = str(valor)
+    if any(c in texto for c in ',.:()"\\ '):
+        return '"' + texto.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return texto
+
+
+def paginar_por_llave(crear_query: Callable[[], Any], llave: Sequence[str],
+                      page_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+    """Recorre una consulta en páginas por llave (keyset): ordena por las columnas de `llave`
+    (que deben identificar la fila) y cada página pide las filas posteriores a la última vista.
+    A diferencia del offset, una fila que cambia de posición durante el recorrido no desplaza
+    a las demás, y el costo no crece con el número de página."""
+    ultima = None
+    while True:
+        query = crear_query()
+        for columna in llave:
+            query = query.order(columna)
+        query = query.limit(page_size)
+        if ultima is not None:
+            if len(llave) == 1:
+                query = query.gt(llave[0], ultima[0])
+            else:
+                # (a, b) > (x, y)  ==  a > x  OR  (a = x AND b > y)
+                condiciones = []
+                for i, columna in enumerate(llave):
+                    iguales = [f"{c}.eq.{valor_filtro(v)}" for c, v in zip(llave[:i], ultima)]
+                    mayor = f"{columna}.gt.{valor_filtro(ultima[i])}"
+                    condiciones.append(f"and({','.join(iguales + [mayor])})" if iguales else mayor)
+                query = query.or_(','.join(condiciones))
+        pagina = query.execute().data or []
+        # Se corta con una página vacía (no con una incompleta): el servidor puede limitar
+        # las filas por debajo de page_size y aun así quedar registros pendientes.
+        if not pagina:
+            return
+        yield pagina
+        ultima = tuple(pagina[-1][c] for c in llave)
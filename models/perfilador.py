@@ -0,0 +1,201 @@
+# models/perfilador.py
+import contextvars
+import cProfile
+import functools
+import itertools
+import json
+import marshal
+import os
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Categorías de tiempo: se asignan por el archivo de cada función (tiempo propio, no acumulado)
+CATEGORIAS = ('DB', 'pandas', 'render', 'app', 'espera hilos')
+_RUTAS_CATEGORIA: List[Tuple[str, Tuple[str, ...]]] = [
+    ('DB', ('/postgrest/', '/supabase/', '/gotrue/', '/storage3/', '/httpx/', '/httpcore/', '/h2/',
+            '/ssl.py', '/socket.py', '/selectors.py', 'fake_supabase')),
+    ('pandas', ('/pandas/', '/numpy/')),
+    ('render', ('/streamlit/', '/plotly/', '/altair/', '/pyarrow/', '/jinja2/')),
+    ('espera hilos', ('/threading.py', '/concurrent/', 'controllers/concurrencia.py')),
+]
+
+
+def _categoria_archivo(archivo: str, funcion: str) -> Optional[str]:
+    """Categoría por la ruta del archivo; None para built-ins sin pista (se usa la del llamador)."""
+    if archivo == '~':
+        if '_ssl' in funcion or 'socket' in funcion or 'select' in funcion:
+            return 'DB'
+        if '_thread.lock' in funcion:
+            return 'espera hilos'
+        return None
+    ruta = archivo.replace('\\', '/')
+    for categoria, patrones in _RUTAS_CATEGORIA:
+        if any(p in ruta for p in patrones):
+            return categoria
+    return 'app'
+
+
+def tiempos_por_categoria(stats: pstats.Stats) -> Dict[str, float]:
+    """Suma el tiempo propio (ms) de cada función en su categoría. Los built-ins sin categoría
+    (p. ej. métodos de listas o ufuncs) heredan la del llamador que más tiempo acumula."""
+    resultado = {c: 0.0 for c in CATEGORIAS}
+    memo: Dict[Any, str] = {}
+
+    def categoria(clave, profundidad: int = 0) -> str:
+        if clave in memo:
+            return memo[clave]
+        cat = _categoria_archivo(clave[0], clave[2])
+        if cat is None:
+            llamadores = stats.stats.get(clave, (0, 0, 0, 0, {}))[4]
+            cat = 'app'
+            if llamadores and profundidad < 10:
+                principal = max(llamadores, key=lambda k: llamadores[k][3] if isinstance(llamadores[k], tuple) else 0)
+                cat = categoria(principal, profundidad + 1)
+        memo[clave] = cat
+        return cat
+
+    for clave, (_, _, tiempo_propio, _, _) in stats.stats.items():
+        resultado[categoria(clave)] += tiempo_propio * 1000
+    return {c: round(ms, 1) for c, ms in resultado.items()}
+
+
+@dataclass
+class SeccionPerfil:
+    """Tiempo de una sección de la vista (sin contar sus sub-secciones)."""
+    nombre: str
+    nivel: int
+    tiempo_ms: float = 0.0
+    por_categoria: Dict[str, float] = field(default_factory=dict)
+    stats: Optional[pstats.Stats] = field(default=None, repr=False)
+
+
+@dataclass
+class PerfilRerun:
+    """Perfil de una ejecución de página: una entrada por sección, en orden de entrada."""
+    id_perfil: int
+    pagina: str
+    inicio: float = field(default_factory=time.time)
+    secciones: List[SeccionPerfil] = field(default_factory=list)
+
+    def resumen(self) -> Dict[str, Any]:
+        por_categoria = {c: round(sum(s.por_categoria.get(c, 0) for s in self.secciones), 1) for c in CATEGORIAS}
+        return {
+            'id_perfil': self.id_perfil,
+            'pagina': self.pagina,
+            'tiempo_ms': round(sum(s.tiempo_ms for s in self.secciones), 1),
+            'por_categoria': por_categoria,
+            'secciones': [{'seccion': s.nombre, 'nivel': s.nivel, 'tiempo_ms': round(s.tiempo_ms, 1), **s.por_categoria}
+                          for s in self.secciones],
+        }
+
+    def stats(self) -> Optional[pstats.Stats]:
+        """Estadísticas combinadas de todas las secciones (formato cProfile)."""
+        secciones = [s.stats for s in self.secciones if s.stats is not None]
+        if not secciones:
+            return None
+        combinadas = pstats.Stats()
+        combinadas.add(*secciones)
+        return combinadas
+
+    def a_bytes(self) -> bytes:
+        """Contenido de un archivo .prof (lo que escribe pstats.Stats.dump_stats)."""
+        stats = self.stats()
+        return marshal.dumps(stats.stats) if stats else b''
+
+    def volcar(self, directorio: str) -> str:
+        """Escribe <id>_<página>.prof (snakeviz, flameprof, gprof2dot) y su resumen .json."""
+        os.makedirs(directorio, exist_ok=True)
+        pagina = re.sub(r'\W+', '_', self.pagina).strip('_')
+        nombre = f"{self.id_perfil:05d}_{pagina}"
+        ruta = os.path.join(directorio, nombre)
+        with open(f'{ruta}.prof', 'wb') as f:
+            f.write(self.a_bytes())
+        with open(f'{ruta}.json', 'w', encoding='utf-8') as f:
+            json.dump(self.resumen(), f, ensure_ascii=False, indent=2)
+        return f'{ruta}.prof'
+
+
+class _EstadoPerfil:
+    """Pila de perfiladores del rerun: al entrar a una sección se pausa el de la sección padre,
+    así cada una registra solo su propio tiempo (cProfile no admite perfiladores anidados)."""
+
+    def __init__(self, perfil: PerfilRerun):
+        self.perfil = perfil
+        self.hilo = threading.get_ident()
+        self.pila: List[Tuple[SeccionPerfil, cProfile.Profile, float]] = []
+
+
+_estado_actual: contextvars.ContextVar[Optional[_EstadoPerfil]] = contextvars.ContextVar('perfil_actual', default=None)
+_contador = itertools.count(1)
+
+
+@contextmanager
+def seccion(nombre: str):
+    """Perfila el bloque como una sección; sin perfil activo (o desde otro hilo) no hace nada."""
+    estado = _estado_actual.get()
+    # Los hilos de controllers/concurrencia.py heredan el contexto, pero la pila es del hilo principal
+    if estado is None or estado.hilo != threading.get_ident():
+        yield
+        return
+
+    if estado.pila:
+        estado.pila[-1][1].disable()
+    actual = SeccionPerfil(nombre, nivel=len(estado.pila))
+    estado.perfil.secciones.append(actual)
+    perfilador = cProfile.Profile()
+    estado.pila.append((actual, perfilador, time.perf_counter()))
+    perfilador.enable()
+    try:
+        yield
+    finally:
+        perfilador.disable()
+        _, _, inicio = estado.pila.pop()
+        # Tiempo de pared de la sección; actual.tiempo_ms ya tiene descontados sus hijos
+        pared_ms = (time.perf_counter() - inicio) * 1000
+        actual.tiempo_ms += pared_ms
+        try:
+            actual.stats = pstats.Stats(perfilador)
+            actual.por_categoria = tiempos_por_categoria(actual.stats)
+        except TypeError:
+            # Sección sin llamadas registradas
+            actual.stats, actual.por_categoria = None, {}
+        if estado.pila:
+            padre = estado.pila[-1][0]
+            padre.tiempo_ms -= pared_ms  # el padre mide tiempo de pared: descontar al hijo completo
+            estado.pila[-1][1].enable()
+
+
+def perfilado(nombre: Optional[str] = None) -> Callable:
+    """Decorador: perfila la función como sección (por defecto con su nombre)."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if _estado_actual.get() is None:
+                return funcion(*args, **kwargs)
+            with seccion(nombre or funcion.__name__):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+@contextmanager
+def perfilar_pagina(pagina: str, directorio: Optional[str] = None):
+    """Perfila un rerun completo de la página (sección raíz 'mostrar_pagina').
+    Si se indica `directorio`, vuelca el .prof y el resumen al terminar."""
+    perfil = PerfilRerun(next(_contador), pagina)
+    token = _estado_actual.set(_EstadoPerfil(perfil))
+    try:
+        with seccion('mostrar_pagina'):
+            yield perfil
+    finally:
+        _estado_actual.reset(token)
+        if directorio:
+            try:
+                perfil.volcar(directorio)
+            except Exception as e:
+                print(f"Error guardando perfil de {pagina}: {e}")
@@ -1,6 +1,9 @@
 # models/venta_model.py
 
 from .base_model import BaseModel
+from .cache_referencias import invalidar_tabla
+from .cache_incremental import marcar_desactualizada
+from .operaciones_model import VentaTourModel
 from datetime import datetime, timedelta
 from supabase import Client
 from typing import Dict, Any, Optional
@@ -11,6 +14,7 @@ class VentaModel(BaseModel):
     def __init__(self, table_name: str, supabase_client: Client): 
         # Sincronizado con esquema SQL: tabla 'venta', PK 'id_venta'
         super().__init__('venta', supabase_client, primary_key='id_venta') 
+        self.venta_tour_model = VentaTourModel(supabase_client)
 
     # --- MÉTODOS DE BÚSQUEDA DE IDs (HELPERS) ---
     def get_vendedor_id_by_query(self, query: str) -> Optional[int]:
@@ -59,6 +63,7 @@ class VentaModel(BaseModel):
             "genero": "N/A"
         }
         res_insert = self.client.table('cliente').insert(nuevo_cliente).execute()
+        invalidar_tabla('cliente')
         if res_insert.data and len(res_insert.data) > 0:
             return res_insert.data[0].get('id_cliente')
         else:
@@ -104,14 +109,15 @@ class VentaModel(BaseModel):
         id_itin = venta_data.get("id_itinerario_digital")
         num_pax_final = 1
         
-        # Intentar extraer info extra del itinerario si existe
+        # Intentar extraer info extra del itinerario si existe (una sola lectura: pax y días)
+        render_itin = {}
         if id_itin:
             try:
                 res_it = self.client.table('itinerario_digital').select('datos_render').eq('id_itinerario_digital', id_itin).single().execute()
                 if res_it.data:
-                    render = res_it.data.get('datos_render', {})
+                    render_itin = res_it.data.get('datos_render', {}) or {}
                     # Extraer Pax
-                    num_pax_final = int(render.get('cantidad_pax') or render.get('pax_count') or 1)
+                    num_pax_final = int(render_itin.get('cantidad_pax') or render_itin.get('pax_count') or 1)
             except: pass
 
         datos_venta_sql = {
@@ -149,6 +155,8 @@ class VentaModel(BaseModel):
                     "observacion": f"Pago inicial registrado. Saldo: {venta_data.get('saldo')}"
                 }
                 self.client.table('pago').insert(pago_data).execute()
+                invalidar_tabla('pago')
+                marcar_desactualizada('pago')
             except Exception as e:
                 # No fallar toda la venta si el pago no se registra
                 print(f"Advertencia: Error registrando pago inicial: {e}")
@@ -160,16 +168,11 @@ class VentaModel(BaseModel):
             num_dias = (f_fin - f_inicio).days + 1
             if num_dias < 1: num_dias = 1
             
-            # Intentar obtener detalles del itinerario digital si existe
-            itin_detalles = []
-            id_itin = venta_data.get("id_itinerario_digital")
-            if id_itin:
-                res_itin = self.client.table('itinerario_digital').select('datos_render').eq('id_itinerario_digital', id_itin).single().execute()
-                if res_itin.data:
-                    render = res_itin.data.get('datos_render', {})
-                    # Soportar todas las estructuras: 'itinerario_detalles' (nuevo), 'itinerario_detales' (viejo) o 'days' (externo)
-                    itin_detalles = render.get('itinerario_detalles', []) or render.get('itinerario_detales', []) or render.get('days', [])
+            # Detalles del itinerario digital (ya leído arriba)
+            # Soportar todas las estructuras: 'itinerario_detalles' (nuevo), 'itinerario_detales' (viejo) o 'days' (externo)
+            itin_detalles = render_itin.get('itinerario_detalles', []) or render_itin.get('itinerario_detales', []) or render_itin.get('days', [])
 
+            detalles_tour = []
             for i in range(num_dias):
                 f_servicio = f_inicio + timedelta(days=i)
                 
@@ -192,8 +195,24 @@ class VentaModel(BaseModel):
                     "observaciones": nombre_servicio_dia, # Usamos observaciones para guardar el nombre del tour diario
                     "id_itinerario_dia_index": i + 1
                 }
-                self.client.table('venta_tour').insert(detalle_tour).execute()
+                detalles_tour.append(detalle_tour)
+
+            # Una sola petición para todos los días del programa
+            self.venta_tour_model.insert_many(detalles_tour)
         except Exception as e:
             print(f"Advertencia: Error expandiendo detalle tour: {e}")
 
         return nuevo_id_venta
+
+    def create_venta_transaccional(self, venta_data: Dict[str, Any], convertir_lead: bool = False) -> Optional[int]:
+        """
+        Registra la venta completa con la función SQL registrar_venta_completa
+        (migrations/add_rpc_registrar_venta.sql): un solo round trip y todo o nada.
+        """
+        payload = dict(venta_data, convertir_lead=convertir_lead)
+        res = self.client.rpc('registrar_venta_completa', {'p_venta': payload}).execute()
+        invalidar_tabla('cliente')
+        for tabla in ('venta', 'pago', 'venta_tour'):
+            invalidar_tabla(tabla)
+            marcar_desactualizada(tabla)
+        return res.data
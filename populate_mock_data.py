@@ -1,121 +1,129 @@
+# populate_mock_data.py
+"""
+Carga datos sintéticos (benchmarks/generador_datos.py) para pruebas de carga.
+
+Dos modos:
+  - Archivos COPY (recomendado para millones de filas): un CSV por tabla y un cargar.sql para psql.
+        python populate_mock_data.py --ventas 300000 --copy-dir carga/
+        cd carga && psql "$DATABASE_URL" -f cargar.sql
+  - Inserts por lotes contra Supabase (usa .streamlit/secrets.toml):
+        python populate_mock_data.py --ventas 2000 --batch 500
+
+Las PK van explícitas, así que la base debe estar vacía en estas tablas (sin los datos de ejemplo
+de INSTALL_FINAL_SUPABASE.sql); al final se ajustan las secuencias con setval. Requiere la
+columna updated_at de pago y venta_tour (migrations/add_sync_incremental.sql) y que
+venta_servicio_proveedor.tipo_servicio admita 'PROVEEDOR_ENDOSO' para los servicios endosados
+(migrations/add_tipo_servicio_endoso.sql).
+"""
+import argparse
+import csv
 import os
-import streamlit as st
-from supabase import create_client, Client
-from datetime import date, timedelta
-import random
-
-# Mock Streamlit Secrets for standalone run if needed, 
-# but better to rely on `st.secrets` if running via `streamlit run` or just assuming env vars.
-# Since we are running via `python populate_mock_data.py`, `st.secrets` might fail if not configured in .streamlit/secrets.toml
-# However, the user environment seems to have it. I'll read from main.py's approach.
-# If this fails, I'll ask user to ensure secrets are there, but main.py suggests they are.
-
-try:
-    # Try loading from secrets.toml by initializing streamlit context essentially, 
-    # but `st.secrets` works if the file exists.
-    SUPABASE_URL = st.secrets["supabase"]["URL"]
-    SUPABASE_ANON_KEY = st.secrets["supabase"]["ANON_KEY"]
-except Exception as e:
-    print("Error loading secrets:", e)
-    print("Please ensure .streamlit/secrets.toml exists.")
-    exit(1)
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
-
-def populate_data():
-    print("Starting data population for January 2026...")
-
-    # 1. Create Dummy Clients
-    clientes = ["Juan Perez", "Maria Gomez", "Carlos Smith", "Elena Tour", "Grupo Viajeros"]
-    ids_clientes = []
-    
-    for name in clientes:
-        # Check exist
-        res = supabase.table('cliente').select('id_cliente').eq('nombre', name).execute()
-        if res.data:
-            ids_clientes.append(res.data[0]['id_cliente'])
-        else:
-            data = {"nombre": name, "tipo_cliente": "B2C", "pais": "Peru"}
-            res_ins = supabase.table('cliente').insert(data).select('id_cliente').execute()
-            if res_ins.data:
-                ids_clientes.append(res_ins.data[0]['id_cliente'])
-                print(f"Created Cliente: {name}")
-
-    if not ids_clientes:
-        print("Failed to create clients.")
-        return
-
-    # 2. Get Some Tours (Assuming they exist, or create mock)
-    # Just checking first
-    res_tours = supabase.table('tour').select('id_tour').limit(5).execute()
-    ids_tours = [t['id_tour'] for t in res_tours.data]
-    
-    if not ids_tours:
-        # Create Dummy Tour if none
-        res_ins_t = supabase.table('tour').insert({"nombre": "City Tour Cusco Mock", "duracion_dias": 1}).select('id_tour').execute()
-        ids_tours.append(res_ins_t.data[0]['id_tour'])
-
-    # 3. Create Sales & Services (Venta_Tour) for Jan 2026
-    start_date = date(2026, 1, 1)
-    
-    # Create ~10 entries spread across first week
-    for i in range(10):
-        day_offset = random.randint(0, 5) # Jan 1 to Jan 6
-        op_date = start_date + timedelta(days=day_offset)
-        
-        # Select Random Client & Tour
-        cli_id = random.choice(ids_clientes)
-        tour_id = random.choice(ids_tours)
-        pax = random.randint(1, 5)
-        
-        # INSERT VENTA
-        venta_data = {
-            "id_cliente": cli_id,
-            "id_vendedor": 1, # Assume ID 1 exists
-            "fecha_venta": "2025-12-01", # Sold previously
-            "estado_venta": "CONFIRMADO",
-            "precio_total_cierre": pax * 100,
-            "moneda": "USD"
-        }
-        res_v = supabase.table('venta').insert(venta_data).select('id_venta').execute()
-        if not res_v.data: continue
-        
-        new_venta_id = res_v.data[0]['id_venta']
-        
-        # INSERT VENTA_TOUR (Service)
-        vt_data = {
-            "id_venta": new_venta_id,
-            "id_tour": tour_id,
-            "fecha_servicio": op_date.isoformat(),
-            "cantidad_pasajeros": pax, 
-            # guia_asignado is handled by our app as update, initially null
-        }
-        supabase.table('venta_tour').insert(vt_data).execute()
-        
-        # INSERT PASSENGERS & DOCS (For Risk Dashboard)
-        # Add 1 passenger per pax
-        for p in range(pax):
-            pas_data = {
-                "id_venta": new_venta_id,
-                "nombre": f"Pax {p+1} of {cli_id}",
-                "edad": 30
-            }
-            res_p = supabase.table('pasajero').insert(pas_data).select('id_pasajero').execute()
-            if res_p.data:
-                pid = res_p.data[0]['id_pasajero']
-                # Add Document Requirement (Passport)
-                doc_data = {
-                    "id_pasajero": pid,
-                    "tipo_documento": "Pasaporte",
-                    "es_critico": True,
-                    "estado_entrega": "PENDIENTE",
-                    "fecha_entrega": None
-                }
-                supabase.table('documentacion').insert(doc_data).execute()
-                
-        print(f"Generated Venta {new_venta_id} for Date {op_date} with {pax} pax.")
-
-    print("Data Population Complete.")
+import sys
+import time
+from datetime import date
+
+from benchmarks.generador_datos import COLUMNAS, SECUENCIAS, GeneradorDatos, valor_copy
+
+
+def _sentencias_setval(maximos):
+    return [
+        f"SELECT setval(pg_get_serial_sequence('{tabla}', '{SECUENCIAS[tabla]}'), {maximo});"
+        for tabla, maximo in maximos.items() if tabla in SECUENCIAS and maximo
+    ]
+
+
+def _actualizar_maximos(maximos, tabla, filas):
+    if tabla in SECUENCIAS and filas:
+        maximos[tabla] = max(maximos.get(tabla, 0), filas[-1][SECUENCIAS[tabla]])
+
+
+def exportar_copy(generador: GeneradorDatos, directorio: str, ventas_por_lote: int):
+    """Escribe un CSV por tabla (formato de COPY ... CSV HEADER) y el script cargar.sql."""
+    os.makedirs(directorio, exist_ok=True)
+    archivos, escritores, conteo, maximos = {}, {}, {}, {}
+    try:
+        for tabla, columnas in COLUMNAS.items():
+            archivos[tabla] = open(os.path.join(directorio, f'{tabla}.csv'), 'w', encoding='utf-8', newline='')
+            escritores[tabla] = csv.writer(archivos[tabla])
+            escritores[tabla].writerow(columnas)
+            conteo[tabla] = 0
+
+        for lote in generador.lotes(ventas_por_lote):
+            for tabla, filas in lote.items():
+                columnas = COLUMNAS[tabla]
+                escritores[tabla].writerows([valor_copy(f[c]) for c in columnas] for f in filas)
+                conteo[tabla] += len(filas)
+                _actualizar_maximos(maximos, tabla, filas)
+            if lote.get('venta'):
+                print(f"  ... {conteo['venta']:,} ventas")
+    finally:
+        for archivo in archivos.values():
+            archivo.close()
+
+    with open(os.path.join(directorio, 'cargar.sql'), 'w', encoding='utf-8') as f:
+        f.write('-- Generado por populate_mock_data.py (ejecutar con psql desde este directorio)\n')
+        f.write('BEGIN;\n')
+        for tabla, columnas in COLUMNAS.items():
+            f.write(f"\\copy {tabla} ({', '.join(columnas)}) FROM '{tabla}.csv' WITH (FORMAT csv, HEADER true)\n")
+        f.write('\n'.join(_sentencias_setval(maximos)) + '\n')
+        f.write('COMMIT;\nANALYZE;\n')
+    return conteo
+
+
+def insertar_supabase(generador: GeneradorDatos, batch: int, ventas_por_lote: int):
+    """Inserta por lotes en orden de FK con BaseModel.insert_many (una petición por lote)."""
+    import streamlit as st
+    from supabase import create_client
+    from models.base_model import BaseModel
+
+    try:
+        client = create_client(st.secrets["supabase"]["URL"], st.secrets["supabase"]["ANON_KEY"])
+    except Exception as e:
+        print(f"Error cargando secrets de Supabase: {e}")
+        print("Asegúrate de que exista .streamlit/secrets.toml")
+        sys.exit(1)
+
+    conteo, maximos = {}, {}
+    for lote in generador.lotes(ventas_por_lote):
+        for tabla in COLUMNAS:
+            filas = lote.get(tabla)
+            if not filas:
+                continue
+            BaseModel(tabla, client).insert_many(filas, chunk_size=batch)
+            conteo[tabla] = conteo.get(tabla, 0) + len(filas)
+            _actualizar_maximos(maximos, tabla, filas)
+        if lote.get('venta'):
+            print(f"  ... {conteo['venta']:,} ventas")
+
+    # PostgREST no expone setval: ejecutar en el editor SQL para que los SERIAL no choquen
+    print("\nAjusta las secuencias en el editor SQL de Supabase:")
+    for sentencia in _sentencias_setval(maximos):
+        print(f"  {sentencia}")
+    return conteo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ventas', type=int, default=1000, help='número de ventas (~3 servicios por venta)')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--desde', type=date.fromisoformat, default=date(2025, 1, 1), help='primera fecha de servicio')
+    parser.add_argument('--dias', type=int, default=730, help='días de historia; desde + dias hace de "hoy"')
+    parser.add_argument('--copy-dir', help='escribir CSV + cargar.sql en este directorio en vez de insertar')
+    parser.add_argument('--batch', type=int, default=500, help='filas por petición en modo insert')
+    args = parser.parse_args()
+
+    generador = GeneradorDatos(args.ventas, semilla=args.semilla, desde=args.desde, dias=args.dias)
+    print(f"Generando {args.ventas:,} ventas (semilla {args.semilla}, desde {args.desde}, {args.dias} días)...")
+    t0 = time.perf_counter()
+    if args.copy_dir:
+        conteo = exportar_copy(generador, args.copy_dir, ventas_por_lote=10_000)
+    else:
+        conteo = insertar_supabase(generador, args.batch, ventas_por_lote=max(args.batch, 1000))
+
+    print(f"\nListo en {time.perf_counter() - t0:.1f} s:")
+    for tabla, n in conteo.items():
+        print(f"  {tabla:<26} {n:>12,}")
+
 
 if __name__ == "__main__":
-    populate_data()
+    main()
@@ -0,0 +1,56 @@
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+try:
+    from models.perfilador import perfilar_pagina, perfilado
+except ImportError:
+    print("Error importing perfilador. Make sure you run this from the project root.")
+    sys.exit(1)
+
+
+@perfilado()
+def nieto():
+    time.sleep(0.05)
+
+
+@perfilado()
+def hijo():
+    time.sleep(0.03)
+    nieto()
+
+
+@perfilado()
+def seccion_hoja():
+    time.sleep(0.02)
+
+
+def test_perfilador():
+    """Secciones anidadas en tres niveles: la suma de tiempos propios debe ser el tiempo de pared."""
+    inicio = time.perf_counter()
+    with perfilar_pagina('verificacion') as perfil:
+        time.sleep(0.01)
+        hijo()
+        seccion_hoja()
+    pared_ms = (time.perf_counter() - inicio) * 1000
+
+    resumen = perfil.resumen()
+    for s in resumen['secciones']:
+        print(f"{'  ' * s['nivel']}{s['seccion']}: {s['tiempo_ms']} ms")
+    print(f"Total perfilado: {resumen['tiempo_ms']} ms · tiempo de pared: {pared_ms:.1f} ms")
+
+    if abs(resumen['tiempo_ms'] - pared_ms) > 10:
+        print("WARNING: Section times do not add up to the wall time.")
+    if any(s['tiempo_ms'] < 0 for s in resumen['secciones']):
+        print("WARNING: Negative self time in a section.")
+    esperado = {'mostrar_pagina': 10, 'hijo': 30, 'nieto': 50, 'seccion_hoja': 20}
+    for s in resumen['secciones']:
+        if abs(s['tiempo_ms'] - esperado[s['seccion']]) > 10:
+            print(f"WARNING: Unexpected self time for {s['seccion']}.")
+
+
+if __name__ == "__main__":
+    test_perfilador()
@@ -0,0 +1,24 @@
+# vistas/calendario_carga.py
+from typing import Dict, Optional
+
+# Mapa de calor del calendario: un color por nivel de carga (OperacionesController.get_resumen_mes)
+COLORES_CARGA = ['', '🟩', '🟨', '🟧', '🟥']
+LEYENDA_CARGA = "Carga del día: 🟩 baja · 🟨 media · 🟧 alta · 🟥 pico del mes · ⚠️ servicios sin guía"
+
+
+def etiqueta_dia(day: int, dia: Optional[Dict[str, int]]) -> str:
+    """Texto del botón de un día: número, color de carga y aviso si faltan guías."""
+    if not dia:
+        return str(day)
+    etiqueta = f"{day} {COLORES_CARGA[min(dia['nivel'], len(COLORES_CARGA) - 1)]}"
+    if dia['sin_guia']:
+        etiqueta += " ⚠️"
+    return etiqueta
+
+
+def ayuda_dia(dia: Optional[Dict[str, int]]) -> Optional[str]:
+    """Tooltip con el resumen del día (None si no hay servicios)."""
+    if not dia:
+        return None
+    return (f"{dia['servicios']} servicios · {dia['pax']} pax  \n"
+            f"{dia['sin_guia']} sin guía · {dia['pago_pendiente']} con pago pendiente")
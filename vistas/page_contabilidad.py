@@ -2,6 +2,7 @@
 import streamlit as st
 import pandas as pd
 from controllers.reporte_controller import ReporteController
+from models.perfilador import perfilado
 
 # Renderiza el Botón para el PDF del Itinerario Simple.
 def render_itinerary_simple_download(render):
@@ -32,6 +33,7 @@ def render_itinerary_simple_download(render):
 
 # Inicializar controladores (Se hace dentro de mostrar_pagina ahora)
 
+@perfilado()
 def reporte_de_montos():
     """Sub-función para la funcionalidad 'Reporte de Montos'."""
     reporte_controller = st.session_state.get('reporte_controller')
@@ -80,6 +82,7 @@ def reporte_de_montos():
         st.info("Aún no hay ventas registradas en el sistema.")
 
 
+@perfilado()
 def auditoria_de_pagos():
     """Sub-función para la funcionalidad 'Auditoría de Pagos'."""
     reporte_controller = st.session_state.get('reporte_controller')
@@ -146,6 +149,7 @@ def auditoria_de_pagos():
         st.info("No hay transacciones para auditar.")
 
 
+@perfilado()
 def mostrar_requerimientos():
     """Muestra la lista de requerimientos enviados por Operaciones."""
     reporte_controller = st.session_state.get('reporte_controller')
@@ -256,6 +260,7 @@ def mostrar_pagina(funcionalidad_seleccionada, rol_actual=None, user_id=None, su
     else:
         st.info("Utilice el Dashboard Contable para ver reportes.")
 
+@perfilado()
 def estructurador_liquidacion_pro(controller):
     """
     Herramienta avanzada para estructurar liquidaciones (Versión Contabilidad).
@@ -381,6 +386,7 @@ def estructurador_liquidacion_pro(controller):
 
 from controllers.venta_controller import VentaController
 
+@perfilado()
 def dashboard_cuentas_por_cobrar_b2b(supabase_client):
     """Dashboard específico para controlar deudas de Agencias (B2B)."""
     st.subheader("💎 Cuentas por Cobrar (B2B)", divider='blue')
@@ -459,6 +465,7 @@ def dashboard_cuentas_por_cobrar_b2b(supabase_client):
         df_det = pd.DataFrame(lista_detalle)
         st.dataframe(df_det, use_container_width=True, hide_index=True)
 
+@perfilado()
 def estructurador_contable():
     """
     Herramienta tipo Excel para Contabilidad.
@@ -5,6 +5,8 @@ from controllers.reporte_controller import ReporteController
 from controllers.lead_controller import LeadController
 from controllers.venta_controller import VentaController
 import calendar
+from models.perfilador import perfilado
+from vistas.calendario_carga import ayuda_dia, etiqueta_dia, LEYENDA_CARGA
 
 def render_itinerary_details_visual(render):
     """Renderiza el detalle visual del itinerario de forma robusta."""
@@ -65,6 +67,7 @@ def render_itinerary_details_visual(render):
                     if txt: st.markdown(f"&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;❌ <small>{str(txt).upper()}</small>", unsafe_allow_html=True)
             st.write("")
 
+@perfilado()
 def render_sales_dashboard_visual(supabase_client):
     """Vista puramente visual para el Dashboard Comercial."""
     st.title("📊 Dashboard Comercial")
@@ -115,6 +118,7 @@ def render_sales_dashboard_visual(supabase_client):
             else:
                 st.info("No hay recordatorios.")
 
+@perfilado()
 def render_ops_dashboard_visual(supabase_client):
     """Vista visual para Operaciones con Tablero Diario."""
     st.title("⚙️ Visión General de Operaciones")
@@ -173,6 +177,7 @@ def render_ops_dashboard_visual(supabase_client):
         # Aquí integramos el calendario (Tablero Diario)
         render_tablero_diario_visual(controller)
 
+@perfilado()
 def render_tablero_diario_visual(controller):
     """Lógica del calendario adaptada para visualización."""
     if 'cal_current_date' not in st.session_state:
@@ -205,7 +210,7 @@ def render_tablero_diario_visual(controller):
                 st.rerun()
 
         cal_grid = calendar.monthcalendar(year, month)
-        fechas_activas = controller.get_fechas_con_servicios(year, month)
+        resumen_mes = controller.get_resumen_mes(year, month)
         
         cols = st.columns(7)
         for i, h in enumerate(['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom']): 
@@ -217,25 +222,24 @@ def render_tablero_diario_visual(controller):
                 if day != 0:
                     d_obj = date(year, month, day)
                     sel = (d_obj == st.session_state['cal_selected_date'])
-                    act = d_obj in fechas_activas
-                    lbl = f"{day}{' 🟢' if act else ''}"
-                    if cols[i].button(lbl, key=f"dash_d_{d_obj}", use_container_width=True, type="primary" if sel else "secondary"):
+                    lbl = etiqueta_dia(day, resumen_mes.get(d_obj))
+                    if cols[i].button(lbl, key=f"dash_d_{d_obj}", help=ayuda_dia(resumen_mes.get(d_obj)), use_container_width=True, type="primary" if sel else "secondary"):
                         st.session_state['cal_selected_date'] = d_obj
                         st.rerun()
+        st.caption(LEYENDA_CARGA)
     else:
         # Vista Semanal (Lectura)
         d_sel = st.session_state['cal_selected_date']
         lunes = d_sel - timedelta(days=d_sel.weekday())
         domingo = lunes + timedelta(days=6)
-        servicios_w = controller.get_servicios_rango_fechas(lunes, domingo)
+        semana = controller.get_servicios_por_dia(lunes, domingo)
         
         cols_w = st.columns(7)
         for i, h in enumerate(['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom']):
             f_dia = lunes + timedelta(days=i)
             with cols_w[i]:
                 st.markdown(f"<div style='text-align:center;'><b>{h} {f_dia.day}</b></div>", unsafe_allow_html=True)
-                s_dia = [s for s in servicios_w if s['Fecha'] == f_dia.isoformat()]
-                for s in s_dia:
+                for s in semana[f_dia].servicios:
                     st.caption(f"📍 {s['Servicio']}\n({s['Cliente']})")
 
     # Detalle Diario (Lectura)
@@ -248,6 +252,7 @@ def render_tablero_diario_visual(controller):
         st.info("Sin operaciones para esta fecha.")
 
 
+@perfilado()
 def render_contable_dashboard_visual(supabase_client):
     """Vista visual para Contabilidad."""
     st.title("🏦 Dashboard Financiero")
@@ -292,26 +297,36 @@ def render_contable_dashboard_visual(supabase_client):
         else:
             st.info("No hay ventas con itinerarios registrados para auditar.")
 
+@perfilado()
 def render_exec_dashboard_visual(supabase_client):
     """Dashboard Ejecutivo para Gerencia."""
     st.title("🏛️ Reporte Ejecutivo 360")
     from controllers.gerencia_controller import GerenciaController
+    from controllers.concurrencia import ejecutar_en_paralelo
     controller = GerenciaController(supabase_client)
     
+    # Consultas independientes en paralelo
+    datos = ejecutar_en_paralelo({
+        'finan': controller.get_kpis_financieros,
+        'comer': controller.get_metricas_comerciales,
+        'pax_tot': controller.get_pax_totales,
+        'canal': controller.get_ventas_por_canal,
+    })
+    
     # Resumen Multi-área
     c1, c2, c3 = st.columns(3)
-    finan = controller.get_kpis_financieros()
+    finan = datos['finan']
     c1.metric("Ingresos Totales", f"S/ {finan['ventas_totales']:,.0f}")
     
-    comer = controller.get_metricas_comerciales()
+    comer = datos['comer']
     c2.metric("Conversión Lead", f"{comer['tasa_conversion']:.1f}%")
     
-    pax_tot = controller.get_pax_totales()
+    pax_tot = datos['pax_tot']
     c3.metric("Pax Operados", pax_tot)
 
     # Gráfico Mix
     st.divider()
-    df_v_canal = controller.get_ventas_por_canal()
+    df_v_canal = datos['canal']
     if not df_v_canal.empty:
         import plotly.express as px
         fig = px.pie(df_v_canal, values='Monto', names='Canal', title="Ventas por Canal de Captación")
@@ -3,19 +3,27 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from controllers.gerencia_controller import GerenciaController
+from controllers.concurrencia import ejecutar_en_paralelo
 from datetime import date
+from models.perfilador import perfilado
 
+@perfilado()
 def dashboard_ejecutivo(controller):
     """Interfaz del Dashboard Principal de Gerencia."""
     st.subheader("📊 Panel de Control Ejecutivo", divider='rainbow')
 
     # --- 1. OBTENER DATOS ---
+    # Consultas independientes en paralelo: la latencia es la de la más lenta, no la suma
     with st.spinner("Calculando métricas..."):
-        finan = controller.get_kpis_financieros()
-        comer = controller.get_metricas_comerciales()
-        pax_tot = controller.get_pax_totales()
-        alertas = controller.get_alertas_gestion()
-        ventas_mes = controller.get_ventas_mensuales()
+        datos = ejecutar_en_paralelo({
+            'finan': controller.get_kpis_financieros,
+            'comer': controller.get_metricas_comerciales,
+            'pax_tot': controller.get_pax_totales,
+            'alertas': controller.get_alertas_gestion,
+            'ventas_mes': controller.get_ventas_mensuales,
+        })
+        finan, comer, pax_tot = datos['finan'], datos['comer'], datos['pax_tot']
+        alertas, ventas_mes = datos['alertas'], datos['ventas_mes']
 
     # --- 2. KPIs FINANCIEROS (Fila 1) ---
     st.markdown("#### 💰 Resumen Financiero")
@@ -79,17 +87,24 @@ def dashboard_ejecutivo(controller):
     else:
         st.success("✅ No hay riesgos críticos detectados por ahora.")
 
+@perfilado()
 def auditoria_maestra(controller):
     """Vista de auditoría visual avanzada y control de integridad."""
     st.subheader("🕵️ Centro de Control de Auditoría", divider='orange')
     
     with st.spinner("Generando análisis de integridad..."):
-        df_v_canal = controller.get_ventas_por_canal()
-        df_v_estado = controller.get_ventas_por_estado()
-        df_ventas_limpio = controller.get_detalle_ventas_limpio()
-        # Reutilizamos los de la auditoría anterior para no perder el funnel
-        df_desempeno = controller.get_desempeno_vendedores()
-        df_leads_estados = controller.get_distribucion_estados_leads()
+        datos = ejecutar_en_paralelo({
+            'canal': controller.get_ventas_por_canal,
+            'estado': controller.get_ventas_por_estado,
+            'limpio': controller.get_detalle_ventas_limpio,
+            # Reutilizamos los de la auditoría anterior para no perder el funnel
+            'desempeno': controller.get_desempeno_vendedores,
+            'leads_estados': controller.get_distribucion_estados_leads,
+            'pax': controller.get_pax_totales,
+        })
+        df_v_canal, df_v_estado = datos['canal'], datos['estado']
+        df_ventas_limpio = datos['limpio']
+        df_desempeno, df_leads_estados = datos['desempeno'], datos['leads_estados']
 
     # --- 1. RESUMEN EJECUTIVO DE AUDITORÍA (Métricas Rápidas) ---
     m1, m2, m3 = st.columns(3)
@@ -100,8 +115,7 @@ def auditoria_maestra(controller):
         monto_avg = df_ventas_limpio['Monto'].mean() if not df_ventas_limpio.empty else 0
         st.metric("Ticket Promedio", f"S/ {float(monto_avg or 0):,.2f}")
     with m3:
-        pax_total = controller.get_pax_totales()
-        st.metric("Operación Actual", f"{pax_total} PAX")
+        st.metric("Operación Actual", f"{datos['pax']} PAX")
 
     st.markdown("---")
 
@@ -8,6 +8,9 @@ from datetime import date, timedelta
 import urllib.parse
 from controllers.operaciones_controller import OperacionesController
 from controllers.venta_controller import VentaController
+from models.cache_referencias import invalidar_tabla
+from models.perfilador import perfilado
+from vistas.calendario_carga import ayuda_dia, etiqueta_dia, LEYENDA_CARGA
 
 # Renderiza el Botón para el PDF del Itinerario Simple.
 def render_itinerary_simple_download(render):
@@ -37,6 +40,7 @@ def render_itinerary_simple_download(render):
             st.error("No se pudo generar el PDF en este momento.")
 
 # Dashboard 2: Tablero con vistas Duplicadas (Mensual/Semanal).
+@perfilado()
 def dashboard_tablero_diario(controller):
     """Dashboard 2: Tablero con vistas Duplicadas (Mensual/Semanal)."""
     st.subheader("2️⃣ Tablero de Planificación Logística", divider='green')
@@ -75,7 +79,7 @@ def dashboard_tablero_diario(controller):
 
         st.markdown("---")
         cal_grid = calendar.monthcalendar(year, month)
-        fechas_activas = controller.get_fechas_con_servicios(year, month)
+        resumen_mes = controller.get_resumen_mes(year, month)
         
         cols = st.columns(7)
         headers = ['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom']
@@ -87,12 +91,12 @@ def dashboard_tablero_diario(controller):
                 if day != 0:
                     d_obj = date(year, month, day)
                     sel = (d_obj == st.session_state['cal_selected_date'])
-                    act = d_obj in fechas_activas
-                    lbl = f"{day}{' 🟢' if act else ''}"
+                    lbl = etiqueta_dia(day, resumen_mes.get(d_obj))
                     if d_obj == date.today(): lbl += "\n(Hoy)"
-                    if cols[i].button(lbl, key=f"d_{d_obj}", use_container_width=True, type="primary" if sel else "secondary"):
+                    if cols[i].button(lbl, key=f"d_{d_obj}", help=ayuda_dia(resumen_mes.get(d_obj)), use_container_width=True, type="primary" if sel else "secondary"):
                         st.session_state['cal_selected_date'] = d_obj
                         st.rerun()
+        st.caption(LEYENDA_CARGA)
 
     else:
         # --- SEMANA ---
@@ -113,7 +117,7 @@ def dashboard_tablero_diario(controller):
                 st.rerun()
         
         st.markdown("---")
-        servicios_w = controller.get_servicios_rango_fechas(lunes, domingo)
+        semana = controller.get_servicios_por_dia(lunes, domingo)
         cols_w = st.columns(7)
         headers_w = ['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom']
         
@@ -121,9 +125,11 @@ def dashboard_tablero_diario(controller):
             f_dia = lunes + timedelta(days=i)
             with cols_w[i]:
                 estilo = f"background:{'#1E88E5' if f_dia==date.today() else '#444'}; padding:5px; border-radius:5px; text-align:center; margin-bottom:5px;"
-                st.markdown(f"<div style='{estilo}'><small>{headers_w[i]}</small><br><b>{f_dia.day}</b></div>", unsafe_allow_html=True)
+                dia = semana[f_dia]
+                totales = f"<br><small>{dia.total_servicios} serv · {dia.pax} pax</small>" if dia.servicios else ""
+                st.markdown(f"<div style='{estilo}'><small>{headers_w[i]}</small><br><b>{f_dia.day}</b>{totales}</div>", unsafe_allow_html=True)
                 
-                s_dia = [s for s in servicios_w if s['Fecha'] == f_dia.isoformat()]
+                s_dia = dia.servicios
                 if not s_dia:
                     st.markdown("<p style='text-align:center; color:gray; font-size:10px;'>Vacío</p>", unsafe_allow_html=True)
                 else:
@@ -234,6 +240,7 @@ def generar_mensaje_whatsapp(data):
     return url
 
 
+@perfilado()
 def registro_ventas_proveedores(supabase_client):
     from controllers.itinerario_digital_controller import ItinerarioDigitalController
     venta_controller = VentaController(supabase_client)
@@ -450,6 +457,7 @@ def registro_ventas_proveedores(supabase_client):
                 else: 
                     st.error(msg)
 
+@perfilado()
 def reporte_operativo(controller):
     """Vista global de operaciones (Dashboard + Detalle)."""
     st.subheader("📊 Reporte Operativo Global", divider='blue')
@@ -537,6 +545,7 @@ def mostrar_pagina(nombre_modulo, rol_actual, user_id, supabase_client):
     else:
         st.info("Seleccione una opción válida del menú lateral.")
             
+@perfilado()
 def dashboard_pasajeros(controller):
     """Gestión de Rooming List / Pasajeros."""
     st.subheader("📋 Lista de Pasajeros (Rooming List)", divider='blue')
@@ -596,7 +605,7 @@ def dashboard_pasajeros(controller):
         
         # 4. Guardar
         if st.button("💾 Guardar Lista de Pasajeros", type="primary"):
-            updated = 0
+            filas_pax = []
             for i, row in edited_pax.iterrows():
                 if row.get('nombre_completo'): # Solo guardar si tiene nombre
                     data_p = {
@@ -606,14 +615,17 @@ def dashboard_pasajeros(controller):
                         'nacionalidad': row.get('nacionalidad'),
                         'fecha_nacimiento': row.get('fecha_nacimiento').isoformat() if row.get('fecha_nacimiento') else None,
                         'cuidados_especiales': row.get('cuidados_especiales'),
-                        'es_principal': row.get('es_principal', False)
+                        'es_principal': row.get('es_principal', False),
+                        'id_pasajero': int(row['id_pasajero']) if 'id_pasajero' in row and pd.notna(row['id_pasajero']) else None
                     }
-                    
-                    if 'id_pasajero' in row and pd.notna(row['id_pasajero']):
-                        controller.client.table('pasajero').update(data_p).eq('id_pasajero', row['id_pasajero']).execute()
-                    else:
-                        controller.client.table('pasajero').insert(data_p).execute()
-                    updated += 1
+                    filas_pax.append(data_p)
+            
+            # Guardado en lote: un upsert para los existentes y un insert para los nuevos
+            updated = 0
+            try:
+                updated = controller.pasajero_model.guardar_lista(filas_pax)
+            except Exception as e:
+                st.error(f"Error guardando pasajeros: {e}")
             
             if updated > 0:
                 st.success(f"✅ Se actualizaron {updated} pasajeros para el grupo de {v_act['nombre_cliente']}.")
@@ -622,6 +634,52 @@ def dashboard_pasajeros(controller):
             
 
 
+# Despacho de vales de endose en lote (por fecha de servicio o por proveedor y rango).
+def render_vales_endoso_lote(controller, prov_items):
+    with st.expander("📦 Vales de Endose en Lote (despacho del día)", expanded=False):
+        c_modo, c_fmt = st.columns(2)
+        modo = c_modo.radio("Generar por:", ["📅 Fecha de servicio", "🏢 Proveedor y rango"], horizontal=True, key="lote_vales_modo")
+        formato = c_fmt.radio("Formato:", ["PDF único", "ZIP (un PDF por vale)"], horizontal=True, key="lote_vales_fmt")
+
+        proveedor = None
+        if modo == "📅 Fecha de servicio":
+            fecha_ini = st.date_input("Fecha de servicio:", value=date.today() + timedelta(days=1), key="lote_vales_fecha")
+            fecha_fin = fecha_ini
+        else:
+            c_p, c_d, c_h = st.columns([2, 1, 1])
+            nombres = sorted({p['nombre_comercial'] for p in prov_items})
+            proveedor = c_p.selectbox("Proveedor:", nombres, key="lote_vales_prov") if nombres else None
+            fecha_ini = c_d.date_input("Desde:", value=date.today(), key="lote_vales_desde")
+            fecha_fin = c_h.date_input("Hasta:", value=date.today() + timedelta(days=7), key="lote_vales_hasta")
+
+        if st.button("⚙️ Generar Vales", use_container_width=True, key="btn_lote_vales"):
+            vales = controller.get_vales_endoso(fecha_ini, fecha_fin, proveedor)
+            if not vales:
+                st.session_state.pop('lote_vales', None)
+                st.info("No hay servicios endosados con proveedor asignado en ese criterio.")
+            else:
+                from controllers.pdf_controller import PDFController
+                es_zip = formato.startswith("ZIP")
+                with st.spinner(f"Generando {len(vales)} vales..."):
+                    archivo = PDFController().generar_vouchers_endose_lote(vales, 'zip' if es_zip else 'pdf')
+                if archivo:
+                    sufijo = f"{fecha_ini}" if fecha_ini == fecha_fin else f"{fecha_ini}_{fecha_fin}"
+                    st.session_state['lote_vales'] = {
+                        'datos': archivo.getvalue(),
+                        'nombre': f"vales_endose_{sufijo}.{'zip' if es_zip else 'pdf'}",
+                        'mime': "application/zip" if es_zip else "application/pdf",
+                        'cantidad': len(vales)
+                    }
+                else:
+                    st.error("No se pudieron generar los vales.")
+
+        # Se conserva en la sesión: el clic de descarga provoca un rerun
+        lote = st.session_state.get('lote_vales')
+        if lote:
+            st.download_button(f"📥 Descargar {lote['cantidad']} vales ({lote['nombre']})", data=lote['datos'],
+                               file_name=lote['nombre'], mime=lote['mime'], use_container_width=True)
+
+@perfilado()
 def dashboard_simulador_costos(controller):
     """
     Herramienta avanzada para estructurar liquidaciones de grupos/B2B.
@@ -637,6 +695,8 @@ def dashboard_simulador_costos(controller):
     except Exception as e:
         print(f"Error cargando proveedores init: {e}")
 
+    render_vales_endoso_lote(controller, prov_items)
+
     if 'simulador_data' not in st.session_state:
         st.session_state['simulador_data'] = [
             {"FECHA": date.today(), "SERVICIO": "Servicio Ejemplo", "MONEDA": "USD", "TOTAL": 0.0},
@@ -874,6 +934,8 @@ def dashboard_simulador_costos(controller):
                     })
                     controller.client.table('venta_tour').insert(data_save).execute()
                     updated_count += 1
+        if updated_count:
+            invalidar_tabla('venta_tour')
         return updated_count
 
     with c_save:
@@ -4,6 +4,8 @@ import pandas as pd
 from datetime import date, timedelta
 from controllers.lead_controller import LeadController
 from controllers.venta_controller import VentaController
+from models.perfilador import perfilado
+from controllers.trabajos_pdf import SUBIENDO, obtener_trabajos
 
 def render_itinerary_details_visual(render):
     """Renderiza el detalle visual del itinerario de forma robusta."""
@@ -71,6 +73,7 @@ def get_vendedor_id():
 
 # --- MÓDULOS DE LEADS Y VENTAS (RESTAURADOS) ---
 
+@perfilado()
 def formulario_registro_leads():
     lead_controller = st.session_state.get('lead_controller')
     if not lead_controller: st.error("Error de inicialización de LeadController."); return
@@ -99,6 +102,7 @@ def formulario_registro_leads():
             if exito: st.success(mensaje)
             else: st.error(mensaje)
 
+@perfilado()
 def seguimiento_leads():
     lead_controller = st.session_state.get('lead_controller')
     if not lead_controller: st.error("Error de inicialización de LeadController."); return
@@ -113,6 +117,7 @@ def seguimiento_leads():
     else:
         st.info("No hay leads para mostrar.")
 
+@perfilado()
 def registro_ventas_directa():
     venta_controller = st.session_state.get('venta_controller')
     lead_controller = st.session_state.get('lead_controller')
@@ -370,6 +375,7 @@ def registro_ventas_directa():
                     st.error(msg)
 
 
+@perfilado()
 def render_reminders_dashboard():
     lead_controller = st.session_state.get('lead_controller')
     if not lead_controller: st.error("Error de inicialización."); return
@@ -435,6 +441,7 @@ def render_reminders_dashboard():
     st.write("📖 **Agenda Completa de Seguimiento**")
     st.dataframe(df_rec[['fecha_seguimiento', 'numero_celular', 'red_social', 'comentario']], use_container_width=True)
 
+@perfilado()
 def formulario_recordatorio():
     lead_controller = st.session_state.get('lead_controller')
     if not lead_controller: st.error("Error de inicialización de LeadController."); return
@@ -477,6 +484,7 @@ def formulario_recordatorio():
                 else:
                     st.error(mensaje)
 
+@perfilado()
 def constructor_itinerarios():
     """Interfaz para generar el Itinerario Digital y sincronizar con Cloud."""
     it_controller = st.session_state.get('itinerario_digital_controller')
@@ -574,23 +582,48 @@ def constructor_itinerarios():
                 }
             }
 
-            with st.spinner("Generando PDF y sincronizando con Supabase..."):
-                exito, msg, url_pdf = it_controller.registrar_generacion_itinerario(
-                    id_lead=id_lead_actual,
-                    nombre_pasajero=nombre_pasajero,
-                    id_vendedor=st.session_state.get('user_id'),
-                    datos_render=datos_render
-                )
-                
-                if exito:
-                    st.success(f"✅ {msg}")
-                    if url_pdf:
-                        st.markdown(f"### [📥 DESCARGAR ITINERARIO PDF]({url_pdf})")
-                        st.info("El link también ha sido guardado en la ficha del lead.")
-                    st.balloons()
-                else:
-                    st.error(msg)
+            # El PDF se genera en segundo plano: la sesión no queda bloqueada mientras renderiza
+            exito, msg, id_trabajo = it_controller.encolar_generacion_itinerario(
+                id_lead=id_lead_actual,
+                nombre_pasajero=nombre_pasajero,
+                id_vendedor=st.session_state.get('user_id'),
+                datos_render=datos_render
+            )
+
+            if exito:
+                st.success(f"✅ {msg}")
+                st.session_state.setdefault('trabajos_pdf', []).insert(0, id_trabajo)
+            else:
+                st.error(msg)
+
+    render_estado_trabajos_pdf()
+
+
+def render_estado_trabajos_pdf():
+    """Estado de los PDFs encolados en esta sesión; se refresca solo mientras haya alguno en curso."""
+    ids = st.session_state.get('trabajos_pdf', [])
+    if not ids:
+        return
+    en_curso = any(t.en_curso for t in obtener_trabajos(ids))
+
+    @st.fragment(run_every=2 if en_curso else None)
+    def estado():
+        trabajos = obtener_trabajos(st.session_state.get('trabajos_pdf', []))
+        for t in trabajos[:5]:
+            if t.en_curso:
+                etapa = "Subiendo a la nube" if t.estado == SUBIENDO else "Generando PDF"
+                st.info(f"⏳ {t.descripcion}: {etapa}...")
+            elif t.terminado_ok:
+                st.markdown(f"✅ {t.descripcion}: [📥 DESCARGAR ITINERARIO PDF]({t.url_pdf})")
+            else:
+                st.error(f"❌ {t.descripcion}: {t.mensaje}")
+        # Al terminar el último trabajo, un rerun completo detiene el refresco automático
+        if en_curso and not any(t.en_curso for t in trabajos):
+            st.rerun()
+
+    estado()
 
+@perfilado()
 def gestion_registros_multicanal():
     st.subheader("📝 Gestión de Ingreso de Clientes")
     tipo_cliente = st.selectbox(
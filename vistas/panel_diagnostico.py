@@ -0,0 +1,84 @@
+# vistas/panel_diagnostico.py
+import json
+
+import pandas as pd
+import streamlit as st
+
+from controllers.motor_plantillas import metricas_render
+from models.instrumentacion import Rerun, registro_consultas
+from models.perfilador import CATEGORIAS, PerfilRerun
+
+
+def mostrar_panel_diagnostico(rerun: Rerun):
+    """Panel lateral con las consultas a Supabase del rerun actual y el historial por página."""
+    with st.sidebar.expander("🔎 Diagnóstico de consultas", expanded=False):
+        resumen = rerun.resumen()
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Round trips", resumen['round_trips'])
+        c2.metric("Latencia", f"{resumen['latencia_ms']:,.0f} ms")
+        c3.metric("Payload", f"{resumen['bytes'] / 1024:,.1f} KB")
+
+        if rerun.llamadas:
+            df = pd.DataFrame([{
+                'Tabla': ll.tabla,
+                'Operación': ll.operacion,
+                'Filtros': ', '.join(ll.filtros),
+                'Filas': ll.filas,
+                'Bytes': ll.bytes,
+                'ms': ll.latencia_ms,
+                'Error': ll.error or ''
+            } for ll in rerun.llamadas])
+            por_tabla = (
+                df.groupby(['Tabla', 'Operación'])
+                .agg(Llamadas=('ms', 'size'), Filas=('Filas', 'sum'), Bytes=('Bytes', 'sum'), ms=('ms', 'sum'))
+                .reset_index()
+                .sort_values('ms', ascending=False)
+            )
+            st.caption(f"Rerun #{rerun.id_rerun} · {rerun.pagina}")
+            st.dataframe(por_tabla, hide_index=True, use_container_width=True)
+            st.dataframe(df, hide_index=True, use_container_width=True)
+
+        # Promedios por página de los últimos reruns (para fijar presupuestos de round trips)
+        historial = pd.DataFrame([r.resumen() for r in registro_consultas.reruns() if r.llamadas])
+        if not historial.empty:
+            st.caption("Promedio por página (últimos reruns)")
+            st.dataframe(
+                historial.groupby('pagina')[['round_trips', 'latencia_ms', 'bytes']].mean().round(1),
+                use_container_width=True
+            )
+
+        # Renders de PDF del proceso (aciertos de caché y tiempo Jinja / xhtml2pdf por plantilla)
+        metricas_pdf = metricas_render()
+        if metricas_pdf:
+            st.caption("PDF por plantilla (proceso actual)")
+            st.dataframe(pd.DataFrame(metricas_pdf), hide_index=True, use_container_width=True)
+
+        st.download_button(
+            "Descargar JSON",
+            data=json.dumps(registro_consultas.a_dict(), ensure_ascii=False, indent=2),
+            file_name="diagnostico_consultas.json",
+            mime="application/json"
+        )
+
+
+def mostrar_panel_perfil(perfil: PerfilRerun):
+    """Panel lateral con el reparto del tiempo del rerun (DB / pandas / render / app) por sección."""
+    with st.sidebar.expander("⏱️ Perfil de la página", expanded=False):
+        resumen = perfil.resumen()
+        st.caption(f"Perfil #{perfil.id_perfil} · {perfil.pagina} · {resumen['tiempo_ms']:,.0f} ms")
+        columnas = st.columns(len(CATEGORIAS))
+        for col, categoria in zip(columnas, CATEGORIAS):
+            col.metric(categoria, f"{resumen['por_categoria'][categoria]:,.0f} ms")
+
+        if resumen['secciones']:
+            df = pd.DataFrame(resumen['secciones'])
+            # Sangría por nivel para leer el árbol de secciones
+            df['seccion'] = df.apply(lambda r: '· ' * int(r['nivel']) + r['seccion'], axis=1)
+            st.dataframe(df.drop(columns=['nivel']), hide_index=True, use_container_width=True)
+
+        st.download_button(
+            "Descargar .prof (snakeviz / flameprof)",
+            data=perfil.a_bytes(),
+            file_name=f"perfil_{perfil.id_perfil}.prof",
+            mime="application/octet-stream"
+        )